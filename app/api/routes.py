@@ -1,22 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.api.schemas import CandidateCreate, CandidateResponse, JobCreate, JobResponse
+from app.api.schemas import (
+    BulkIngestResponse,
+    BulkIngestStatusResponse,
+    CandidateCreate,
+    CandidateMatchResponse,
+    CandidateSearchResponse,
+    CandidateResponse,
+    EmailTemplateParams,
+    InvitationCampaignCreate,
+    InvitationCampaignResponse,
+    JobCreate,
+    JobResponse,
+    SimilarCandidateResponse
+)
+from app.services.bulk_ingest import bulk_ingest_service
 from app.services.candidate_service import candidate_service
 from app.services.resume_parser import resume_parser
-from app.services.external_source import external_source
+from app.services.resume_search import resume_search
 from app.services.email_service import email_service
-from app.core.deps import get_db
+from app.services.email_templates import UnknownTemplate, email_templates
+from app.services.export_service import EXPORT_FORMATS, export_service
+from app.services.match_results import match_results
+from app.services.tasks import task_queue
+from app.services.vector_index import vector_index
+from app.core.deps import get_async_db, get_db
+from app.utils.pagination import InvalidCursor
 
 router = APIRouter()
 
 
 @router.post("/candidates/", response_model=CandidateResponse)
 async def create_candidate(
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     *,
     first_name: str = Form(...),
     last_name: str = Form(...),
@@ -41,43 +61,133 @@ async def create_candidate(
     )
     
     # Create the candidate in DB
-    candidate = candidate_service.create(db, obj_in=candidate_in)
-    
-    # Process resume in background
-    background_tasks.add_task(
-        resume_parser.process_resume,
-        db=db,
-        candidate_id=candidate.id,
-        resume_path=resume_path
+    candidate = await candidate_service.acreate(db, obj_in=candidate_in)
+    
+    # Process resume in a worker
+    await task_queue.aenqueue(
+        db,
+        "process_resume",
+        {"candidate_id": candidate.id, "resume_path": resume_path}
     )
     
     return candidate
 
 
+@router.post("/candidates/bulk", response_model=BulkIngestResponse, status_code=202)
+async def bulk_ingest_candidates(
+    db: AsyncSession = Depends(get_async_db),
+    files: List[UploadFile] = File(...)
+):
+    """
+    Ingest many resumes at once, as individual files and/or zip archives
+    Returns a batch ID straight away; processing continues in the background
+    """
+    batch = await bulk_ingest_service.create_batch(db, files)
+    
+    await task_queue.aenqueue(db, "ingest_batch", {"batch_id": batch.id})
+    
+    return {"batch_id": batch.id, "total_files": batch.total_files}
+
+
+@router.get("/candidates/bulk/{batch_id}", response_model=BulkIngestStatusResponse)
+def get_bulk_ingest_status(batch_id: str, db: Session = Depends(get_db)):
+    """
+    Get per-file progress and throughput of a bulk ingest batch
+    """
+    status = bulk_ingest_service.get_status(db, batch_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return status
+
+
 @router.get("/candidates/", response_model=List[CandidateResponse])
 def get_candidates(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
     source: Optional[str] = None,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    sort: str = Query("created_at", regex="^(created_at|match_score)$"),
+    cursor: Optional[str] = None
 ):
     """
     Get list of candidates with optional filtering
+    The X-Next-Cursor response header holds the cursor for the next page
     """
-    return candidate_service.get_candidates(
-        db=db, 
-        skip=skip, 
-        limit=limit,
-        source=source,
-        status=status
+    try:
+        candidates = candidate_service.get_candidates(
+            db=db, 
+            skip=skip, 
+            limit=limit,
+            source=source,
+            status=status,
+            sort=sort,
+            cursor=cursor
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    next_cursor = candidate_service.next_cursor(candidates, limit=limit, sort=sort)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return candidates
+
+
+@router.get("/candidates/export")
+def export_candidates(
+    db: Session = Depends(get_db),
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    source: Optional[str] = None,
+    status: Optional[str] = None,
+    gzip: bool = False
+):
+    """
+    Stream every candidate (optionally filtered) as NDJSON or CSV
+    With gzip=true the body is sent gzip-encoded
+    """
+    headers = {"Content-Disposition": f'attachment; filename="candidates.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(
+        export_service.iter_candidates(db, format=format, source=source, status=status, compress=gzip),
+        media_type=EXPORT_FORMATS[format],
+        headers=headers
     )
 
 
+@router.get("/candidates/search", response_model=List[CandidateSearchResponse])
+def search_candidates(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=500),
+    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """
+    Full-text search of candidates' resumes, most relevant first, with highlighted snippets
+    The X-Next-Cursor response header holds the cursor for the next page
+    """
+    try:
+        hits = resume_search.search(db, q, limit=limit, cursor=cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    next_cursor = resume_search.next_cursor(hits, limit=limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    candidates = candidate_service.get_many(db, ids=[hit.candidate_id for hit in hits])
+    return [
+        {"candidate": candidates[hit.candidate_id], "score": hit.score, "snippet": hit.snippet}
+        for hit in hits
+        if hit.candidate_id in candidates
+    ]
+
+
 @router.post("/jobs/", response_model=JobResponse)
 def create_job(
     job_in: JobCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -86,69 +196,141 @@ def create_job(
     # Create the job
     job = candidate_service.create_job(db, obj_in=job_in)
     
-    # Find matching candidates in background
-    background_tasks.add_task(
-        candidate_service.match_candidates_to_job,
-        db=db,
-        job_id=job.id
-    )
+    # Find matching candidates in a worker
+    task_queue.enqueue(db, "match_candidates_to_job", {"job_id": job.id})
     
     return job
 
 
+@router.get("/jobs/{job_id}/similar-candidates", response_model=List[SimilarCandidateResponse])
+def get_similar_candidates(
+    job_id: int,
+    db: Session = Depends(get_db),
+    k: int = Query(20, ge=1, le=1000)
+):
+    """
+    Get the candidates whose profiles are most similar to a job
+    """
+    job = candidate_service.get_job(db, id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    nearest = vector_index.search_job(job, k=k)
+    candidates = candidate_service.get_many(db, ids=[candidate_id for candidate_id, _ in nearest])
+    
+    return [
+        {"candidate": candidates[candidate_id], "similarity": similarity}
+        for candidate_id, similarity in nearest
+        if candidate_id in candidates
+    ]
+
+
+@router.get("/jobs/{job_id}/shortlist", response_model=List[CandidateMatchResponse])
+def get_job_shortlist(
+    job_id: int,
+    db: Session = Depends(get_db),
+    k: int = Query(20, ge=1, le=1000)
+):
+    """
+    Get the k best-scored candidates from the job's match results
+    """
+    job = candidate_service.get_job(db, id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return match_results.shortlist(db, job_id, k)
+
+
+@router.post("/jobs/{job_id}/campaign", response_model=InvitationCampaignResponse, status_code=202)
+async def create_invitation_campaign(
+    job_id: int,
+    campaign_in: InvitationCampaignCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Send interview invitations to every candidate matching a job, or on its shortlist
+    Runs in a worker; each recipient's result is recorded on their job application
+    """
+    job = await candidate_service.aget_job(db, id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if campaign_in.template_name not in email_templates.names():
+        raise HTTPException(status_code=400, detail=f"Unknown email template: {campaign_in.template_name}")
+    
+    task = await task_queue.aenqueue(
+        db,
+        "send_invitation_campaign",
+        {"job_id": job_id, **campaign_in.dict()}
+    )
+    
+    return {"job_id": job_id, "task_id": task.id}
+
+
 @router.post("/search/external/")
 async def search_external_candidates(
     job_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     sources: List[str] = ["linkedin", "cvlibrary", "naukri"]
 ):
     """
     Search for candidates from external sources like LinkedIn, CVLibrary, Naukri
     """
     # Get the job details
-    job = candidate_service.get_job(db, id=job_id)
+    job = await candidate_service.aget_job(db, id=job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Search for candidates in background
-    background_tasks.add_task(
-        external_source.search_candidates,
-        db=db,
-        job_id=job_id,
-        sources=sources
+    # Search for candidates in a worker
+    task = await task_queue.aenqueue(
+        db,
+        "search_external_candidates",
+        {"job_id": job_id, "sources": sources}
     )
     
-    return {"message": "External candidate search initiated", "job_id": job_id}
+    return {"message": "External candidate search initiated", "job_id": job_id, "task_id": task.id}
+
+
+@router.get("/tasks/stats")
+def get_task_stats(db: Session = Depends(get_db)):
+    """
+    Get background task counts by status and the current queue depth
+    """
+    return task_queue.stats(db)
 
 
 @router.post("/candidates/{candidate_id}/contact")
 async def contact_candidate(
     candidate_id: int,
-    db: Session = Depends(get_db),
-    job_id: Optional[int] = None
+    db: AsyncSession = Depends(get_async_db),
+    job_id: Optional[int] = None,
+    template: Optional[EmailTemplateParams] = None
 ):
     """
     Send an email to contact the candidate for interview
+    The invitation template, subject and an extra message can be chosen in the body
     """
     # Get the candidate
-    candidate = candidate_service.get(db, id=candidate_id)
+    candidate = await candidate_service.aget(db, id=candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
     # Get the job if provided
     job = None
     if job_id:
-        job = candidate_service.get_job(db, id=job_id)
+        job = await candidate_service.aget_job(db, id=job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
     
     # Send the email
-    sent = await email_service.send_interview_invitation(candidate, job)
+    try:
+        sent = await email_service.send_interview_invitation(candidate, job, template)
+    except UnknownTemplate:
+        raise HTTPException(status_code=400, detail=f"Unknown email template: {template.template_name}")
     
     if sent:
         # Update candidate status
-        candidate_service.update_status(db, candidate_id=candidate_id, status="contacted")
+        await candidate_service.aupdate_status(db, candidate_id=candidate_id, status="contacted")
         return {"message": "Email sent successfully"}
     else:
         raise HTTPException(status_code=500, detail="Failed to send email")
@@ -157,7 +339,7 @@ async def contact_candidate(
 @router.post("/candidates/{candidate_id}/schedule")
 async def schedule_interview(
     candidate_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     job_id: Optional[int] = None,
     date_time: str = Form(...)
 ):
@@ -165,7 +347,7 @@ async def schedule_interview(
     Schedule an interview with a candidate
     """
     # Get the candidate
-    candidate = candidate_service.get(db, id=candidate_id)
+    candidate = await candidate_service.aget(db, id=candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
@@ -174,7 +356,7 @@ async def schedule_interview(
     
     if scheduled:
         # Update candidate status
-        candidate_service.update_status(db, candidate_id=candidate_id, status="interview_scheduled")
+        await candidate_service.aupdate_status(db, candidate_id=candidate_id, status="interview_scheduled")
         return {"message": "Interview scheduled successfully"}
     else:
         raise HTTPException(status_code=500, detail="Failed to schedule interview")
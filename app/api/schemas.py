@@ -63,12 +63,35 @@ class CandidateResponse(CandidateBase):
         orm_mode = True
 
 
+class SimilarCandidateResponse(BaseModel):
+    candidate: CandidateResponse
+    similarity: float
+
+
+class CandidateSearchResponse(BaseModel):
+    candidate: CandidateResponse
+    score: float
+    snippet: str
+
+
+class CandidateMatchResponse(BaseModel):
+    candidate: CandidateResponse
+    score: float
+    feedback: Optional[str] = None
+    scored_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
 class JobBase(BaseModel):
     title: str
     description: str
     requirements: str
     location: Optional[str] = None
     job_type: str
+    prerank_top_k: Optional[int] = Field(None, ge=1)
+    prerank_min_score: Optional[float] = Field(None, ge=0.0, le=1.0)
 
 
 class JobCreate(JobBase):
@@ -81,6 +104,8 @@ class JobUpdate(BaseModel):
     requirements: Optional[str] = None
     location: Optional[str] = None
     job_type: Optional[str] = None
+    prerank_top_k: Optional[int] = Field(None, ge=1)
+    prerank_min_score: Optional[float] = Field(None, ge=0.0, le=1.0)
 
 
 class JobResponse(JobBase):
@@ -119,6 +144,33 @@ class JobApplicationResponse(JobApplicationBase):
         orm_mode = True
 
 
+class IngestFileResponse(BaseModel):
+    id: int
+    filename: str
+    stage: str
+    status: str
+    error: Optional[str] = None
+    candidate_id: Optional[int] = None
+    
+    class Config:
+        orm_mode = True
+
+
+class BulkIngestResponse(BaseModel):
+    batch_id: str
+    total_files: int
+
+
+class BulkIngestStatusResponse(BaseModel):
+    batch_id: str
+    status: str
+    total_files: int
+    counts: Dict[str, int]
+    elapsed_seconds: Optional[float] = None
+    files_per_second: Optional[float] = None
+    files: List[IngestFileResponse] = []
+
+
 class CandidateSearchParams(BaseModel):
     job_id: int
     sources: List[str] = ["linkedin", "cvlibrary", "naukri"]
@@ -129,3 +181,15 @@ class EmailTemplateParams(BaseModel):
     template_name: str = "interview_invitation"
     subject: Optional[str] = None
     custom_message: Optional[str] = None
+
+
+class InvitationCampaignCreate(EmailTemplateParams):
+    shortlisted_only: bool = False  # Invite the pre-ranked shortlist instead of scored matches
+    min_score: Optional[float] = Field(None, ge=0.0, le=1.0)
+    resend: bool = False
+
+
+class InvitationCampaignResponse(BaseModel):
+    job_id: int
+    task_id: int
+
@@ -8,17 +8,32 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Recruitment Agent"
     
+    LOG_LEVEL: str = "info"
+    
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
     
     # Database settings
     DATABASE_URL: Optional[PostgresDsn] = None
+    DB_POOL_SIZE: int = 10  # Per engine; the API has a sync and an async engine
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000  # PostgreSQL only; 0 disables
     
     # Email settings
     SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
     SMTP_USER: str = os.getenv("SMTP_USER", "")
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+    SMTP_USE_TLS: bool = True  # Implicit TLS; when false STARTTLS is used if the server offers it
+    SMTP_POOL_SIZE: int = 5  # Long-lived connections per event loop (each worker consumer has one)
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100  # Reconnect after this many messages
+    SMTP_TIMEOUT_SECONDS: float = 30.0
+    EMAIL_CAMPAIGN_CONCURRENCY: int = 20  # Invitations in flight per campaign
+    EMAIL_CAMPAIGN_COMMIT_BATCH_SIZE: int = 50  # Invitation outcomes recorded per commit
+    EMAIL_TEMPLATE_DIR: Path = Path(__file__).resolve().parent.parent / "templates" / "email"  # <name>.txt templates
     
     # External API credentials
     LINKEDIN_API_KEY: Optional[str] = None
@@ -26,13 +41,82 @@ class Settings(BaseSettings):
     CVLIBRARY_API_KEY: Optional[str] = None
     NAUKRI_API_KEY: Optional[str] = None
     
+    # External source APIs; without a URL a source returns placeholder data
+    LINKEDIN_API_URL: Optional[str] = None
+    CVLIBRARY_API_URL: Optional[str] = None
+    NAUKRI_API_URL: Optional[str] = None
+    EXTERNAL_HTTP_POOL_SIZE: int = 20  # Connections shared by all sources, per event loop (each worker consumer has one)
+    EXTERNAL_HTTP_TIMEOUT_SECONDS: float = 15.0
+    EXTERNAL_RATE_LIMIT_PER_SECOND: float = 5.0  # Requests per second, per source
+    EXTERNAL_RATE_LIMIT_BURST: int = 10
+    EXTERNAL_MAX_RETRIES: int = 4  # Retries on 429, 5xx and connection errors
+    EXTERNAL_RETRY_BACKOFF_SECONDS: float = 0.5  # Doubles with each retry
+    EXTERNAL_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failed requests before a source is cut off
+    EXTERNAL_CIRCUIT_RESET_SECONDS: float = 30.0
+    EXTERNAL_PAGE_SIZE: int = 50
+    EXTERNAL_MAX_PAGES: int = 20  # Per source and search
+    
     # LLM settings
     LLM_API_KEY: Optional[str] = None
     LLM_MODEL: str = "gpt-4"
+    LLM_API_BASE: Optional[str] = None  # OpenAI-compatible endpoint, e.g. http://localhost:8090/v1 (python -m benchmarks.mock_openai)
+    LLM_BATCH_TOKEN_BUDGET: int = 6000  # Prompt + reply tokens per batched match prompt
+    LLM_BATCH_MAX_CANDIDATES: int = 20  # Upper bound on candidates per batched prompt
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: Path = Path("./cache/llm_cache.sqlite3")
+    LLM_CACHE_MAX_ENTRIES: int = 100_000
+    LLM_CACHE_MAX_AGE_SECONDS: int = 60 * 60 * 24 * 30  # 30 days
+    
+    # Candidate matching
+    MATCH_CONCURRENCY: int = 16  # Concurrent LLM evaluations per matching run
+    MATCH_TIMEOUT_SECONDS: float = 60.0  # Per-evaluation timeout
+    MATCH_COMMIT_BATCH_SIZE: int = 200  # Scored candidates per commit
+    PRERANK_ENABLED: bool = True  # Cheap local pre-ranking before LLM scoring
+    PRERANK_TOP_K: int = 200  # Default when a job doesn't set prerank_top_k
+    PRERANK_MIN_SCORE: float = 0.0  # Default when a job doesn't set prerank_min_score
+    MATCH_USE_VECTOR_INDEX: bool = False  # Restrict matching to the nearest candidates in the vector index
+    MATCH_VECTOR_POOL_SIZE: int = 2000  # Nearest candidates considered when the vector index is used
     
     # File storage
     UPLOAD_DIR: Path = Path("./uploads")
     
+    # Resume text extraction
+    EXTRACTION_WORKERS: int = 2  # Worker processes for PDF/DOCX parsing
+    EXTRACTION_TIMEOUT_SECONDS: float = 30.0  # Per-file timeout before the worker is recycled
+    EXTRACTION_MAX_PAGES: int = 50  # Pages read from a PDF (0 for no limit)
+    EXTRACTION_MAX_MEMORY_MB: int = 1024  # Address space cap per worker (0 for no limit)
+    RESUME_TEXT_CHAR_LIMIT: int = 20_000  # Text kept per resume for full-text search; the LLM reads the start of it
+    
+    # Bulk resume ingestion
+    INGEST_SAVE_CONCURRENCY: int = 4  # Archive members unpacked at once
+    INGEST_EXTRACT_CONCURRENCY: int = 4  # Files queued on the extraction pool at once
+    INGEST_LLM_CONCURRENCY: int = 8  # Concurrent LLM extraction calls
+    INGEST_DB_BATCH_SIZE: int = 100  # Candidates written per commit
+    INGEST_LLM_TIMEOUT_SECONDS: float = 60.0
+    INGEST_PROGRESS_INTERVAL_SECONDS: float = 2.0  # How often per-file progress is saved
+    
+    # Background task queue and workers
+    WORKER_CONCURRENCY: int = 4  # Concurrent task consumers per worker process
+    WORKER_POLL_INTERVAL_SECONDS: float = 1.0  # Idle wait between claims
+    TASK_VISIBILITY_TIMEOUT_SECONDS: int = 300  # A running task without a heartbeat for this long is reclaimed
+    TASK_MAX_ATTEMPTS: int = 3
+    TASK_RETRY_BACKOFF_SECONDS: float = 10.0  # Doubles with each attempt
+    TASK_RETRY_BACKOFF_MAX_SECONDS: float = 600.0
+    
+    # Candidate export
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched from the database cursor at a time
+    
+    # Skills
+    SKILL_CACHE_SIZE: int = 10_000  # Skill name -> ID entries kept per process
+    
+    # Metrics
+    METRICS_ENABLED: bool = True  # /metrics, per-route request and per-statement SQL timing
+    METRICS_WORKER_PORT: int = 9100  # Port a worker serves its metrics on (0 disables)
+
+    # Candidate similarity index
+    VECTOR_INDEX_DIR: Path = Path("./index")
+    VECTOR_INDEX_DIM: int = 512
+    
     # JWT settings for authentication
     SECRET_KEY: str = os.getenv("SECRET_KEY", "development_secret_key")
     ALGORITHM: str = "HS256"
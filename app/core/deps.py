@@ -1,21 +1,70 @@
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator
 from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
-# Create SQLAlchemy engine
-if settings.DATABASE_URL:
-    engine = create_engine(settings.DATABASE_URL)
-else:
-    # Default to SQLite for development if no DB URL provided
-    SQLALCHEMY_DATABASE_URL = "sqlite:///./recruitment_agent.db"
-    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# Default to SQLite for development if no DB URL provided
+SQLALCHEMY_DATABASE_URL = str(settings.DATABASE_URL) if settings.DATABASE_URL else "sqlite:///./recruitment_agent.db"
+
+
+def _engine_options(url: URL, is_async: bool) -> Dict[str, Any]:
+    """
+    Pool and connection options from settings for a sync or async engine
+    """
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def _async_url(url: URL) -> URL:
+    """
+    The same database through its asyncio driver
+    """
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    if url.get_backend_name() == "postgresql":
+        return url.set(drivername="postgresql+asyncpg")
+    return url
+
+
+# Create SQLAlchemy engines; sync sessions serve the worker and sync routes,
+# async sessions the async routes
+database_url = make_url(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(database_url, **_engine_options(database_url, is_async=False))
+
+async_database_url = _async_url(database_url)
+async_engine = create_async_engine(async_database_url, **_engine_options(async_database_url, is_async=True))
+
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Objects stay usable after commit; lazy loads can't run implicitly on an AsyncSession
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db() -> Generator:
     """
@@ -25,4 +74,12 @@ def get_db() -> Generator:
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting an async DB session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
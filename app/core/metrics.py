@@ -0,0 +1,124 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Process-wide Prometheus metrics, served by /metrics on the API and on
+# METRICS_WORKER_PORT by workers
+
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+SQL_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds", "Language model API call latency", ["model", "outcome"], buckets=LLM_BUCKETS
+)
+LLM_TOKENS = Counter("llm_tokens", "Tokens used by language model calls", ["model", "kind"])
+LLM_CACHE_LOOKUPS = Counter("llm_cache_lookups", "LLM response cache lookups", ["result"])
+RESUME_EXTRACTION_SECONDS = Histogram(
+    "resume_extraction_duration_seconds", "Resume text extraction time, including worker queueing", ["outcome"]
+)
+SMTP_SEND_SECONDS = Histogram("smtp_send_duration_seconds", "Time to hand one email to the SMTP server", ["outcome"])
+EXTERNAL_REQUEST_SECONDS = Histogram(
+    "external_request_duration_seconds",
+    "External source API request time, including rate limiting and retries",
+    ["source", "outcome"]
+)
+SQL_STATEMENT_SECONDS = Histogram(
+    "sql_statement_duration_seconds", "SQL statement execution time", ["operation", "outcome"], buckets=SQL_BUCKETS
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """
+    Observe how long the block takes, labelled outcome="ok" or "error"
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        histogram.labels(outcome=outcome, **labels).observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Time every statement run on a (sync) engine; pass async_engine.sync_engine for an async one
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    _observe_statement(conn, statement, "ok")
+
+
+def _handle_error(context) -> None:
+    if context.connection is not None and context.statement is not None:
+        _observe_statement(context.connection, context.statement, "error")
+
+
+def _observe_statement(conn, statement: str, outcome: str) -> None:
+    started = conn.info.get("metrics_started")
+    if not started:
+        return
+    operation = statement.split(None, 1)[0].upper() if statement else ""
+    if operation not in SQL_OPERATIONS:
+        operation = "OTHER"
+    SQL_STATEMENT_SECONDS.labels(operation, outcome).observe(time.perf_counter() - started.pop())
+
+
+class MetricsMiddleware:
+    """
+    Times each HTTP request, labelled by route template rather than raw path
+    so IDs in URLs don't multiply the series
+    """
+    def __init__(self, app: Callable):
+        self.app = app
+        self._routes: Dict[Any, str] = {}
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(scope["method"], self._route(scope), str(status)).observe(
+                time.perf_counter() - started
+            )
+
+    def _route(self, scope) -> str:
+        # The router leaves the matched endpoint in the scope
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self._routes:
+            self._routes[endpoint] = next(
+                (route.path for route in scope["app"].routes if getattr(route, "endpoint", None) is endpoint),
+                "unmatched"
+            )
+        return self._routes[endpoint]
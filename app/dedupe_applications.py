@@ -0,0 +1,132 @@
+"""
+One-off migration: merge duplicate job applications and add the
+(candidate_id, job_id) unique index that matching and campaigns upsert on
+
+    python -m app.dedupe_applications --dry-run
+    python -m app.dedupe_applications --batch-size 500
+
+Databases created before uq_job_applications_candidate_job existed may hold
+several applications per candidate and job (every rematch added one). Each
+such group is merged into its most recently updated row: email_sent and
+response_received are true if they were on any row, applied_date is the
+earliest. The other rows are deleted, each batch committing on its own, so an
+interrupted run can simply be restarted. Run it before deploying the code that
+upserts applications, whose ON CONFLICT clause needs the index; if the old
+code added a duplicate meanwhile and the index can't be created, run it again.
+"""
+import argparse
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import Index, delete, func, inspect, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import SessionLocal
+from app.models.candidate import JobApplication
+from app.services.candidate_service import APPLICATION_KEY
+
+logging.basicConfig(level=settings.LOG_LEVEL.upper())
+logger = logging.getLogger(__name__)
+
+UNIQUE_INDEX_NAME = "uq_job_applications_candidate_job"
+
+
+class ApplicationDeduplicator:
+    def plan(self, db: Session) -> List[Tuple[int, int]]:
+        """
+        (candidate ID, job ID) of every pair with more than one application
+        """
+        return [
+            (candidate_id, job_id)
+            for candidate_id, job_id in db.query(JobApplication.candidate_id, JobApplication.job_id)
+            .group_by(JobApplication.candidate_id, JobApplication.job_id)
+            .having(func.count() > 1)
+            .order_by(JobApplication.candidate_id, JobApplication.job_id)
+        ]
+
+    def merge(self, db: Session, pairs: List[Tuple[int, int]], batch_size: int) -> None:
+        """
+        Merge each pair's applications into one row, committing every batch_size pairs
+        """
+        for start in range(0, len(pairs), batch_size):
+            for candidate_id, job_id in pairs[start:start + batch_size]:
+                self._merge_pair(db, candidate_id, job_id)
+            db.commit()
+            logger.info("Merged %d of %d duplicated applications", min(start + batch_size, len(pairs)), len(pairs))
+
+    def has_unique_index(self, db: Session) -> bool:
+        inspector = inspect(db.get_bind())
+        unique_columns = [
+            set(constraint["column_names"]) for constraint in inspector.get_unique_constraints("job_applications")
+        ]
+        unique_columns += [
+            set(index["column_names"]) for index in inspector.get_indexes("job_applications") if index["unique"]
+        ]
+        return set(APPLICATION_KEY) in unique_columns
+
+    def create_unique_index(self, db: Session) -> None:
+        if self.has_unique_index(db):
+            return
+        Index(UNIQUE_INDEX_NAME, JobApplication.candidate_id, JobApplication.job_id, unique=True).create(db.get_bind())
+        logger.info("Created unique index %s", UNIQUE_INDEX_NAME)
+
+    def _merge_pair(self, db: Session, candidate_id: int, job_id: int) -> None:
+        rows = (
+            db.query(JobApplication)
+            .filter(JobApplication.candidate_id == candidate_id, JobApplication.job_id == job_id)
+            .all()
+        )
+        if len(rows) < 2:
+            return
+        # The latest status wins; ties go to the newest row
+        rows.sort(key=_recency, reverse=True)
+        keep, duplicates = rows[0], rows[1:]
+        applied_dates = [row.applied_date for row in rows if row.applied_date is not None]
+        db.execute(
+            update(JobApplication)
+            .where(JobApplication.id == keep.id)
+            .values(
+                email_sent=any(row.email_sent for row in rows),
+                response_received=any(row.response_received for row in rows),
+                applied_date=min(applied_dates) if applied_dates else None
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            delete(JobApplication)
+            .where(JobApplication.id.in_([row.id for row in duplicates]))
+            .execution_options(synchronize_session=False)
+        )
+        db.expunge_all()
+
+
+def _recency(row: JobApplication) -> tuple:
+    updated = row.last_updated or row.applied_date
+    return updated is not None, updated, row.id
+
+
+application_deduplicator = ApplicationDeduplicator()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge duplicate job applications and add their unique index")
+    parser.add_argument("--batch-size", type=int, default=500, help="Duplicated pairs merged per commit")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be merged")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        pairs = application_deduplicator.plan(db)
+        logger.info("%d (candidate, job) pairs with duplicate applications", len(pairs))
+        if args.dry_run:
+            logger.info("Unique index present: %s", application_deduplicator.has_unique_index(db))
+            return
+        application_deduplicator.merge(db, pairs, args.batch_size)
+        application_deduplicator.create_unique_index(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
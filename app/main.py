@@ -1,8 +1,17 @@
-from fastapi import FastAPI, Depends
+import logging
+
+from fastapi import FastAPI, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.api.routes import router as api_router
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.services.extraction_pool import extraction_pool
+from app.services.http_client import http_client
+from app.services.smtp_pool import smtp_pool
+
+logging.basicConfig(level=settings.LOG_LEVEL.upper())
 
 app = FastAPI(
     title="Recruitment Agent API",
@@ -17,17 +26,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Add API routes
 app.include_router(api_router, prefix="/api")
 
+
+@app.on_event("shutdown")
+def shutdown_extraction_pool():
+    extraction_pool.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    await http_client.close()
+
+
+@app.on_event("shutdown")
+async def close_smtp_pool():
+    await smtp_pool.close()
+
+
 # Health check endpoint
 @app.get("/health", tags=["Health"])
 async def health_check():
     return {"status": "healthy"}
 
 
+# Prometheus metrics for this process
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
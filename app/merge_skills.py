@@ -0,0 +1,184 @@
+"""
+One-off backfill: merge duplicate skills into their canonical names
+
+    python -m app.merge_skills --dry-run
+    python -m app.merge_skills --batch-size 100
+
+Skills named as a compound of known skills ("HTML/CSS") are split: their
+candidates are linked to each part and the compound row is deleted. Then skills
+whose names canonicalise to the same key ("Python", "python3", "Python
+(programming)", "py") are merged into one row: candidate links move to it and
+the other rows are deleted. Each batch commits on its own, so an interrupted
+run can simply be restarted. Restart the API and workers afterwards; their
+skill ID caches may still hold merged rows.
+"""
+import argparse
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import SessionLocal
+from app.models.candidate import Skill, candidate_skills
+from app.services.candidate_service import candidate_service, skill_id_cache
+from app.services.skill_canonicalizer import skill_canonicalizer
+
+logging.basicConfig(level=settings.LOG_LEVEL.upper())
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SkillGroup:
+    canonical: str
+    target_id: int
+    target_name: str
+    duplicate_ids: List[int] = field(default_factory=list)
+
+    @property
+    def needs_merge(self) -> bool:
+        return bool(self.duplicate_ids) or self.target_name != self.canonical
+
+
+class SkillMerger:
+    def plan_splits(self, db: Session) -> List[Tuple[int, List[str]]]:
+        """
+        (skill ID, canonical part names) of every skill named as a compound of known skills
+        """
+        splits = []
+        for skill_id, name in db.query(Skill.id, Skill.name):
+            parts = skill_canonicalizer.canonical_names(name or "")
+            if len(parts) > 1:
+                splits.append((skill_id, parts))
+        return splits
+
+    def split(self, db: Session, splits: List[Tuple[int, List[str]]], batch_size: int) -> None:
+        """
+        Link each compound skill's candidates to its parts and delete it,
+        committing every batch_size skills
+        """
+        for start in range(0, len(splits), batch_size):
+            batch = splits[start:start + batch_size]
+            part_ids = candidate_service.resolve_skill_ids(db, [part for _, parts in batch for part in parts])
+            for skill_id, parts in batch:
+                for part in parts:
+                    self._move_links(db, [skill_id], part_ids[skill_canonicalizer.key(part)])
+                db.execute(delete(candidate_skills).where(candidate_skills.c.skill_id == skill_id))
+                db.execute(delete(Skill).where(Skill.id == skill_id).execution_options(synchronize_session=False))
+            db.commit()
+            logger.info("Split %d of %d compound skills", min(start + batch_size, len(splits)), len(splits))
+        skill_id_cache.clear()
+
+    def plan(self, db: Session) -> List[SkillGroup]:
+        """
+        Group skills by canonical key, keeping the row already spelled
+        canonically, else the most used one, and merging the rest into it
+        """
+        usage: Dict[int, int] = dict(
+            db.query(candidate_skills.c.skill_id, func.count()).group_by(candidate_skills.c.skill_id)
+        )
+        members = defaultdict(list)
+        for skill_id, name in db.query(Skill.id, Skill.name):
+            canonical = skill_canonicalizer.canonical(name or "")
+            if canonical:
+                members[canonical.casefold()].append((name != canonical, -usage.get(skill_id, 0), skill_id, name, canonical))
+
+        groups = []
+        for rows in members.values():
+            rows.sort()
+            _, _, target_id, target_name, canonical = rows[0]
+            group = SkillGroup(canonical, target_id, target_name, [row[2] for row in rows[1:]])
+            if group.needs_merge:
+                groups.append(group)
+        return groups
+
+    def merge(self, db: Session, groups: List[SkillGroup], batch_size: int) -> None:
+        """
+        Merge each group, committing every batch_size groups
+        """
+        for start in range(0, len(groups), batch_size):
+            for group in groups[start:start + batch_size]:
+                self._merge_group(db, group)
+            db.commit()
+            logger.info("Merged %d of %d skill groups", min(start + batch_size, len(groups)), len(groups))
+        skill_id_cache.clear()
+
+    def _merge_group(self, db: Session, group: SkillGroup) -> None:
+        if group.duplicate_ids:
+            self._move_links(db, group.duplicate_ids, group.target_id)
+            db.execute(delete(candidate_skills).where(candidate_skills.c.skill_id.in_(group.duplicate_ids)))
+
+            category = (
+                select(Skill.category)
+                .where(Skill.id.in_(group.duplicate_ids), Skill.category.isnot(None))
+                .limit(1)
+                .scalar_subquery()
+            )
+            db.execute(
+                update(Skill)
+                .where(Skill.id == group.target_id, Skill.category.is_(None))
+                .values(category=category)
+                .execution_options(synchronize_session=False)
+            )
+            db.execute(
+                delete(Skill).where(Skill.id.in_(group.duplicate_ids)).execution_options(synchronize_session=False)
+            )
+
+        # After the deletes, so the canonical name is free
+        if group.target_name != group.canonical:
+            db.execute(
+                update(Skill)
+                .where(Skill.id == group.target_id)
+                .values(name=group.canonical)
+                .execution_options(synchronize_session=False)
+            )
+
+    def _move_links(self, db: Session, source_ids: List[int], target_id: int) -> None:
+        """
+        Link the candidates of the source skills to the target, skipping candidates that already have it
+        """
+        linked = select(candidate_skills.c.candidate_id).where(candidate_skills.c.skill_id == target_id)
+        moved = (
+            select(candidate_skills.c.candidate_id, literal(target_id))
+            .where(candidate_skills.c.skill_id.in_(source_ids), candidate_skills.c.candidate_id.not_in(linked))
+            .distinct()
+        )
+        db.execute(insert(candidate_skills).from_select(["candidate_id", "skill_id"], moved))
+
+
+skill_merger = SkillMerger()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge duplicate skills into their canonical names")
+    parser.add_argument("--batch-size", type=int, default=100, help="Skill groups merged per commit")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be merged")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        splits = skill_merger.plan_splits(db)
+        logger.info("%d compound skills to split", len(splits))
+        if args.dry_run:
+            for skill_id, parts in splits:
+                logger.info("Skill %d -> %s", skill_id, ", ".join(parts))
+        else:
+            skill_merger.split(db, splits, args.batch_size)
+
+        groups = skill_merger.plan(db)
+        duplicates = sum(len(group.duplicate_ids) for group in groups)
+        logger.info("%d skill groups to merge, %d duplicate skills", len(groups), duplicates)
+        if args.dry_run:
+            for group in groups:
+                logger.info("%s <- %d duplicate(s)", group.canonical, len(group.duplicate_ids))
+            return
+        skill_merger.merge(db, groups, args.batch_size)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,18 @@
 from app.models.base import Base
-from app.models.candidate import Candidate, Job, JobApplication, Skill
+from app.models.candidate import Candidate, CandidateJobMatch, Job, JobApplication, ResumeDocument, ResumeText, Skill
+from app.models.ingest import IngestBatch, IngestFile
+from app.models.task import Task
 
 __all__ = [
     "Base",
     "Candidate",
+    "CandidateJobMatch",
+    "IngestBatch",
+    "IngestFile",
     "Job",
     "JobApplication",
-    "Skill"
+    "ResumeDocument",
+    "ResumeText",
+    "Skill",
+    "Task"
 ]
@@ -1,3 +1,4 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
 
@@ -37,4 +38,15 @@ class CRUDBase:
         obj = db.query(self.model).get(id)
         db.delete(obj)
         db.commit()
-        return obj 
\ No newline at end of file
+        return obj 
+    
+    async def aget(self, db: AsyncSession, id: int):
+        return await db.get(self.model, id)
+    
+    async def acreate(self, db: AsyncSession, *, obj_in):
+        obj_in_data = obj_in.dict()
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Table
+from sqlalchemy import DDL, Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Index, Table, UniqueConstraint, event
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.models.base import Base
 
@@ -16,6 +16,10 @@ candidate_skills = Table(
 
 class Skill(Base):
     __tablename__ = "skills"
+    __table_args__ = (
+        # Case-insensitive lookup of an existing spelling
+        Index("ix_skills_name_lower", func.lower(text("name"))),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, index=True)
@@ -27,6 +31,13 @@ class Skill(Base):
 
 class Candidate(Base):
     __tablename__ = "candidates"
+    __table_args__ = (
+        # Keyset pagination of the candidate list, unfiltered and by each filter
+        Index("ix_candidates_created_at_id", "created_at", "id"),
+        Index("ix_candidates_source_created_at_id", "source", "created_at", "id"),
+        Index("ix_candidates_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_candidates_match_score_id", "match_score", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(100))
@@ -42,7 +53,8 @@ class Candidate(Base):
     current_position = Column(String(255), nullable=True)
     current_company = Column(String(255), nullable=True)
     
-    # Match scores
+    # Match scores; per-job results live in candidate_job_matches, match_score
+    # is the best of them and llm_feedback is only set by hand
     match_score = Column(Float, default=0.0)
     llm_feedback = Column(Text, nullable=True)
     
@@ -60,6 +72,9 @@ class Candidate(Base):
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
+    __table_args__ = (
+        UniqueConstraint("candidate_id", "job_id", name="uq_job_applications_candidate_job"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     candidate_id = Column(Integer, ForeignKey("candidates.id"))
@@ -89,9 +104,95 @@ class Job(Base):
     location = Column(String(255), nullable=True)
     job_type = Column(String(50))  # full-time, part-time, contract
     
+    # Pre-ranking: only the top K candidates scoring at least the cutoff go to the LLM
+    prerank_top_k = Column(Integer, nullable=True)
+    prerank_min_score = Column(Float, nullable=True)
+    
     # Dates
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     candidates = relationship("JobApplication", back_populates="job")
+
+
+class CandidateJobMatch(Base):
+    __tablename__ = "candidate_job_matches"
+    __table_args__ = (
+        UniqueConstraint("candidate_id", "job_id", name="uq_candidate_job_matches_candidate_job"),
+        # A job's shortlist read straight off the index, best first
+        Index("ix_candidate_job_matches_job_score", "job_id", text("score DESC"), "candidate_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
+    
+    # Local pre-ranking score and whether it passed on to LLM scoring
+    prescore = Column(Float, nullable=True)
+    shortlisted = Column(Boolean, default=False)
+    
+    # LLM match result and the inputs it was computed from
+    score = Column(Float, nullable=True)
+    feedback = Column(Text, nullable=True)
+    candidate_fingerprint = Column(String(40), nullable=True)
+    job_fingerprint = Column(String(40), nullable=True)
+    scored_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Tracking
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    candidate = relationship("Candidate")
+
+
+class ResumeDocument(Base):
+    __tablename__ = "resume_documents"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)  # SHA-256 of the file
+    file_path = Column(String(255))
+    
+    # Cached extraction results, reused for byte-identical uploads
+    text = Column(Text, nullable=True)
+    extracted_data = Column(Text, nullable=True)  # JSON from extract_resume_information
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ResumeText(Base):
+    __tablename__ = "resume_texts"
+    
+    # Extracted text of a candidate's latest resume, full-text indexed for search
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+    text = Column(Text, nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# The full-text index is kept in step with every write by the database itself:
+# an external-content FTS5 table fed by triggers on SQLite, a generated tsvector
+# column with a GIN index on PostgreSQL (queried by app/services/resume_search.py)
+RESUME_TEXT_SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE resume_texts_fts USING fts5("
+        "text, content='resume_texts', content_rowid='candidate_id', "
+        "tokenize='porter unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER resume_texts_ai AFTER INSERT ON resume_texts BEGIN "
+        "INSERT INTO resume_texts_fts(rowid, text) VALUES (new.candidate_id, new.text); END",
+        "CREATE TRIGGER resume_texts_ad AFTER DELETE ON resume_texts BEGIN "
+        "INSERT INTO resume_texts_fts(resume_texts_fts, rowid, text) VALUES ('delete', old.candidate_id, old.text); END",
+        "CREATE TRIGGER resume_texts_au AFTER UPDATE OF text ON resume_texts BEGIN "
+        "INSERT INTO resume_texts_fts(resume_texts_fts, rowid, text) VALUES ('delete', old.candidate_id, old.text); "
+        "INSERT INTO resume_texts_fts(rowid, text) VALUES (new.candidate_id, new.text); END",
+    ],
+    "postgresql": [
+        "ALTER TABLE resume_texts ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', text)) STORED",
+        "CREATE INDEX ix_resume_texts_search_vector ON resume_texts USING GIN (search_vector)",
+    ],
+}
+for dialect, statements in RESUME_TEXT_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(ResumeText.__table__, "after_create", DDL(statement).execute_if(dialect=dialect))
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+
+class IngestBatch(Base):
+    __tablename__ = "ingest_batches"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    status = Column(String(50), default="queued")  # queued, running, completed, failed
+    total_files = Column(Integer, default=0)
+    
+    # Tracking
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    files = relationship("IngestFile", back_populates="batch", order_by="IngestFile.id")
+
+
+class IngestFile(Base):
+    __tablename__ = "ingest_files"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(String(32), ForeignKey("ingest_batches.id"), index=True)
+    filename = Column(String(255))
+    
+    # Where the file is: an archive member still to be unpacked, or a stored resume
+    archive_path = Column(String(255), nullable=True)
+    file_path = Column(String(255), nullable=True)
+    
+    # Progress
+    stage = Column(String(50), default="save")  # save, extract, llm, write, done
+    status = Column(String(50), default="pending")  # pending, running, done, failed
+    error = Column(Text, nullable=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    batch = relationship("IngestBatch", back_populates="files")
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+
+class Task(Base):
+    __tablename__ = "tasks"
+    __table_args__ = (
+        # Claim order: highest priority first, then oldest due
+        Index("ix_tasks_status_priority_run_at", "status", "priority", "run_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=False, default="{}")  # JSON keyword arguments
+    priority = Column(Integer, default=0)  # Higher runs first
+    
+    # State
+    status = Column(String(50), default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_at = Column(DateTime(timezone=True), nullable=False)  # Not claimable before this
+    locked_until = Column(DateTime(timezone=True), nullable=True)  # Visibility timeout of a running task
+    worker_id = Column(String(100), nullable=True)
+    last_error = Column(Text, nullable=True)
+    
+    # Tracking
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
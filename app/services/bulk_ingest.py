@@ -0,0 +1,475 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.models.candidate import Candidate, ResumeDocument
+from app.models.ingest import IngestBatch, IngestFile
+from app.services.candidate_service import candidate_service
+from app.services.llm_service import llm_service
+from app.services.resume_parser import EXTRACTION_ERROR_PREFIXES, UPLOAD_CHUNK_SIZE, resume_parser
+from app.services.resume_search import resume_search
+from app.services.vector_index import vector_index
+
+logger = logging.getLogger(__name__)
+
+RESUME_EXTENSIONS = {".pdf", ".docx", ".txt"}
+PROFILE_FIELDS = ("experience_years", "education", "current_position", "current_company")
+
+
+@dataclass
+class IngestItem:
+    """
+    A file moving through the ingestion pipeline
+    """
+    file_id: int
+    filename: str
+    archive_path: Optional[str] = None
+    file_path: Optional[str] = None
+    content_hash: Optional[str] = None
+    text: Optional[str] = None
+    resume_data: Optional[Dict[str, Any]] = None
+    cached: bool = False
+    stage: str = "save"
+    status: str = "pending"
+    error: Optional[str] = None
+    candidate_id: Optional[int] = None
+
+
+class BulkIngestService:
+    """
+    Bulk resume ingestion as a pipeline of stages:
+    save -> extract text -> LLM extract -> batched DB write
+    Each stage runs its own pool of workers with its own concurrency limit.
+    """
+    async def create_batch(self, db: AsyncSession, uploads: List[UploadFile]) -> IngestBatch:
+        """
+        Stream uploaded resumes and archives to storage and register a batch
+        Archives are only listed here; their members are unpacked by the pipeline
+        """
+        batch = IngestBatch(id=uuid.uuid4().hex, status="queued")
+        files = []
+
+        for upload in uploads:
+            filename = upload.filename or ""
+            extension = os.path.splitext(filename)[1].lower()
+
+            if extension == ".zip":
+                archive_path = await self._save_archive(upload, batch.id)
+                try:
+                    with zipfile.ZipFile(archive_path) as archive:
+                        members = [
+                            info.filename for info in archive.infolist()
+                            if not info.is_dir() and os.path.splitext(info.filename)[1].lower() in RESUME_EXTENSIONS
+                        ]
+                except zipfile.BadZipFile:
+                    os.remove(archive_path)
+                    raise HTTPException(status_code=400, detail=f"{filename} is not a valid zip archive")
+
+                files.extend(
+                    IngestFile(filename=member, archive_path=archive_path, stage="save")
+                    for member in members
+                )
+            elif extension in RESUME_EXTENSIONS:
+                file_path = await resume_parser.save_resume(upload)
+                files.append(IngestFile(filename=filename, file_path=file_path, stage="extract"))
+            else:
+                raise HTTPException(status_code=400, detail=f"Unsupported file type: {filename}")
+
+        batch.total_files = len(files)
+        batch.files = files
+        db.add(batch)
+        await db.commit()
+        return batch
+
+    def get_status(self, db: Session, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Per-file progress and throughput of a batch
+        """
+        batch = db.query(IngestBatch).options(selectinload(IngestBatch.files)).filter(
+            IngestBatch.id == batch_id
+        ).first()
+        if not batch:
+            return None
+
+        # Files per pipeline stage, plus done and failed
+        counts: Dict[str, int] = {}
+        for file in batch.files:
+            key = "failed" if file.status == "failed" else file.stage
+            counts[key] = counts.get(key, 0) + 1
+
+        finished = counts.get("done", 0) + counts.get("failed", 0)
+        elapsed = None
+        if batch.started_at:
+            end = batch.finished_at or datetime.now(timezone.utc)
+            started_at = batch.started_at
+            if started_at.tzinfo is None:
+                started_at = started_at.replace(tzinfo=timezone.utc)
+            if end.tzinfo is None:
+                end = end.replace(tzinfo=timezone.utc)
+            elapsed = (end - started_at).total_seconds()
+
+        return {
+            "batch_id": batch.id,
+            "status": batch.status,
+            "total_files": batch.total_files,
+            "counts": counts,
+            "elapsed_seconds": elapsed,
+            "files_per_second": finished / elapsed if elapsed else None,
+            "files": batch.files,
+        }
+
+    async def run_batch(self, db: Session, batch_id: str) -> None:
+        """
+        Run every pending file of a batch through the pipeline
+        """
+        batch = db.query(IngestBatch).filter(IngestBatch.id == batch_id).first()
+        if not batch:
+            return
+
+        batch.status = "running"
+        batch.started_at = datetime.now(timezone.utc)
+        db.commit()
+
+        items = [
+            IngestItem(
+                file_id=file.id,
+                filename=file.filename,
+                archive_path=file.archive_path,
+                file_path=file.file_path,
+                stage=file.stage
+            )
+            for file in db.query(IngestFile).filter(
+                IngestFile.batch_id == batch_id, IngestFile.stage != "done", IngestFile.status != "failed"
+            )
+        ]
+
+        started = time.perf_counter()
+        try:
+            await self._run_pipeline(db, items)
+            batch.status = "completed"
+        except Exception:
+            logger.exception("Bulk ingest batch %s failed", batch_id)
+            db.rollback()
+            batch.status = "failed"
+            raise
+        finally:
+            batch.finished_at = datetime.now(timezone.utc)
+            db.commit()
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "Bulk ingest batch %s: %d files in %.1fs (%.2f files/sec)",
+                batch_id, len(items), elapsed, len(items) / elapsed if elapsed else 0.0
+            )
+
+        # Archives are no longer needed once every member is stored
+        for archive_path in {item.archive_path for item in items if item.archive_path}:
+            if os.path.exists(archive_path):
+                os.remove(archive_path)
+
+    async def _run_pipeline(self, db: Session, items: List[IngestItem]) -> None:
+        save_queue: asyncio.Queue = asyncio.Queue()
+        extract_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_EXTRACT_CONCURRENCY * 2)
+        llm_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_LLM_CONCURRENCY * 2)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_DB_BATCH_SIZE * 2)
+
+        changed: Dict[int, IngestItem] = {}
+
+        def mark(item: IngestItem, stage: str, status: str = "running", error: Optional[str] = None) -> None:
+            item.stage, item.status, item.error = stage, status, error
+            changed[item.file_id] = item
+
+        async def feed() -> None:
+            for item in items:
+                await (save_queue if item.stage == "save" else extract_queue).put(item)
+            # Archive members are unpacked before the save stage hands over to extraction
+            for _ in range(settings.INGEST_SAVE_CONCURRENCY):
+                await save_queue.put(None)
+
+        async def save(item: IngestItem) -> IngestItem:
+            mark(item, "save")
+            item.file_path = await asyncio.to_thread(self._unpack_member, item.archive_path, item.filename)
+            return item
+
+        async def extract(item: IngestItem) -> IngestItem:
+            mark(item, "extract")
+            item.content_hash = resume_parser.content_hash(item.file_path)
+            document = db.query(ResumeDocument).filter(ResumeDocument.content_hash == item.content_hash).first()
+            if document and document.extracted_data:
+                # Byte-identical resume seen before: skip parsing and the LLM
+                item.text = document.text or ""
+                item.resume_data = json.loads(document.extracted_data)
+                item.cached = True
+                return item
+
+            item.text = await resume_parser._extract_text_from_file(
+                item.file_path, max_chars=settings.RESUME_TEXT_CHAR_LIMIT
+            )
+            if item.text.startswith(EXTRACTION_ERROR_PREFIXES):
+                raise ValueError(item.text)
+            return item
+
+        async def extract_llm(item: IngestItem) -> IngestItem:
+            if item.resume_data is None:
+                mark(item, "llm")
+                item.resume_data = await llm_service.aextract_resume_information(
+                    item.text, timeout=settings.INGEST_LLM_TIMEOUT_SECONDS
+                )
+            mark(item, "write", status="pending")
+            return item
+
+        async def write() -> None:
+            while True:
+                item = await write_queue.get()
+                if item is None:
+                    break
+
+                pending = [item]
+                # Linger briefly so commits carry full batches
+                while len(pending) < settings.INGEST_DB_BATCH_SIZE:
+                    try:
+                        item = await asyncio.wait_for(write_queue.get(), timeout=0.5)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is None:
+                        await write_queue.put(None)
+                        break
+                    pending.append(item)
+
+                try:
+                    self._write_batch(db, pending)
+                except Exception as e:
+                    # Keep the pipeline running; only this batch is lost
+                    db.rollback()
+                    logger.exception("Writing %d files failed", len(pending))
+                    for failed in pending:
+                        if failed.status != "done":
+                            failed.stage, failed.status = "write", "failed"
+                            failed.error = str(e) or type(e).__name__
+                for written in pending:
+                    changed[written.file_id] = written
+                self._save_progress(db, changed)
+
+        async def report_progress() -> None:
+            while True:
+                await asyncio.sleep(settings.INGEST_PROGRESS_INTERVAL_SECONDS)
+                self._save_progress(db, changed)
+
+        async def on_failure(item: IngestItem, error: Exception) -> None:
+            mark(item, item.stage, status="failed", error=str(error) or type(error).__name__)
+            await write_queue.put(item)
+
+        reporter = asyncio.create_task(report_progress())
+        try:
+            await asyncio.gather(
+                feed(),
+                self._run_stage(save_queue, extract_queue, settings.INGEST_SAVE_CONCURRENCY,
+                                settings.INGEST_EXTRACT_CONCURRENCY, save, on_failure),
+                self._run_stage(extract_queue, llm_queue, settings.INGEST_EXTRACT_CONCURRENCY,
+                                settings.INGEST_LLM_CONCURRENCY, extract, on_failure),
+                self._run_stage(llm_queue, write_queue, settings.INGEST_LLM_CONCURRENCY,
+                                1, extract_llm, on_failure),
+                write(),
+            )
+        finally:
+            reporter.cancel()
+        self._save_progress(db, changed)
+
+    async def _run_stage(
+        self,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        concurrency: int,
+        downstream_concurrency: int,
+        handler: Callable[[IngestItem], Awaitable[IngestItem]],
+        on_failure: Callable[[IngestItem, Exception], Awaitable[None]]
+    ) -> None:
+        """
+        Run handler over inbox items with a fixed number of workers
+        Failed items skip the remaining stages and go straight to the writer
+        """
+        async def worker() -> None:
+            while True:
+                item = await inbox.get()
+                if item is None:
+                    return
+                try:
+                    item = await handler(item)
+                except Exception as e:
+                    await on_failure(item, e)
+                    continue
+                await outbox.put(item)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        # Let the next stage's workers finish
+        for _ in range(downstream_concurrency):
+            await outbox.put(None)
+
+    def _write_batch(self, db: Session, items: List[IngestItem]) -> None:
+        """
+        Create or update the candidates of a batch of files in one commit
+        If the batch can't be written it is rolled back and retried file by
+        file under savepoints, so only the offending files are marked failed
+        """
+        ready = [item for item in items if item.status != "failed"]
+        for item in ready:
+            email = str(item.resume_data.get("email") or "").strip()
+            if "@" not in email:
+                item.stage, item.status, item.error = "write", "failed", "No email address found in resume"
+        ready = [item for item in ready if item.status != "failed"]
+        if not ready:
+            return
+
+        try:
+            written = self._stage_items(db, ready, cache_documents=True)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.warning("Writing %d files in one batch failed; retrying one by one", len(ready), exc_info=True)
+            written = {}
+            for item in ready:
+                written.update(self._stage_item_isolated(db, item))
+            db.commit()
+
+        for item in ready:
+            if item.file_id in written:
+                item.candidate_id = written[item.file_id].id
+                item.stage, item.status = "done", "done"
+
+        indexed = candidate_service.get_many(db, ids=[candidate.id for candidate in written.values()])
+        vector_index.upsert_many(
+            (candidate.id, vector_index.candidate_text(candidate)) for candidate in indexed.values()
+        )
+
+    def _stage_item_isolated(self, db: Session, item: IngestItem) -> Dict[int, Candidate]:
+        """
+        Stage one file under a savepoint, marking it failed if it can't be written
+        """
+        # A concurrent upload may have cached the same file first; then write without caching
+        for cache_documents in (True, False):
+            try:
+                with db.begin_nested():
+                    return self._stage_items(db, [item], cache_documents=cache_documents)
+            except IntegrityError as e:
+                error: Exception = e
+            except Exception as e:
+                error = e
+                break
+        item.stage, item.status, item.error = "write", "failed", str(error) or type(error).__name__
+        return {}
+
+    def _stage_items(self, db: Session, ready: List[IngestItem], cache_documents: bool) -> Dict[int, Candidate]:
+        """
+        Stage candidates, skills and resume text for files with resume data, without committing
+        Returns the candidate written for each file ID
+        """
+        emails = {str(item.resume_data["email"]).strip() for item in ready}
+        candidates = {
+            candidate.email: candidate
+            for candidate in db.query(Candidate).filter(Candidate.email.in_(emails))
+        }
+
+        cached_hashes = set()
+        written: Dict[int, Candidate] = {}
+        for item in ready:
+            data = item.resume_data
+            email = str(data["email"]).strip()
+            candidate = candidates.get(email)
+            if candidate is None:
+                candidate = Candidate(
+                    first_name=data.get("first_name") or "",
+                    last_name=data.get("last_name") or "",
+                    email=email,
+                    phone=(str(data["phone"])[:20] if data.get("phone") else None),
+                    source="applied"
+                )
+                candidates[email] = candidate
+                db.add(candidate)
+            written[item.file_id] = candidate
+
+            candidate.resume_path = item.file_path
+            for field in PROFILE_FIELDS:
+                value = data.get(field)
+                if field == "experience_years":
+                    value = _to_float(value)
+                if value:
+                    setattr(candidate, field, value)
+
+            if cache_documents and not item.cached and item.content_hash not in cached_hashes:
+                cached_hashes.add(item.content_hash)
+                resume_parser.store_document(
+                    db, None, item.content_hash, item.file_path, item.text or "", data, commit=False
+                )
+
+        # Candidates need IDs before their skills can be linked
+        db.flush()
+        skills_by_candidate: Dict[int, List[str]] = {}
+        for item in ready:
+            skills_by_candidate.setdefault(written[item.file_id].id, []).extend(
+                item.resume_data.get("skills") or []
+            )
+        candidate_service.link_skills(db, skills_by_candidate, commit=False)
+        resume_search.store(db, {written[item.file_id].id: item.text or "" for item in ready})
+        db.flush()
+        return written
+
+    def _save_progress(self, db: Session, changed: Dict[int, IngestItem]) -> None:
+        """
+        Persist stage/status changes since the last call in one statement batch
+        """
+        if not changed:
+            return
+
+        db.bulk_update_mappings(IngestFile, [
+            {
+                "id": item.file_id,
+                "stage": item.stage,
+                "status": item.status,
+                "error": item.error,
+                "file_path": item.file_path,
+                "candidate_id": item.candidate_id,
+            }
+            for item in changed.values()
+        ])
+        db.commit()
+        changed.clear()
+
+    def _unpack_member(self, archive_path: str, member: str) -> str:
+        with zipfile.ZipFile(archive_path) as archive, archive.open(member) as fileobj:
+            return resume_parser.save_resume_file(fileobj, member)
+
+    async def _save_archive(self, upload: UploadFile, batch_id: str) -> str:
+        directory = os.path.join(settings.UPLOAD_DIR, "archives")
+        os.makedirs(directory, exist_ok=True)
+        archive_path = os.path.join(directory, f"{batch_id}_{os.urandom(4).hex()}.zip")
+
+        with open(archive_path, "wb") as buffer:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                buffer.write(chunk)
+        return archive_path
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+bulk_ingest_service = BulkIngestService()
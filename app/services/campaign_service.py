@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.api.schemas import EmailTemplateParams
+from app.core.config import settings
+from app.models.candidate import Candidate, CandidateJobMatch, Job, JobApplication
+from app.services.candidate_service import candidate_service
+from app.services.email_service import email_service
+
+logger = logging.getLogger(__name__)
+
+# Same bar as automatic job applications
+DEFAULT_MIN_SCORE = 0.7
+
+
+@dataclass
+class CampaignReport:
+    """
+    Outcome of an invitation campaign
+    """
+    job_id: int
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed_seconds: float = 0.0
+    failed_candidate_ids: List[int] = field(default_factory=list)
+
+    @property
+    def emails_per_second(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.total / self.elapsed_seconds
+
+    def summary(self) -> str:
+        return (
+            f"job {self.job_id}: sent {self.sent}/{self.total} invitations "
+            f"({self.failed} failed, {self.skipped} already invited) "
+            f"in {self.elapsed_seconds:.1f}s, {self.emails_per_second:.2f} emails/sec"
+        )
+
+
+class CampaignService:
+    """
+    Sends interview invitations for a job to every matching or shortlisted
+    candidate, with a bounded number of emails in flight
+    """
+    def __init__(self, concurrency: Optional[int] = None, commit_batch_size: Optional[int] = None):
+        self.concurrency = concurrency or settings.EMAIL_CAMPAIGN_CONCURRENCY
+        self.commit_batch_size = commit_batch_size or settings.EMAIL_CAMPAIGN_COMMIT_BATCH_SIZE
+
+    def recipients(
+        self,
+        db: Session,
+        job_id: int,
+        *,
+        shortlisted_only: bool = False,
+        min_score: Optional[float] = None
+    ) -> List[Candidate]:
+        """
+        Candidates scored at least min_score for the job, or pre-ranked onto its shortlist
+        """
+        query = db.query(Candidate).join(CandidateJobMatch, CandidateJobMatch.candidate_id == Candidate.id).filter(
+            CandidateJobMatch.job_id == job_id
+        )
+        if shortlisted_only:
+            query = query.filter(CandidateJobMatch.shortlisted.is_(True))
+        else:
+            query = query.filter(CandidateJobMatch.score >= (DEFAULT_MIN_SCORE if min_score is None else min_score))
+        return query.order_by(Candidate.id).all()
+
+    async def send_invitations(
+        self,
+        db: Session,
+        job_id: int,
+        *,
+        shortlisted_only: bool = False,
+        min_score: Optional[float] = None,
+        resend: bool = False,
+        template: Optional[EmailTemplateParams] = None
+    ) -> CampaignReport:
+        """
+        Invite every recipient and record the outcomes on their job applications
+        Outcomes are committed every commit_batch_size sends, so a campaign cut
+        short has recorded all but its last batch. Candidates already invited
+        to the job are skipped unless resend is set.
+        """
+        report = CampaignReport(job_id=job_id)
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            return report
+
+        candidates = self.recipients(db, job_id, shortlisted_only=shortlisted_only, min_score=min_score)
+        applications: Dict[int, List[JobApplication]] = {}
+        for application in db.query(JobApplication).filter(
+            JobApplication.job_id == job_id,
+            JobApplication.candidate_id.in_([candidate.id for candidate in candidates])
+        ):
+            applications.setdefault(application.candidate_id, []).append(application)
+
+        if not resend:
+            invited = {
+                candidate_id for candidate_id, rows in applications.items()
+                if any(application.email_sent for application in rows)
+            }
+            report.skipped = sum(1 for candidate in candidates if candidate.id in invited)
+            candidates = [candidate for candidate in candidates if candidate.id not in invited]
+        report.total = len(candidates)
+
+        # The job's part of the email and the message headers are rendered once for the campaign
+        invitation = email_service.prepare_invitation(job, template)
+        # Detached, so the commits between batches don't expire (and reload) them one by one
+        for candidate in candidates:
+            db.expunge(candidate)
+        for rows in applications.values():
+            for application in rows:
+                db.expunge(application)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for candidate in candidates:
+            queue.put_nowait(candidate)
+        outcomes: List[Tuple[Candidate, bool]] = []
+        started = time.perf_counter()
+
+        async def worker():
+            while True:
+                try:
+                    candidate = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                outcomes.append((candidate, await email_service.send_prepared(invitation, candidate)))
+                if len(outcomes) >= self.commit_batch_size:
+                    self._record(db, job_id, outcomes, applications, report)
+                    outcomes.clear()
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, queue.qsize()))))
+        self._record(db, job_id, outcomes, applications, report)
+
+        report.elapsed_seconds = time.perf_counter() - started
+        logger.info("Invitation campaign finished: %s", report.summary())
+        return report
+
+    def _record(
+        self,
+        db: Session,
+        job_id: int,
+        outcomes: List[Tuple[Candidate, bool]],
+        applications: Dict[int, List[JobApplication]],
+        report: CampaignReport
+    ) -> None:
+        """
+        Record a batch of invitation outcomes in one commit
+        """
+        if not outcomes:
+            return
+        application_updates = []
+        new_applications = []
+        candidate_updates = []
+        for candidate, sent in outcomes:
+            if not sent:
+                report.failed += 1
+                report.failed_candidate_ids.append(candidate.id)
+                continue
+
+            report.sent += 1
+            if candidate.id in applications:
+                application_updates.extend(
+                    {"id": application.id, "email_sent": True} for application in applications[candidate.id]
+                )
+            else:
+                new_applications.append({"candidate_id": candidate.id, "job_id": job_id, "email_sent": True})
+            if candidate.status == "new":
+                candidate_updates.append({"id": candidate.id, "status": "contacted"})
+
+        db.bulk_update_mappings(JobApplication, application_updates)
+        # A matching run may have created the application since it was read
+        candidate_service.add_applications(db, new_applications, update_columns=["email_sent"])
+        db.bulk_update_mappings(Candidate, candidate_updates)
+        db.commit()
+
+
+campaign_service = CampaignService()
@@ -1,11 +1,31 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from sqlalchemy import and_, func, insert, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Dict, Any, Iterable, Sequence
+from datetime import datetime, timezone
 from fastapi import HTTPException
 
-from app.models.candidate import Candidate, Job, JobApplication, Skill
+from app.models.candidate import Candidate, CandidateJobMatch, Job, JobApplication, Skill, candidate_skills
 from app.models.base import CRUDBase
 from app.api.schemas import CandidateCreate, CandidateUpdate, JobCreate, JobUpdate
-from app.services.llm_service import llm_service
+from app.core.config import settings
+from app.services.fingerprints import candidate_fingerprint, job_fingerprint
+from app.services.match_results import SCORE_COLUMNS, match_results
+from app.services.prerank import pre_ranker
+from app.services.scoring_engine import scoring_engine
+from app.services.skill_canonicalizer import skill_canonicalizer
+from app.services.vector_index import vector_index
+from app.utils.lru import LRUCache
+from app.utils.pagination import decode_cursor, encode_cursor
+
+MATCH_APPLICATION_THRESHOLD = 0.7  # Score at which a match becomes a job application
+APPLICATION_KEY = ["candidate_id", "job_id"]
+SQLITE_SECONDS_FORMAT = "%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+
+# Skill key -> ID; the vocabulary is small and rows only change in app.merge_skills
+skill_id_cache = LRUCache(settings.SKILL_CACHE_SIZE)
 
 
 class CandidateService(CRUDBase):
@@ -16,12 +36,18 @@ class CandidateService(CRUDBase):
         skip: int = 0,
         limit: int = 100,
         source: Optional[str] = None,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        sort: str = "created_at",
+        cursor: Optional[str] = None
     ) -> List[Candidate]:
         """
-        Get candidates with optional filters
+        Get candidates with optional filters, skills loaded
+        Pages by keyset: pass the cursor from next_cursor() to continue after the
+        last candidate of the previous page. Sort is "created_at" (oldest first)
+        or "match_score" (best first). skip is only used without a cursor.
+        Raises InvalidCursor for a malformed cursor
         """
-        query = db.query(self.model)
+        query = db.query(self.model).options(selectinload(self.model.skills))
         
         if source:
             query = query.filter(self.model.source == source)
@@ -29,7 +55,60 @@ class CandidateService(CRUDBase):
         if status:
             query = query.filter(self.model.status == status)
         
-        return query.offset(skip).limit(limit).all()
+        if sort == "match_score":
+            if cursor:
+                score, last_id = decode_cursor(cursor, 2)
+                query = query.filter(or_(
+                    self.model.match_score < score,
+                    and_(self.model.match_score == score, self.model.id < last_id)
+                ))
+            query = query.order_by(self.model.match_score.desc(), self.model.id.desc())
+        else:
+            if cursor:
+                created_at, last_id = decode_cursor(cursor, 2)
+                created_at = self._timestamp_param(db, created_at)
+                query = query.filter(or_(
+                    self.model.created_at > created_at,
+                    and_(self.model.created_at == created_at, self.model.id > last_id)
+                ))
+            query = query.order_by(self.model.created_at, self.model.id)
+        
+        if skip and not cursor:
+            query = query.offset(skip)
+        
+        return query.limit(limit).all()
+    
+    def next_cursor(self, candidates: List[Candidate], *, limit: int, sort: str = "created_at") -> Optional[str]:
+        """
+        Cursor for the page after candidates, or None if this was the last page
+        """
+        if not candidates or len(candidates) < limit:
+            return None
+        last = candidates[-1]
+        return encode_cursor([last.match_score if sort == "match_score" else last.created_at, last.id])
+    
+    def _timestamp_param(self, db: Session, value: datetime):
+        """
+        Bind a cursor timestamp so it compares equal to the stored value
+        """
+        if db.get_bind().dialect.name == "sqlite" and not value.microsecond:
+            # SQLite keeps timestamps as text and CURRENT_TIMESTAMP has no fractional part
+            return literal(value, sqlite.DATETIME(storage_format=SQLITE_SECONDS_FORMAT))
+        return value
+    
+    def get_many(self, db: Session, *, ids: List[int]) -> Dict[int, Candidate]:
+        """
+        Get candidates by ID with their skills loaded, keyed by ID
+        """
+        if not ids:
+            return {}
+        candidates = (
+            db.query(self.model)
+            .options(selectinload(self.model.skills))
+            .filter(self.model.id.in_(ids))
+            .all()
+        )
+        return {candidate.id: candidate for candidate in candidates}
     
     def get_by_email(self, db: Session, *, email: str) -> Optional[Candidate]:
         """
@@ -51,6 +130,40 @@ class CandidateService(CRUDBase):
         db.refresh(candidate)
         return candidate
     
+    async def aget(self, db: AsyncSession, id: int) -> Optional[Candidate]:
+        """
+        Get a candidate by ID with skills loaded
+        """
+        result = await db.execute(
+            select(Candidate)
+            .options(selectinload(Candidate.skills))
+            .where(Candidate.id == id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+    
+    async def acreate(self, db: AsyncSession, *, obj_in: CandidateCreate) -> Candidate:
+        """
+        Create a candidate; returned with server defaults and skills loaded
+        """
+        candidate = Candidate(**obj_in.dict())
+        db.add(candidate)
+        await db.commit()
+        return await self.aget(db, id=candidate.id)
+    
+    async def aupdate_status(self, db: AsyncSession, *, candidate_id: int, status: str) -> Candidate:
+        """
+        Update candidate status
+        """
+        candidate = await db.get(Candidate, candidate_id)
+        if not candidate:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        
+        candidate.status = status
+        await db.commit()
+        await db.refresh(candidate)
+        return candidate
+    
     def create_job(self, db: Session, *, obj_in: JobCreate) -> Job:
         """
         Create a new job
@@ -60,7 +173,9 @@ class CandidateService(CRUDBase):
             description=obj_in.description,
             requirements=obj_in.requirements,
             location=obj_in.location,
-            job_type=obj_in.job_type
+            job_type=obj_in.job_type,
+            prerank_top_k=obj_in.prerank_top_k,
+            prerank_min_score=obj_in.prerank_min_score
         )
         
         db.add(job)
@@ -74,6 +189,12 @@ class CandidateService(CRUDBase):
         """
         return db.query(Job).filter(Job.id == id).first()
     
+    async def aget_job(self, db: AsyncSession, *, id: int) -> Optional[Job]:
+        """
+        Get a job by ID
+        """
+        return await db.get(Job, id)
+    
     def update_job(self, db: Session, *, job_id: int, job_in: JobUpdate) -> Job:
         """
         Update job details
@@ -91,65 +212,298 @@ class CandidateService(CRUDBase):
         db.refresh(job)
         return job
     
-    def match_candidates_to_job(self, db: Session, *, job_id: int) -> List[Candidate]:
+    async def match_candidates_to_job(
+        self,
+        db: Session,
+        *,
+        job_id: int,
+        prerank: Optional[bool] = None,
+        use_vector_index: Optional[bool] = None,
+        incremental: bool = False,
+        candidate_ids: Optional[List[int]] = None
+    ) -> List[Candidate]:
         """
         Match existing candidates to a job based on skills and requirements
-        Uses LLM to score candidates
+        The vector index can narrow the pool to the nearest profiles, and a cheap
+        local pre-ranking picks the candidates worth scoring; the LLM then
+        scores them concurrently through the scoring engine
+        
+        In incremental mode only (candidate, job) pairs that were never scored,
+        or whose candidate or job fingerprint changed since, are re-evaluated.
+        candidate_ids restricts the run to those candidates.
+        Returns the candidates matched by this run.
         """
         job = self.get_job(db, id=job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
-        # Get all candidates
-        candidates = db.query(Candidate).all()
+        if prerank is None:
+            prerank = settings.PRERANK_ENABLED
+        if use_vector_index is None:
+            use_vector_index = settings.MATCH_USE_VECTOR_INDEX
+        
+        if candidate_ids is not None:
+            candidate_ids = list(candidate_ids)
+            if not candidate_ids:
+                return []
+        if use_vector_index:
+            nearest = vector_index.search_job(job, k=settings.MATCH_VECTOR_POOL_SIZE)
+            nearest_ids = [candidate_id for candidate_id, _ in nearest]
+            if candidate_ids is not None:
+                allowed = set(candidate_ids)
+                nearest_ids = [candidate_id for candidate_id in nearest_ids if candidate_id in allowed]
+            candidate_ids = nearest_ids
+        if prerank:
+            candidate_ids = pre_ranker.shortlist(db, job, candidate_ids)
+        
+        # Load candidates with skills up front for the prompts
+        query = db.query(Candidate).options(selectinload(Candidate.skills))
+        if candidate_ids is not None:
+            query = query.filter(Candidate.id.in_(candidate_ids))
+        candidates = query.all()
         matched_candidates = []
         
-        for candidate in candidates:
-            # Use LLM to determine match score and feedback
-            match_result = llm_service.evaluate_candidate_job_match(candidate, job)
-            
-            # Update candidate with match score
-            candidate.match_score = match_result["score"]
-            candidate.llm_feedback = match_result["feedback"]
-            db.add(candidate)
-            
-            # Create job application if score is above threshold (e.g., 0.7)
-            if match_result["score"] >= 0.7:
-                job_application = JobApplication(
-                    candidate_id=candidate.id,
-                    job_id=job.id,
-                    status="matched"
+        current_job_fingerprint = job_fingerprint(job)
+        fingerprints = {candidate.id: candidate_fingerprint(candidate) for candidate in candidates}
+        
+        if incremental:
+            matches = {
+                match.candidate_id: match
+                for match in db.query(
+                    CandidateJobMatch.candidate_id,
+                    CandidateJobMatch.score,
+                    CandidateJobMatch.candidate_fingerprint,
+                    CandidateJobMatch.job_fingerprint
+                ).filter(CandidateJobMatch.job_id == job.id)
+            }
+            candidates = [
+                candidate for candidate in candidates
+                if not self._match_is_current(
+                    matches.get(candidate.id), fingerprints[candidate.id], current_job_fingerprint
                 )
-                db.add(job_application)
+            ]
+        
+        # One application per (candidate, job), however often the job is rematched
+        applied = {
+            candidate_id for (candidate_id,) in
+            db.query(JobApplication.candidate_id).filter(JobApplication.job_id == job.id)
+        }
+        staged: List[Dict[str, Any]] = []
+        applications: List[Dict[str, Any]] = []
+        
+        def apply_match(candidate: Candidate, match_result: Dict[str, Any]) -> None:
+            # Record the result with the fingerprints it was computed from
+            staged.append({
+                "candidate_id": candidate.id,
+                "job_id": job.id,
+                "score": match_result["score"],
+                "feedback": match_result["feedback"],
+                "candidate_fingerprint": fingerprints[candidate.id],
+                "job_fingerprint": current_job_fingerprint,
+                "scored_at": datetime.now(timezone.utc)
+            })
+            
+            if match_result["score"] >= MATCH_APPLICATION_THRESHOLD:
+                if candidate.id not in applied:
+                    applications.append({"candidate_id": candidate.id, "job_id": job.id, "status": "matched"})
+                    applied.add(candidate.id)
                 matched_candidates.append(candidate)
         
-        db.commit()
+        def write_matches() -> None:
+            match_results.upsert(db, staged, SCORE_COLUMNS)
+            match_results.refresh_best_scores(db, [row["candidate_id"] for row in staged])
+            # Another session may have applied the candidate since `applied` was read
+            self.add_applications(db, applications)
+            staged.clear()
+            applications.clear()
+        
+        await scoring_engine.score_candidates(
+            db, job, candidates, on_result=apply_match, before_commit=write_matches
+        )
         return matched_candidates
     
+    def _match_is_current(
+        self,
+        match: Any,
+        current_candidate_fingerprint: str,
+        current_job_fingerprint: str
+    ) -> bool:
+        """
+        Whether a stored match result was computed from the current candidate and job
+        """
+        return (
+            match is not None
+            and match.score is not None
+            and match.candidate_fingerprint == current_candidate_fingerprint
+            and match.job_fingerprint == current_job_fingerprint
+        )
+    
     def add_skill(self, db: Session, *, candidate_id: int, skill_name: str, category: Optional[str] = None) -> Skill:
         """
         Add a skill to a candidate
+        A compound of known skills ("HTML/CSS") adds each of them and returns the first
         """
         candidate = self.get(db, id=candidate_id)
         if not candidate:
             raise HTTPException(status_code=404, detail="Candidate not found")
         
-        # Check if skill already exists
-        skill = db.query(Skill).filter(Skill.name == skill_name).first()
-        if not skill:
-            skill = Skill(name=skill_name, category=category)
-            db.add(skill)
-            db.commit()
-            db.refresh(skill)
+        # Reuse the row for any spelling of the skill
+        names = normalize_skill_names([skill_name])
+        if not names:
+            raise HTTPException(status_code=400, detail="Skill name is empty")
+        skill_ids = self.resolve_skill_ids(db, names)
+        skills = [db.get(Skill, skill_ids[skill_canonicalizer.key(name)]) for name in names]
+        
+        # Add skills to candidate if not already added
+        for skill in skills:
+            if category and not skill.category:
+                skill.category = category
+            if skill not in candidate.skills:
+                candidate.skills.append(skill)
+        db.add(candidate)
+        db.commit()
+        db.refresh(candidate)
         
-        # Add skill to candidate if not already added
-        if skill not in candidate.skills:
-            candidate.skills.append(skill)
-            db.add(candidate)
+        return skills[0]
+    
+    def add_skills(self, db: Session, *, candidate_id: int, names: Iterable[str], commit: bool = True) -> Dict[str, int]:
+        """
+        Add several skills to a candidate in one commit
+        Returns the skill IDs keyed by skill_canonicalizer.key of their names
+        """
+        return self.link_skills(db, {candidate_id: names}, commit=commit)
+    
+    def link_skills(
+        self,
+        db: Session,
+        skills_by_candidate: Dict[int, Iterable[str]],
+        *,
+        commit: bool = True
+    ) -> Dict[str, int]:
+        """
+        Link skills to many candidates, creating any skills that don't exist yet
+        """
+        names_by_candidate = {
+            candidate_id: normalize_skill_names(names)
+            for candidate_id, names in skills_by_candidate.items()
+        }
+        skill_ids = self.resolve_skill_ids(
+            db, [name for names in names_by_candidate.values() for name in names]
+        )
+        if not skill_ids:
+            return skill_ids
+        
+        existing = set(
+            db.query(candidate_skills.c.candidate_id, candidate_skills.c.skill_id).filter(
+                candidate_skills.c.candidate_id.in_(names_by_candidate),
+                candidate_skills.c.skill_id.in_(skill_ids.values())
+            )
+        )
+        links = []
+        for candidate_id, names in names_by_candidate.items():
+            for name in names:
+                link = (candidate_id, skill_ids[skill_canonicalizer.key(name)])
+                if link not in existing:
+                    existing.add(link)
+                    links.append({"candidate_id": link[0], "skill_id": link[1]})
+        if links:
+            db.execute(candidate_skills.insert(), links)
+        
+        if commit:
             db.commit()
-            db.refresh(candidate)
+        return skill_ids
+    
+    def resolve_skill_ids(self, db: Session, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Map skill names to IDs, inserting the ones that don't exist yet
+        Names are canonicalised, and an existing row spelled with different
+        case is reused. The result is keyed by skill_canonicalizer.key(name),
+        so any spelling of a name finds its ID. Uses the process-local cache
+        first, then one IN query and one insert
+        """
+        names = {skill_canonicalizer.key(name): name for name in normalize_skill_names(names)}
+        skill_ids = skill_id_cache.get_many(names)
         
-        return skill
+        missing = [key for key in names if key not in skill_ids]
+        if missing:
+            found = {
+                skill_canonicalizer.key(name): skill_id for name, skill_id in
+                db.query(Skill.name, Skill.id).filter(func.lower(Skill.name).in_(missing))
+            }
+            skill_ids.update((key, found[key]) for key in missing if key in found)
+            skill_id_cache.update({key: found[key] for key in missing if key in found})
+            missing = [key for key in missing if key not in skill_ids]
+        
+        if missing:
+            self._insert_skills(db, [names[key] for key in missing])
+            # Not cached until another lookup finds them committed; the caller may still roll back
+            inserted = db.query(Skill.name, Skill.id).filter(Skill.name.in_([names[key] for key in missing]))
+            skill_ids.update((skill_canonicalizer.key(name), skill_id) for name, skill_id in inserted)
+        
+        return skill_ids
+    
+    def add_applications(
+        self, db: Session, rows: List[Dict[str, Any]], update_columns: Sequence[str] = ()
+    ) -> None:
+        """
+        Insert job applications, at most one per (candidate, job)
+        Where the pair already has one, only update_columns are overwritten. Doesn't commit.
+        """
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            statement = (postgresql if dialect == "postgresql" else sqlite).insert(JobApplication)
+            if update_columns:
+                values = {column: statement.excluded[column] for column in update_columns}
+                values["last_updated"] = func.now()
+                statement = statement.on_conflict_do_update(index_elements=APPLICATION_KEY, set_=values)
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=APPLICATION_KEY)
+            db.execute(statement, rows)
+        else:
+            for row in rows:
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(JobApplication), row)
+                except IntegrityError:
+                    if update_columns:
+                        db.execute(
+                            update(JobApplication)
+                            .where(JobApplication.candidate_id == row["candidate_id"], JobApplication.job_id == row["job_id"])
+                            .values({column: row[column] for column in update_columns})
+                        )
+    
+    def _insert_skills(self, db: Session, names: List[str]) -> None:
+        """
+        Insert skills, ignoring names another session inserted concurrently
+        """
+        rows = [{"name": name} for name in names]
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            db.execute(postgresql.insert(Skill).on_conflict_do_nothing(index_elements=["name"]), rows)
+        elif dialect == "sqlite":
+            db.execute(sqlite.insert(Skill).on_conflict_do_nothing(index_elements=["name"]), rows)
+        else:
+            for row in rows:
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(Skill), row)
+                except IntegrityError:
+                    pass
+
+
+def normalize_skill_names(names: Iterable[str]) -> List[str]:
+    """
+    Canonical names of the skills, splitting compounds and dropping blanks and
+    repeats (in any spelling)
+    """
+    normalized = {}
+    for name in names or []:
+        for canonical in skill_canonicalizer.canonical_names(name):
+            normalized.setdefault(canonical.casefold(), canonical)
+    return list(normalized.values())
 
 
-candidate_service = CandidateService(Candidate) 
\ No newline at end of file
+candidate_service = CandidateService(Candidate)
+ 
\ No newline at end of file
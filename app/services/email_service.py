@@ -1,38 +1,43 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional, Dict, Any
-import aiosmtplib
+import logging
+from typing import Optional, Dict
 from datetime import datetime
 
+from app.api.schemas import EmailTemplateParams
 from app.core.config import settings
+from app.services.email_templates import BoundTemplate, RenderedEmail, email_templates
+from app.services.smtp_pool import smtp_pool
+
+logger = logging.getLogger(__name__)
 
 
 class EmailService:
-    async def send_interview_invitation(self, candidate, job=None) -> bool:
+    def prepare_invitation(self, job=None, params: Optional[EmailTemplateParams] = None) -> BoundTemplate:
         """
-        Send interview invitation email to candidate
+        Render the job's parts of an interview invitation once, for any number of candidates
+        Raises UnknownTemplate if params names a template that doesn't exist
         """
-        subject = f"Interview Invitation - {job.title if job else 'Our Company'}"
-        
-        # Construct the email body
-        body = f"""
-        Dear {candidate.first_name} {candidate.last_name},
-        
-        Thank you for your interest in {job.title if job else 'our company'}.
-        
-        Based on your qualifications, we'd like to invite you for an interview. 
-        Please let us know if you're available and interested in this opportunity.
-        
-        {f"Job Description: {job.description}" if job else ""}
-        
-        Best regards,
-        Recruitment Team
+        params = params or EmailTemplateParams()
+        return self._bind(
+            params.template_name,
+            {
+                "job_title": job.title if job else "our company",
+                "job_description": _paragraph(f"Job Description: {job.description}" if job else None),
+            },
+            subject=params.subject,
+            custom_message=params.custom_message
+        )
+
+    async def send_interview_invitation(
+        self,
+        candidate,
+        job=None,
+        params: Optional[EmailTemplateParams] = None
+    ) -> bool:
+        """
+        Send interview invitation email to candidate
         """
-        
-        # Send the email
-        return await self._send_email(candidate.email, subject, body)
-    
+        return await self.send_prepared(self.prepare_invitation(job, params), candidate)
+
     async def schedule_interview(self, candidate, date_time: str, job_id: Optional[int] = None) -> bool:
         """
         Send interview scheduling email to candidate
@@ -41,80 +46,67 @@ class EmailService:
         if job_id:
             # In a real app, you'd look up the job details
             job_title = f"the position (ID: {job_id})"
-        
-        subject = f"Interview Scheduled - {job_title}"
-        
+
         # Parse the date_time string to a readable format
         try:
             interview_dt = datetime.fromisoformat(date_time)
             formatted_dt = interview_dt.strftime("%A, %B %d, %Y at %I:%M %p")
         except:
             formatted_dt = date_time  # Use as-is if parsing fails
-        
-        # Construct the email body
-        body = f"""
-        Dear {candidate.first_name} {candidate.last_name},
-        
-        Your interview for {job_title} has been scheduled for {formatted_dt}.
-        
-        Please let us know if you need to reschedule.
-        
-        Best regards,
-        Recruitment Team
-        """
-        
-        # Send the email
-        return await self._send_email(candidate.email, subject, body)
-    
+
+        template = self._bind("interview_scheduled", {"job_title": job_title, "interview_time": formatted_dt})
+        return await self.send_prepared(template, candidate)
+
     async def send_follow_up(self, candidate, message: str) -> bool:
         """
         Send a follow-up email to a candidate
         """
-        subject = "Follow-up on your application"
-        
-        # Construct the email body
-        body = f"""
-        Dear {candidate.first_name} {candidate.last_name},
-        
-        {message}
-        
-        Best regards,
-        Recruitment Team
+        return await self.send_prepared(self._bind("follow_up", {}, custom_message=message), candidate)
+
+    async def send_prepared(self, template: BoundTemplate, candidate) -> bool:
+        """
+        Send a bound template to one candidate
         """
-        
-        # Send the email
-        return await self._send_email(candidate.email, subject, body)
-    
-    async def _send_email(self, to_email: str, subject: str, body: str) -> bool:
+        email = template.render(candidate.email, {
+            "first_name": candidate.first_name,
+            "last_name": candidate.last_name,
+        })
+        return await self._send_email(template, email)
+
+    def _bind(
+        self,
+        template_name: str,
+        context: Dict[str, str],
+        *,
+        subject: Optional[str] = None,
+        custom_message: Optional[str] = None
+    ) -> BoundTemplate:
+        context = {**context, "custom_message": _paragraph(custom_message)}
+        return email_templates.get(template_name).bind(context, sender=settings.SMTP_USER, subject=subject)
+
+    async def _send_email(self, template: BoundTemplate, email: RenderedEmail) -> bool:
         """
-        Send an email using SMTP
+        Send an email over a pooled SMTP connection
         """
         if not settings.SMTP_USER or not settings.SMTP_PASSWORD:
-            # If SMTP is not configured, print the email and return True (for development)
-            print(f"\n--- EMAIL ---\nTo: {to_email}\nSubject: {subject}\n\n{body}\n------------\n")
+            # If SMTP is not configured, log the email and return True (for development)
+            logger.info(f"\n--- EMAIL ---\nTo: {email.to}\nSubject: {email.subject}\n\n{email.body}\n------------\n")
             return True
-        
-        # Create message
-        message = MIMEMultipart()
-        message["From"] = settings.SMTP_USER
-        message["To"] = to_email
-        message["Subject"] = subject
-        message.attach(MIMEText(body, "plain"))
-        
+
         try:
             # Send the email
-            await aiosmtplib.send(
-                message,
-                hostname=settings.SMTP_HOST,
-                port=settings.SMTP_PORT,
-                username=settings.SMTP_USER,
-                password=settings.SMTP_PASSWORD,
-                use_tls=True
-            )
+            await smtp_pool.sendmail(template.sender, [email.to], template.build(email))
             return True
         except Exception as e:
-            print(f"Error sending email: {str(e)}")
+            logger.error(f"Error sending email to {email.to}: {str(e)}")
             return False
 
 
-email_service = EmailService() 
\ No newline at end of file
+def _paragraph(text: Optional[str]) -> str:
+    """
+    An optional block of a template, with the blank line that follows it
+    """
+    return f"{text.strip()}\n\n" if text and text.strip() else ""
+
+
+email_service = EmailService()
@@ -0,0 +1,166 @@
+import logging
+import quopri
+from dataclasses import dataclass
+from email.header import Header
+from pathlib import Path
+from string import Template
+from typing import Dict, List, Mapping, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SUBJECT_PREFIX = "Subject:"
+
+
+class UnknownTemplate(KeyError):
+    """
+    No email template is registered under the name
+    """
+
+
+@dataclass
+class RenderedEmail:
+    to: str
+    subject: str
+    body: str
+
+
+class MessageSkeleton:
+    """
+    The headers every message of a send shares, encoded once
+    Per message only To, the body and a per-recipient subject are encoded.
+    """
+    def __init__(self, sender: str, subject: Optional[str] = None):
+        self.sender = sender
+        self.subject = subject
+        headers = [_header("From", sender)]
+        if subject is not None:
+            headers.append(_header("Subject", subject))
+        headers += [
+            "MIME-Version: 1.0",
+            'Content-Type: text/plain; charset="utf-8"',
+            "Content-Transfer-Encoding: quoted-printable",
+        ]
+        self._headers = ("\r\n".join(headers) + "\r\n").encode("ascii")
+
+    def build(self, email: RenderedEmail) -> bytes:
+        """
+        The message as it goes on the wire
+        """
+        headers = [_header("To", email.to)]
+        if self.subject is None:
+            headers.append(_header("Subject", email.subject))
+        return b"".join([
+            self._headers,
+            ("\r\n".join(headers) + "\r\n\r\n").encode("ascii"),
+            quopri.encodestring(email.body.encode("utf-8")),
+        ])
+
+
+class BoundTemplate:
+    """
+    A template with its recipient-independent parts (the job, a custom message)
+    already substituted, and the message skeleton its recipients share
+    """
+    def __init__(self, name: str, subject: Template, body: Template, sender: str):
+        self.name = name
+        self.sender = sender
+        self._subject = subject
+        self._body = body
+        self._static_subject = None if _has_placeholders(subject) else subject.safe_substitute()
+        self.skeleton = MessageSkeleton(sender, self._static_subject)
+
+    def render(self, to: str, context: Mapping[str, str]) -> RenderedEmail:
+        """
+        Fill in the per-recipient placeholders
+        """
+        subject = self._static_subject
+        if subject is None:
+            subject = self._subject.safe_substitute(context)
+        return RenderedEmail(to=to, subject=subject, body=self._body.safe_substitute(context))
+
+    def build(self, email: RenderedEmail) -> bytes:
+        return self.skeleton.build(email)
+
+
+class EmailTemplate:
+    """
+    A named subject and body, compiled once
+    """
+    def __init__(self, name: str, subject: str, body: str):
+        self.name = name
+        self.subject = Template(subject)
+        self.body = Template(body)
+
+    def bind(self, context: Mapping[str, str], *, sender: str, subject: Optional[str] = None) -> BoundTemplate:
+        """
+        Substitute the context shared by every recipient of a send
+        A subject overrides the template's own, and may use the same placeholders.
+        """
+        # Escaped so a "$" in, say, a job description survives the per-recipient pass
+        escaped = {key: str(value).replace("$", "$$") for key, value in context.items()}
+        subject_template = Template(subject) if subject else self.subject
+        return BoundTemplate(
+            self.name,
+            Template(subject_template.safe_substitute(escaped)),
+            Template(self.body.safe_substitute(escaped)),
+            sender
+        )
+
+
+class TemplateRegistry:
+    """
+    Email templates loaded once from a directory of <name>.txt files
+    Each file is a "Subject: ..." line, a blank line and the body, with
+    string.Template ${placeholders}.
+    """
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._templates: Optional[Dict[str, EmailTemplate]] = None
+
+    def get(self, name: str) -> EmailTemplate:
+        try:
+            return self._load()[name]
+        except KeyError:
+            raise UnknownTemplate(name) from None
+
+    def names(self) -> List[str]:
+        return sorted(self._load())
+
+    def reload(self) -> None:
+        self._templates = None
+
+    def _load(self) -> Dict[str, EmailTemplate]:
+        if self._templates is None:
+            templates = {}
+            for path in sorted(self.directory.glob("*.txt")):
+                templates[path.stem] = _parse(path)
+            logger.info("Loaded %d email templates from %s", len(templates), self.directory)
+            self._templates = templates
+        return self._templates
+
+
+def _parse(path: Path) -> EmailTemplate:
+    first_line, _, body = path.read_text(encoding="utf-8").partition("\n")
+    if not first_line.startswith(SUBJECT_PREFIX):
+        raise ValueError(f"Email template {path} must start with a '{SUBJECT_PREFIX}' line")
+    return EmailTemplate(path.stem, first_line[len(SUBJECT_PREFIX):].strip(), body.lstrip("\n"))
+
+
+def _has_placeholders(template: Template) -> bool:
+    return any(
+        match.group("named") or match.group("braced")
+        for match in template.pattern.finditer(template.template)
+    )
+
+
+def _header(name: str, value: str) -> str:
+    # Folded onto one line, so a value can't inject headers of its own
+    value = " ".join(value.splitlines())
+    if value.isascii():
+        return f"{name}: {value}"
+    return f"{name}: {Header(value, 'utf-8').encode()}"
+
+
+email_templates = TemplateRegistry(settings.EMAIL_TEMPLATE_DIR)
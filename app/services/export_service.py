@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import zlib
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.candidate import Candidate, Skill, candidate_skills
+
+try:
+    import orjson
+except ImportError:  # Optional; the standard library encoder is used instead
+    orjson = None
+
+EXPORT_COLUMNS = (
+    Candidate.id,
+    Candidate.first_name,
+    Candidate.last_name,
+    Candidate.email,
+    Candidate.phone,
+    Candidate.source,
+    Candidate.status,
+    Candidate.experience_years,
+    Candidate.education,
+    Candidate.current_position,
+    Candidate.current_company,
+    Candidate.match_score,
+    Candidate.created_at,
+    Candidate.updated_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS] + ["skills"]
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class ExportService:
+    """
+    Streams candidates as NDJSON or CSV straight from column tuples
+    Rows are read through a server-side cursor a batch at a time, so memory
+    use doesn't grow with the size of the table
+    """
+    def iter_candidates(
+        self,
+        db: Session,
+        *,
+        format: str = "ndjson",
+        source: Optional[str] = None,
+        status: Optional[str] = None,
+        compress: bool = False
+    ) -> Iterator[bytes]:
+        """
+        Yield the encoded export in chunks, one chunk per batch of rows
+        """
+        chunks = self._iter_csv(db, source, status) if format == "csv" else self._iter_ndjson(db, source, status)
+        return self._gzip(chunks) if compress else chunks
+
+    def _iter_rows(self, db: Session, source: Optional[str], status: Optional[str]) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Batches of candidate rows as dicts, with their skill names
+        """
+        query = select(*EXPORT_COLUMNS).order_by(Candidate.id)
+        if source:
+            query = query.where(Candidate.source == source)
+        if status:
+            query = query.where(Candidate.status == status)
+
+        result = db.execute(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        for partition in result.partitions():
+            rows = [dict(row._mapping) for row in partition]
+
+            # One query per batch for the skills, instead of one per candidate
+            skills = defaultdict(list)
+            skill_rows = db.execute(
+                select(candidate_skills.c.candidate_id, Skill.name)
+                .join(Skill, Skill.id == candidate_skills.c.skill_id)
+                .where(candidate_skills.c.candidate_id.in_([row["id"] for row in rows]))
+                .order_by(candidate_skills.c.candidate_id, Skill.name)
+            )
+            for candidate_id, name in skill_rows:
+                skills[candidate_id].append(name)
+            for row in rows:
+                row["skills"] = skills.get(row["id"], [])
+
+            yield rows
+
+    def _iter_ndjson(self, db: Session, source: Optional[str], status: Optional[str]) -> Iterator[bytes]:
+        for rows in self._iter_rows(db, source, status):
+            yield b"".join(_dumps(row) + b"\n" for row in rows)
+
+    def _iter_csv(self, db: Session, source: Optional[str], status: Optional[str]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for rows in self._iter_rows(db, source, status):
+            for row in rows:
+                writer.writerow([
+                    ";".join(row["skills"]) if field == "skills" else _csv_value(row[field])
+                    for field in EXPORT_FIELDS
+                ])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        # Header only, for an empty export
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def _gzip(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+
+def _dumps(row: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(row)
+    return json.dumps(row, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+export_service = ExportService()
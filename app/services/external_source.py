@@ -1,18 +1,32 @@
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
+from sqlalchemy import String, case, func, insert, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-import aiohttp
 import asyncio
+import logging
 import os
 
 from app.models.candidate import Candidate
 from app.services.candidate_service import candidate_service
+from app.services.http_client import http_client
+from app.services.vector_index import vector_index
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Provider fields copied onto Candidate
+CANDIDATE_FIELDS = (
+    "first_name", "last_name", "email", "phone",
+    "current_position", "current_company", "experience_years", "education"
+)
+
 
 class ExternalSourceService:
     async def search_candidates(self, db: Session, job_id: int, sources: List[str]) -> Dict[str, Any]:
         """
         Search for candidates from external sources based on job requirements
+        Pages are written as they arrive, then the imported candidates are matched once
         """
         # Get the job details
         job = candidate_service.get_job(db, id=job_id)
@@ -22,91 +36,191 @@ class ExternalSourceService:
         # Initialize results dict
         results = {
             "job_id": job_id,
-            "sources": {},
+            "sources": {source: {"count": 0, "candidates": []} for source in sources},
             "total_candidates_found": 0
         }
         
-        # Execute searches in parallel
-        tasks = []
-        for source in sources:
-            if source == "linkedin":
-                tasks.append(self._search_linkedin(job))
-            elif source == "cvlibrary":
-                tasks.append(self._search_cvlibrary(job))
-            elif source == "naukri":
-                tasks.append(self._search_naukri(job))
-        
-        # Wait for all search tasks to complete
-        search_results = await asyncio.gather(*tasks)
-        
-        # Process results and add candidates to database
-        for i, source in enumerate(sources):
-            source_candidates = search_results[i]
-            results["sources"][source] = {
-                "count": len(source_candidates),
-                "candidates": []
-            }
-            
-            # Add each candidate to database if they don't exist
-            for candidate_data in source_candidates:
-                try:
-                    # Check if candidate with this email already exists
-                    existing_candidate = candidate_service.get_by_email(db, email=candidate_data["email"])
-                    
-                    if existing_candidate:
-                        # Update existing candidate
-                        for key, value in candidate_data.items():
-                            if key != "email" and value:  # Don't update email and only update non-empty fields
-                                setattr(existing_candidate, key, value)
-                        
-                        # Set the source if it's not already included
-                        if existing_candidate.source != source and source not in existing_candidate.source:
-                            existing_candidate.source = f"{existing_candidate.source},{source}"
-                        
-                        db.add(existing_candidate)
-                        candidate = existing_candidate
-                    else:
-                        # Create new candidate
-                        candidate_data["source"] = source
-                        candidate = Candidate(**candidate_data)
-                        db.add(candidate)
-                    
-                    db.commit()
-                    db.refresh(candidate)
-                    
-                    # Create job application
-                    candidate_service.match_candidates_to_job(db, job_id=job_id)
-                    
-                    # Add to results
-                    results["sources"][source]["candidates"].append({
-                        "id": candidate.id,
-                        "name": f"{candidate.first_name} {candidate.last_name}",
-                        "email": candidate.email
-                    })
+        searches = {
+            "linkedin": self._search_linkedin,
+            "cvlibrary": self._search_cvlibrary,
+            "naukri": self._search_naukri
+        }
+        pages: asyncio.Queue = asyncio.Queue(maxsize=2 * len(sources) or 1)
+        
+        async def fetch(source: str) -> None:
+            try:
+                async for page in searches[source](job):
+                    await pages.put((source, page))
+            except Exception as e:
+                logger.error("Error searching %s: %s", source, e)
+            finally:
+                await pages.put((source, None))
+        
+        # Search all sources in parallel
+        fetchers = [asyncio.create_task(fetch(source)) for source in sources if source in searches]
+        imported_ids = set()
+        try:
+            remaining = len(fetchers)
+            while remaining:
+                source, page = await pages.get()
+                if page is None:
+                    remaining -= 1
+                    continue
                 
-                except Exception as e:
-                    print(f"Error adding candidate from {source}: {str(e)}")
+                results["sources"][source]["count"] += len(page)
+                results["total_candidates_found"] += len(page)
+                imported = self._write_page(db, source, page)
+                results["sources"][source]["candidates"].extend(imported)
+                imported_ids.update(candidate["id"] for candidate in imported)
+        finally:
+            for fetcher in fetchers:
+                fetcher.cancel()
+        
+        if imported_ids:
+            indexed = candidate_service.get_many(db, ids=sorted(imported_ids))
+            vector_index.upsert_many(
+                (candidate.id, vector_index.candidate_text(candidate)) for candidate in indexed.values()
+            )
             
-            results["total_candidates_found"] += len(source_candidates)
+            # One matching pass; pairs whose score is still current aren't sent to the LLM again
+            await candidate_service.match_candidates_to_job(
+                db, job_id=job_id, incremental=True, candidate_ids=sorted(imported_ids)
+            )
         
         return results
     
-    async def _search_linkedin(self, job) -> List[Dict[str, Any]]:
+    def _write_page(self, db: Session, source: str, page: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Search for candidates on LinkedIn
+        Insert or merge one page of a source's candidates in a single commit
+        Rows are upserted on email in one statement, so a candidate another
+        search imports at the same time is merged rather than duplicated. If
+        the page can't be written, its rows are retried one by one and only
+        the failing ones are skipped.
+        Returns the imported candidates for the results
         """
-        if not settings.LINKEDIN_API_KEY:
+        rows = self._page_rows(source, page)
+        if not rows:
             return []
         
+        try:
+            written = self._upsert(db, rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Writing a page of %d candidates from %s failed, retrying one by one: %s", len(rows), source, e)
+            written = []
+            for row in rows:
+                try:
+                    with db.begin_nested():
+                        written.extend(self._upsert(db, [row]))
+                except Exception as e:
+                    logger.error("Skipping candidate %s from %s: %s", row["email"], source, e)
+            try:
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error("Error adding candidates from %s: %s", source, e)
+                return []
+        
+        return [
+            {"id": candidate.id, "name": f"{candidate.first_name} {candidate.last_name}", "email": candidate.email}
+            for candidate in written
+        ]
+    
+    def _page_rows(self, source: str, page: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert rows for a page, one per email (later records fill in earlier ones)
+        An upsert can't touch the same row twice, and every row needs the same keys
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        for candidate_data in page:
+            email = candidate_data.get("email")
+            if not email:
+                continue
+            row = rows.setdefault(email, dict.fromkeys(CANDIDATE_FIELDS))
+            row.update(
+                (key, value) for key, value in candidate_data.items()
+                if key in CANDIDATE_FIELDS and value not in (None, "")
+            )
+            row["source"] = source
+        return list(rows.values())
+    
+    def _upsert(self, db: Session, rows: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Insert candidates or merge them into the existing ones with the same email
+        Returns (id, email, first_name, last_name) of every row. Doesn't commit.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            statement = (postgresql if dialect == "postgresql" else sqlite).insert(Candidate)
+            statement = statement.on_conflict_do_update(
+                index_elements=["email"], set_=self._merge_values(statement.excluded)
+            ).returning(Candidate.id, Candidate.email, Candidate.first_name, Candidate.last_name)
+            return db.execute(statement, rows).all()
+        return [self._upsert_row(db, row) for row in rows]
+    
+    def _upsert_row(self, db: Session, row: Dict[str, Any]) -> Any:
+        table = Candidate.__table__
+        values = self._merge_values({key: literal(value, table.c[key].type) for key, value in row.items()})
+        merge = update(Candidate).where(Candidate.email == row["email"]).values(values)
+        if not db.execute(merge.execution_options(synchronize_session=False)).rowcount:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(Candidate), row)
+            except IntegrityError:
+                # Inserted by another session in between
+                db.execute(merge.execution_options(synchronize_session=False))
+        return db.execute(
+            select(Candidate.id, Candidate.email, Candidate.first_name, Candidate.last_name)
+            .where(Candidate.email == row["email"])
+        ).one()
+    
+    def _merge_values(self, incoming: Any) -> Dict[str, Any]:
+        """
+        SET clause merging an imported record into the existing candidate
+        Non-empty incoming fields overwrite, and the source is added to the candidate's sources
+        """
+        table = Candidate.__table__
+        values: Dict[str, Any] = {}
+        for key in CANDIDATE_FIELDS:
+            if key == "email":
+                continue
+            value = incoming[key]
+            if isinstance(table.c[key].type, String):
+                value = func.nullif(value, "")
+            values[key] = func.coalesce(value, table.c[key])
+        
+        source = incoming["source"]
+        values["source"] = case(
+            (or_(table.c.source.is_(None), table.c.source == ""), source),
+            (table.c.source.contains(source), table.c.source),
+            else_=table.c.source + "," + source
+        )
+        values["updated_at"] = func.now()
+        return values
+    
+    async def _search_linkedin(self, job) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Search for candidates on LinkedIn, one page at a time
+        """
+        if not settings.LINKEDIN_API_KEY:
+            return
+        
         # Extract keywords from job requirements
         keywords = self._extract_job_keywords(job.requirements)
         
-        # In a real implementation, this would call the LinkedIn API
-        # This is a placeholder that returns mock data
+        if settings.LINKEDIN_API_URL:
+            async for page in self._iter_pages(
+                "linkedin", settings.LINKEDIN_API_URL, settings.LINKEDIN_API_KEY, keywords, job.location
+            ):
+                yield page
+            return
+        
+        # No API endpoint configured; return placeholder data
         await asyncio.sleep(1)  # Simulate API delay
         
         # Return mock candidate data
-        return [
+        yield [
             {
                 "first_name": "John",
                 "last_name": "Doe",
@@ -127,22 +241,28 @@ class ExternalSourceService:
             }
         ]
     
-    async def _search_cvlibrary(self, job) -> List[Dict[str, Any]]:
+    async def _search_cvlibrary(self, job) -> AsyncIterator[List[Dict[str, Any]]]:
         """
-        Search for candidates on CVLibrary
+        Search for candidates on CVLibrary, one page at a time
         """
         if not settings.CVLIBRARY_API_KEY:
-            return []
+            return
         
         # Extract keywords from job requirements
         keywords = self._extract_job_keywords(job.requirements)
         
-        # In a real implementation, this would call the CVLibrary API
-        # This is a placeholder that returns mock data
+        if settings.CVLIBRARY_API_URL:
+            async for page in self._iter_pages(
+                "cvlibrary", settings.CVLIBRARY_API_URL, settings.CVLIBRARY_API_KEY, keywords, job.location
+            ):
+                yield page
+            return
+        
+        # No API endpoint configured; return placeholder data
         await asyncio.sleep(1)  # Simulate API delay
         
         # Return mock candidate data
-        return [
+        yield [
             {
                 "first_name": "Michael",
                 "last_name": "Johnson",
@@ -154,22 +274,28 @@ class ExternalSourceService:
             }
         ]
     
-    async def _search_naukri(self, job) -> List[Dict[str, Any]]:
+    async def _search_naukri(self, job) -> AsyncIterator[List[Dict[str, Any]]]:
         """
-        Search for candidates on Naukri
+        Search for candidates on Naukri, one page at a time
         """
         if not settings.NAUKRI_API_KEY:
-            return []
+            return
         
         # Extract keywords from job requirements
         keywords = self._extract_job_keywords(job.requirements)
         
-        # In a real implementation, this would call the Naukri API
-        # This is a placeholder that returns mock data
+        if settings.NAUKRI_API_URL:
+            async for page in self._iter_pages(
+                "naukri", settings.NAUKRI_API_URL, settings.NAUKRI_API_KEY, keywords, job.location
+            ):
+                yield page
+            return
+        
+        # No API endpoint configured; return placeholder data
         await asyncio.sleep(1)  # Simulate API delay
         
         # Return mock candidate data
-        return [
+        yield [
             {
                 "first_name": "Priya",
                 "last_name": "Patel",
@@ -190,6 +316,42 @@ class ExternalSourceService:
             }
         ]
     
+    async def _iter_pages(
+        self,
+        source: str,
+        url: str,
+        api_key: str,
+        keywords: List[str],
+        location: Optional[str] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Page through a provider's candidate search
+        Providers return {"candidates": [...], "next_page": <page number or null>}
+        """
+        page_number = 1
+        for _ in range(settings.EXTERNAL_MAX_PAGES):
+            params = {
+                "keywords": ",".join(keywords),
+                "page": page_number,
+                "page_size": settings.EXTERNAL_PAGE_SIZE
+            }
+            if location:
+                params["location"] = location
+            
+            data = await http_client.get_json(
+                source, url, params=params, headers={"Authorization": f"Bearer {api_key}"}
+            )
+            candidates = [
+                {key: value for key, value in candidate_data.items() if key in CANDIDATE_FIELDS}
+                for candidate_data in data.get("candidates") or []
+            ]
+            if candidates:
+                yield candidates
+            
+            if not data.get("next_page"):
+                return
+            page_number = data["next_page"]
+    
     def _extract_job_keywords(self, requirements: str) -> List[str]:
         """
         Extract keywords from job requirements for searching
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import RESUME_EXTRACTION_SECONDS
+from app.services.text_extraction import extract_text, limit_worker_memory
+from app.utils.slots import SharedSemaphore
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+class ExtractionPool:
+    """
+    Runs resume text extraction in worker processes so PDF/DOCX parsing never
+    blocks the event loop. Hung or crashed workers are killed and replaced.
+    At most one file per worker is submitted at a time, so the per-file timeout
+    starts when a worker picks the file up and doesn't count time spent queued.
+    """
+    def __init__(self, workers: int, timeout: float, max_pages: int, max_memory_mb: int):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Shared by the event loops of all the worker's consumers
+        self._slots = SharedSemaphore(workers)
+        # Files running in each pool, and retired pools with a hung worker
+        # that are killed once their other files have finished
+        self._running: Dict[ProcessPoolExecutor, int] = {}
+        self._hung: Set[ProcessPoolExecutor] = set()
+
+        # Metrics
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.recycled = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    async def extract(self, file_path: str, max_chars: Optional[int] = None) -> str:
+        """
+        Extract text from a resume file in a worker process
+        With max_chars the worker stops reading the document once it has enough text.
+        Raises ExtractionTimeout if the file takes longer than the per-file timeout
+        """
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            async with self._slots:
+                for attempt in range(2):
+                    executor = self._get_executor()
+                    future = loop.run_in_executor(executor, extract_text, file_path, self.max_pages, max_chars)
+                    self._job_started(executor)
+                    try:
+                        text = await asyncio.wait_for(future, timeout=self.timeout)
+                    except asyncio.TimeoutError:
+                        self.timed_out += 1
+                        self._retire(executor, hung=True)
+                        raise ExtractionTimeout(f"Extraction of {file_path} timed out after {self.timeout}s")
+                    except BrokenProcessPool:
+                        # A worker died (e.g. hit the memory cap) and the pool failed
+                        # its other files too; replace the pool and retry once
+                        self._retire(executor)
+                        if attempt:
+                            raise
+                        continue
+                    finally:
+                        self._job_finished(executor)
+
+                    elapsed = time.perf_counter() - started
+                    self.completed += 1
+                    self.total_seconds += elapsed
+                    self.max_seconds = max(self.max_seconds, elapsed)
+                    RESUME_EXTRACTION_SECONDS.labels("ok").observe(elapsed)
+                    return text
+        except Exception:
+            self.failed += 1
+            RESUME_EXTRACTION_SECONDS.labels("error").observe(time.perf_counter() - started)
+            raise
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Queue depth and extraction timings
+        """
+        return {
+            "workers": self.workers,
+            "in_flight": min(self.pending, self.workers),
+            "queue_depth": max(0, self.pending - self.workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "recycled": self.recycled,
+            "avg_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+            "max_seconds": self.max_seconds,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            hung = list(self._hung)
+            self._hung.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for executor in hung:
+            self._kill(executor)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=limit_worker_memory,
+                    initargs=(self.max_memory_mb,)
+                )
+            return self._executor
+
+    def _job_started(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            self._running[executor] = self._running.get(executor, 0) + 1
+
+    def _job_finished(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            running = self._running.get(executor, 0) - 1
+            if running > 0:
+                self._running[executor] = running
+                return
+            self._running.pop(executor, None)
+            if executor not in self._hung:
+                return
+            self._hung.discard(executor)
+        self._kill(executor)
+
+    def _retire(self, executor: ProcessPoolExecutor, hung: bool = False) -> None:
+        """
+        Stop sending files to a hung or broken pool; the next call starts a fresh one
+        A hung pool is only killed once its other running files have finished, so
+        one hung file doesn't fail the files sharing its pool.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.recycled += 1
+                logger.warning("Recycling resume extraction pool")
+            if hung:
+                self._hung.add(executor)
+                return
+        # A broken pool has already failed its files and lost its workers
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _kill(self, executor: ProcessPoolExecutor) -> None:
+        # shutdown() waits for running files, so a hung worker has to be killed
+        kill_workers = getattr(executor, "kill_workers", None)  # Python 3.14+
+        if kill_workers is not None:
+            kill_workers()
+            return
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+extraction_pool = ExtractionPool(
+    workers=settings.EXTRACTION_WORKERS,
+    timeout=settings.EXTRACTION_TIMEOUT_SECONDS,
+    max_pages=settings.EXTRACTION_MAX_PAGES,
+    max_memory_mb=settings.EXTRACTION_MAX_MEMORY_MB
+)
@@ -0,0 +1,29 @@
+import hashlib
+import json
+
+
+def candidate_fingerprint(candidate) -> str:
+    """
+    Hash of the candidate fields that go into match prompts
+    """
+    return _digest([
+        candidate.first_name,
+        candidate.last_name,
+        candidate.experience_years,
+        candidate.education,
+        candidate.current_position,
+        candidate.current_company,
+        sorted(skill.name for skill in candidate.skills)
+    ])
+
+
+def job_fingerprint(job) -> str:
+    """
+    Hash of the job fields that go into match prompts
+    """
+    return _digest([job.title, job.description, job.requirements, job.location, job.job_type])
+
+
+def _digest(values) -> str:
+    payload = json.dumps(values, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.metrics import EXTERNAL_REQUEST_SECONDS, timed
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class ExternalAPIError(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average, with bursts of up to `capacity`
+    Shared by every event loop in the process: a caller reserves the next
+    token under a thread lock and sleeps until it is due.
+    """
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Below zero the token is borrowed from the future; wait until it's refilled
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a source after repeated failures, then lets a single trial
+    request through once the reset period has passed
+    Shared by every event loop in the process, so its state is kept under a thread lock
+    """
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def acquire(self) -> Optional[str]:
+        """
+        Permission to send a request: "request" while closed, "trial" for the one
+        request let through while half-open, None while open or while the trial
+        is still in flight. A trial must be ended with end_trial().
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return "request"
+            if state == "open" or self._trial_in_flight:
+                return None
+            self._trial_in_flight = True
+            return "trial"
+
+    def end_trial(self) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class ExternalHTTPClient:
+    """
+    Shared, connection-pooled HTTP client for external candidate sources
+    Every source gets its own rate limit and circuit breaker; 429 and 5xx
+    responses are retried with exponential backoff
+    """
+    def __init__(self):
+        # Sessions are bound to the loop that created them: the API's, or one per worker consumer
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    async def get_json(
+        self,
+        source: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Any:
+        """
+        GET a JSON document from a source
+        Raises CircuitOpenError while the source is cut off, ExternalAPIError otherwise
+        """
+        with timed(EXTERNAL_REQUEST_SECONDS, source=source):
+            return await self._get_json(source, url, params=params, headers=headers)
+
+    async def _get_json(
+        self,
+        source: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]]
+    ) -> Any:
+        session = await self._get_session()
+        breaker = self._breaker(source)
+        bucket = self._bucket(source)
+
+        for attempt in range(settings.EXTERNAL_MAX_RETRIES + 1):
+            permit = breaker.acquire()
+            if permit is None:
+                raise CircuitOpenError(f"Circuit open for {source}; not calling {url}")
+            try:
+                await bucket.acquire()
+
+                retry_after = None
+                try:
+                    async with session.get(url, params=params, headers=headers) as response:
+                        if response.status < 400:
+                            data = await response.json(content_type=None)
+                            breaker.record_success()
+                            return data
+                        error = f"HTTP {response.status}"
+                        if response.status not in RETRY_STATUSES:
+                            # The request itself is wrong; retrying won't help
+                            raise ExternalAPIError(f"{source} returned {error} for {url}")
+                        retry_after = _retry_after(response.headers.get("Retry-After"))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = f"{type(e).__name__}: {e}"
+
+                breaker.record_failure()
+            finally:
+                if permit == "trial":
+                    breaker.end_trial()
+
+            if attempt == settings.EXTERNAL_MAX_RETRIES:
+                break
+
+            delay = retry_after
+            if delay is None:
+                delay = settings.EXTERNAL_RETRY_BACKOFF_SECONDS * 2 ** attempt
+                delay *= random.uniform(0.5, 1.5)  # Jitter so sources don't retry in lockstep
+            logger.warning("%s request failed (%s); retrying in %.1fs", source, error, delay)
+            await asyncio.sleep(delay)
+
+        raise ExternalAPIError(f"{source} request to {url} failed after retries: {error}")
+
+    def circuit_state(self, source: str) -> str:
+        return self._breaker(source).state
+
+    async def close(self) -> None:
+        """
+        Close the running event loop's session
+        """
+        with self._lock:
+            session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # Sessions of loops that ended without close(), e.g. a finished asyncio.run()
+            stale = [self._sessions.pop(other) for other in list(self._sessions) if other.is_closed()]
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                session = self._sessions[loop] = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=settings.EXTERNAL_HTTP_POOL_SIZE),
+                    timeout=aiohttp.ClientTimeout(total=settings.EXTERNAL_HTTP_TIMEOUT_SECONDS)
+                )
+        for old in stale:
+            await old.close()
+        return session
+
+    def _bucket(self, source: str) -> TokenBucket:
+        with self._lock:
+            if source not in self._buckets:
+                self._buckets[source] = TokenBucket(
+                    settings.EXTERNAL_RATE_LIMIT_PER_SECOND, settings.EXTERNAL_RATE_LIMIT_BURST
+                )
+            return self._buckets[source]
+
+    def _breaker(self, source: str) -> CircuitBreaker:
+        with self._lock:
+            if source not in self._breakers:
+                self._breakers[source] = CircuitBreaker(
+                    settings.EXTERNAL_CIRCUIT_FAILURE_THRESHOLD, settings.EXTERNAL_CIRCUIT_RESET_SECONDS
+                )
+            return self._breakers[source]
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return min(float(value), 60.0) if value is not None else None
+    except ValueError:
+        return None
+
+
+http_client = ExternalHTTPClient()
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import LLM_CACHE_LOOKUPS
+
+# Run eviction every N writes rather than on every insert
+EVICTION_INTERVAL = 100
+
+
+class LLMCache:
+    """
+    Disk-backed cache of LLM replies keyed by a hash of the request
+    Stored in a local SQLite file with size- and age-based eviction; lookups
+    are counted in the llm_cache_lookups metric. Calls block on disk I/O, so
+    async code runs them in a thread.
+    """
+    def __init__(self, path: Path, max_entries: int, max_age_seconds: int):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str, temperature: float) -> str:
+        """
+        Content address for an LLM request
+        """
+        payload = json.dumps([model, system_prompt, prompt, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached reply for key, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                LLM_CACHE_LOOKUPS.labels("miss").inc()
+                return None
+
+            conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (now, key))
+        LLM_CACHE_LOOKUPS.labels("hit").inc()
+        return row[0]
+
+    def set(self, key: str, response: str) -> bool:
+        """
+        Store a reply if it is a non-empty JSON document
+        Returns whether the reply was cached
+        """
+        try:
+            parsed = json.loads(response)
+        except (TypeError, ValueError):
+            return False
+        if not parsed:
+            return False
+
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self._writes += 1
+            if self._writes % EVICTION_INTERVAL == 0:
+                self._evict(conn, now)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Current size; hits and misses are in the llm_cache_lookups metric
+        """
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {"entries": entries}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM llm_cache")
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.max_age_seconds,))
+        conn.execute(
+            """
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.path.parent, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used_at ON llm_cache (last_used_at)")
+            self._conn = conn
+        return self._conn
+
+
+llm_cache = LLMCache(
+    path=settings.LLM_CACHE_PATH,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    max_age_seconds=settings.LLM_CACHE_MAX_AGE_SECONDS
+)
@@ -1,7 +1,18 @@
 import openai
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+import asyncio
 import json
+import logging
 from app.core.config import settings
+from app.core.metrics import LLM_REQUEST_SECONDS, LLM_TOKENS, timed
+from app.services.llm_cache import llm_cache
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a recruitment assistant that analyzes resumes and job descriptions."
+LLM_TEMPERATURE = 0.1  # Low temperature for more consistent results
+RESUME_CHAR_LIMIT = 4000  # Resume text sent for extraction, to avoid token issues
+BATCH_REPLY_TOKENS_PER_CANDIDATE = 80  # Budget reserved for each candidate's score and feedback
 
 
 class LLMService:
@@ -11,25 +22,69 @@ class LLMService:
         """
         if settings.LLM_API_KEY:
             openai.api_key = settings.LLM_API_KEY
+        if settings.LLM_API_BASE:
+            openai.api_base = settings.LLM_API_BASE
     
     def extract_resume_information(self, resume_text: str) -> Dict[str, Any]:
         """
         Extract structured information from resume text using LLM
         """
-        prompt = f"""
+        prompt = self._build_resume_prompt(resume_text)
+        
+        try:
+            response = self._call_llm(prompt)
+            # Parse the JSON response
+            return json.loads(response)
+        except Exception as e:
+            # Return a default structure in case of error
+            return {
+                "experience_years": None,
+                "education": None,
+                "current_position": None,
+                "current_company": None,
+                "skills": []
+            }
+    
+    async def aextract_resume_information(self, resume_text: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Async variant of extract_resume_information
+        Raises instead of returning a default so callers can account for failures
+        """
+        call = self._acall_llm(self._build_resume_prompt(resume_text))
+        response = await (asyncio.wait_for(call, timeout) if timeout else call)
+        
+        result = json.loads(response)
+        if not isinstance(result, dict) or not result:
+            raise ValueError("LLM response is not a JSON object")
+        return result
+    
+    def _build_resume_prompt(self, resume_text: str) -> str:
+        """
+        Build the resume extraction prompt
+        """
+        return f"""
         Extract the following information from this resume:
         1. Years of experience (decimal number)
         2. Education (highest degree and institution)
         3. Current position
         4. Current company
         5. List of skills (technical and soft skills)
+        6. Contact details (first name, last name, email, phone)
         
         Return the information in JSON format with the following keys:
-        experience_years, education, current_position, current_company, skills (as a list of strings)
+        experience_years, education, current_position, current_company, skills (as a list of strings),
+        first_name, last_name, email, phone
         
         Resume:
-        {resume_text[:4000]}  # Limit to first 4000 chars to avoid token issues
+        {resume_text[:RESUME_CHAR_LIMIT]}
+        """
+    
+    def evaluate_candidate_job_match(self, candidate, job) -> Dict[str, Any]:
+        """
+        Evaluate how well a candidate matches a job using LLM
+        Returns a match score and feedback
         """
+        prompt = self._build_match_prompt(candidate, job)
         
         try:
             response = self._call_llm(prompt)
@@ -38,20 +93,96 @@ class LLMService:
         except Exception as e:
             # Return a default structure in case of error
             return {
-                "experience_years": None,
-                "education": None,
-                "current_position": None,
-                "current_company": None,
-                "skills": []
+                "score": 0.0,
+                "feedback": f"Error evaluating candidate: {str(e)}"
             }
     
-    def evaluate_candidate_job_match(self, candidate, job) -> Dict[str, Any]:
+    async def aevaluate_candidate_job_match(self, candidate, job) -> Dict[str, Any]:
         """
-        Evaluate how well a candidate matches a job using LLM
-        Returns a match score and feedback
+        Async variant of evaluate_candidate_job_match
+        Raises instead of returning a default so callers can account for failures
+        """
+        prompt = self._build_match_prompt(candidate, job)
+        response = await self._acall_llm(prompt)
+        return self._parse_match_result(response)
+    
+    async def aevaluate_candidates_job_match_batch(
+        self,
+        candidates: List[Any],
+        job,
+        timeout: Optional[float] = None
+    ) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, str]]:
+        """
+        Evaluate several candidates against one job in a single prompt
+        Returns (results, errors) keyed by candidate id. Candidates missing from
+        a malformed reply are split in half and retried on their own.
+        """
+        results: Dict[int, Dict[str, Any]] = {}
+        errors: Dict[int, str] = {}
+        
+        prompt = self._build_batch_match_prompt(candidates, job)
+        call = self._acall_llm(prompt)
+        response = await (asyncio.wait_for(call, timeout) if timeout else call)
+        
+        try:
+            results.update(self._parse_batch_match_result(response, candidates))
+        except ValueError as e:
+            reason = str(e)
+        else:
+            reason = "Candidate missing from LLM response"
+        
+        missing = [candidate for candidate in candidates if candidate.id not in results]
+        if not missing:
+            return results, errors
+        
+        if len(candidates) == 1:
+            errors[candidates[0].id] = reason
+            return results, errors
+        
+        # Retry only the affected candidates, in smaller prompts
+        middle = (len(missing) + 1) // 2
+        for part in (missing[:middle], missing[middle:]):
+            if not part:
+                continue
+            try:
+                part_results, part_errors = await self.aevaluate_candidates_job_match_batch(part, job, timeout)
+            except asyncio.TimeoutError:
+                part_results, part_errors = {}, {candidate.id: "Timed out on retry" for candidate in part}
+            except Exception as e:
+                part_results, part_errors = {}, {candidate.id: str(e) for candidate in part}
+            results.update(part_results)
+            errors.update(part_errors)
+        
+        return results, errors
+    
+    def plan_match_batches(self, candidates: List[Any], job) -> List[List[Any]]:
+        """
+        Group candidates into batches that fit the prompt token budget
+        """
+        budget = settings.LLM_BATCH_TOKEN_BUDGET
+        max_size = max(1, settings.LLM_BATCH_MAX_CANDIDATES)
+        base_tokens = self._estimate_tokens(self._build_batch_match_prompt([], job))
+        
+        batches: List[List[Any]] = []
+        batch: List[Any] = []
+        used = base_tokens
+        for candidate in candidates:
+            cost = self._estimate_tokens(self._format_candidate(candidate)) + BATCH_REPLY_TOKENS_PER_CANDIDATE
+            if batch and (used + cost > budget or len(batch) >= max_size):
+                batches.append(batch)
+                batch, used = [], base_tokens
+            batch.append(candidate)
+            used += cost
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _format_candidate(self, candidate) -> str:
         """
-        # Prepare candidate information
-        candidate_info = f"""
+        Candidate summary used in match prompts
+        """
+        return f"""
         Candidate: {candidate.first_name} {candidate.last_name}
         Experience: {candidate.experience_years} years
         Education: {candidate.education}
@@ -59,22 +190,29 @@ class LLMService:
         Current Company: {candidate.current_company}
         Skills: {', '.join(skill.name for skill in candidate.skills)}
         """
-        
-        # Prepare job information
-        job_info = f"""
+    
+    def _format_job(self, job) -> str:
+        """
+        Job summary used in match prompts
+        """
+        return f"""
         Job Title: {job.title}
         Description: {job.description}
         Requirements: {job.requirements}
         Location: {job.location}
         Job Type: {job.job_type}
         """
-        
-        prompt = f"""
+    
+    def _build_match_prompt(self, candidate, job) -> str:
+        """
+        Build the candidate/job evaluation prompt
+        """
+        return f"""
         Evaluate how well the candidate matches the job requirements.
         
-        {candidate_info}
+        {self._format_candidate(candidate)}
         
-        {job_info}
+        {self._format_job(job)}
         
         Rate the match on a scale from 0.0 to 1.0, where 1.0 is a perfect match.
         Provide feedback explaining why the candidate is or is not a good match.
@@ -82,36 +220,149 @@ class LLMService:
         Return your evaluation in JSON format with the following keys:
         score (a decimal number between 0.0 and 1.0), feedback (a string with your analysis)
         """
+    
+    def _build_batch_match_prompt(self, candidates: List[Any], job) -> str:
+        """
+        Build one evaluation prompt for a job and several candidates
+        """
+        candidate_blocks = "\n".join(
+            f"        Candidate ID: {candidate.id}{self._format_candidate(candidate)}"
+            for candidate in candidates
+        )
+        
+        return f"""
+        Evaluate how well each of the candidates below matches the job requirements.
+        
+        {self._format_job(job)}
+        
+{candidate_blocks}
+        
+        Rate each match on a scale from 0.0 to 1.0, where 1.0 is a perfect match.
+        Provide short feedback explaining why each candidate is or is not a good match.
+        
+        Return your evaluation as a JSON array with one object per candidate and the following keys:
+        candidate_id (the Candidate ID given above), score (a decimal number between 0.0 and 1.0),
+        feedback (a string with your analysis)
+        """
+    
+    def _parse_match_result(self, response: str) -> Dict[str, Any]:
+        """
+        Parse and validate a match evaluation response
+        """
+        result = json.loads(response)
+        if not isinstance(result, dict) or "score" not in result:
+            raise ValueError("LLM response is missing a match score")
         
+        return {
+            "score": float(result["score"]),
+            "feedback": result.get("feedback") or ""
+        }
+    
+    def _parse_batch_match_result(self, response: str, candidates: List[Any]) -> Dict[int, Dict[str, Any]]:
+        """
+        Parse a batch evaluation response, keeping well-formed entries for known candidates
+        """
         try:
-            response = self._call_llm(prompt)
-            # Parse the JSON response
-            return json.loads(response)
-        except Exception as e:
-            # Return a default structure in case of error
-            return {
-                "score": 0.0,
-                "feedback": f"Error evaluating candidate: {str(e)}"
-            }
+            items = json.loads(response)
+        except ValueError:
+            raise ValueError("LLM response is not valid JSON")
+        
+        # Accept a wrapping object such as {"results": [...]}
+        if isinstance(items, dict):
+            items = next((value for value in items.values() if isinstance(value, list)), None)
+        if not isinstance(items, list):
+            raise ValueError("LLM response is not a JSON array")
+        
+        candidate_ids = {candidate.id for candidate in candidates}
+        results: Dict[int, Dict[str, Any]] = {}
+        for item in items:
+            try:
+                candidate_id = int(item["candidate_id"])
+                score = float(item["score"])
+            except (TypeError, KeyError, ValueError):
+                continue
+            if candidate_id in candidate_ids and candidate_id not in results:
+                results[candidate_id] = {"score": score, "feedback": item.get("feedback") or ""}
+        
+        return results
+    
+    def _estimate_tokens(self, text: str) -> int:
+        """
+        Rough token count (about four characters per token)
+        """
+        return len(text) // 4 + 1
     
-    def _call_llm(self, prompt: str) -> str:
+    def _call_llm(self, prompt: str, use_cache: bool = True) -> str:
         """
         Call the language model API with the given prompt
+        Identical requests are served from the local response cache
         """
+        cache_key = self._cache_key(prompt) if use_cache and settings.LLM_CACHE_ENABLED else None
+        if cache_key:
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            response = openai.ChatCompletion.create(
+            with timed(LLM_REQUEST_SECONDS, model=settings.LLM_MODEL):
+                response = openai.ChatCompletion.create(
+                    model=settings.LLM_MODEL,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=LLM_TEMPERATURE
+                )
+            self._record_usage(response)
+            content = response.choices[0].message.content
+        except Exception as e:
+            # Handle the case where the API call fails
+            logger.error("Error calling LLM API: %s", e)
+            return "{}"  # Return empty JSON in case of error
+        
+        if cache_key:
+            llm_cache.set(cache_key, content)
+        return content
+    
+    async def _acall_llm(self, prompt: str, use_cache: bool = True) -> str:
+        """
+        Call the language model API without blocking the event loop
+        Identical requests are served from the local response cache
+        """
+        cache_key = self._cache_key(prompt) if use_cache and settings.LLM_CACHE_ENABLED else None
+        if cache_key:
+            # The cache reads and writes SQLite (and occasionally evicts), so keep it off the loop
+            cached = await asyncio.to_thread(llm_cache.get, cache_key)
+            if cached is not None:
+                return cached
+        
+        with timed(LLM_REQUEST_SECONDS, model=settings.LLM_MODEL):
+            response = await openai.ChatCompletion.acreate(
                 model=settings.LLM_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are a recruitment assistant that analyzes resumes and job descriptions."},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1  # Low temperature for more consistent results
+                temperature=LLM_TEMPERATURE
             )
-            return response.choices[0].message.content
-        except Exception as e:
-            # Handle the case where the API call fails
-            print(f"Error calling LLM API: {str(e)}")
-            return "{}"  # Return empty JSON in case of error
+        self._record_usage(response)
+        content = response.choices[0].message.content
+        
+        if cache_key:
+            await asyncio.to_thread(llm_cache.set, cache_key, content)
+        return content
+    
+    def _record_usage(self, response) -> None:
+        """
+        Count the tokens the API reports for a completion
+        """
+        usage = response.get("usage") or {}
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if usage.get(kind):
+                LLM_TOKENS.labels(settings.LLM_MODEL, kind.replace("_tokens", "")).inc(usage[kind])
+    
+    def _cache_key(self, prompt: str) -> str:
+        return llm_cache.make_key(settings.LLM_MODEL, SYSTEM_PROMPT, prompt, LLM_TEMPERATURE)
 
 
-llm_service = LLMService() 
\ No newline at end of file
+llm_service = LLMService()
@@ -0,0 +1,84 @@
+from typing import Any, Dict, Iterable, List, Sequence
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.models.candidate import Candidate, CandidateJobMatch
+
+MATCH_KEY = ["candidate_id", "job_id"]
+
+# Columns written by each stage; the other stage's columns are left alone
+PRESCORE_COLUMNS = ["prescore", "shortlisted"]
+SCORE_COLUMNS = ["score", "feedback", "candidate_fingerprint", "job_fingerprint", "scored_at"]
+
+
+class MatchResultStore:
+    """
+    Per-(candidate, job) match results, one row per pair
+    """
+    def upsert(self, db: Session, rows: List[Dict[str, Any]], columns: Sequence[str]) -> None:
+        """
+        Insert or update rows keyed on (candidate_id, job_id) in one statement
+        On an existing pair only the given columns are overwritten. Doesn't commit.
+        """
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            statement = (postgresql if dialect == "postgresql" else sqlite).insert(CandidateJobMatch)
+            values = {column: statement.excluded[column] for column in columns}
+            values["updated_at"] = func.now()
+            db.execute(statement.on_conflict_do_update(index_elements=MATCH_KEY, set_=values), rows)
+        else:
+            for row in rows:
+                self._upsert_row(db, row, columns)
+
+    def refresh_best_scores(self, db: Session, candidate_ids: Iterable[int]) -> None:
+        """
+        Set Candidate.match_score to the candidate's best score over all jobs
+        """
+        candidate_ids = list(set(candidate_ids))
+        if not candidate_ids:
+            return
+        best = (
+            select(func.max(CandidateJobMatch.score))
+            .where(CandidateJobMatch.candidate_id == Candidate.id)
+            .scalar_subquery()
+        )
+        db.execute(
+            update(Candidate)
+            .where(Candidate.id.in_(candidate_ids))
+            .values(match_score=func.coalesce(best, 0.0))
+            .execution_options(synchronize_session=False)
+        )
+
+    def shortlist(self, db: Session, job_id: int, k: int) -> List[CandidateJobMatch]:
+        """
+        The k best-scored candidates for a job, read in score order from
+        ix_candidate_job_matches_job_score; ties go to the lower candidate ID
+        """
+        return (
+            db.query(CandidateJobMatch)
+            .options(joinedload(CandidateJobMatch.candidate).selectinload(Candidate.skills))
+            .filter(CandidateJobMatch.job_id == job_id, CandidateJobMatch.score.isnot(None))
+            .order_by(CandidateJobMatch.score.desc(), CandidateJobMatch.candidate_id)
+            .limit(k)
+            .all()
+        )
+
+    def _upsert_row(self, db: Session, row: Dict[str, Any], columns: Sequence[str]) -> None:
+        values = {column: row[column] for column in columns}
+        key = (CandidateJobMatch.candidate_id == row["candidate_id"], CandidateJobMatch.job_id == row["job_id"])
+        if db.execute(update(CandidateJobMatch).where(*key).values(values)).rowcount:
+            return
+        try:
+            with db.begin_nested():
+                db.execute(insert(CandidateJobMatch), row)
+        except IntegrityError:
+            # Inserted by another session in between
+            db.execute(update(CandidateJobMatch).where(*key).values(values))
+
+
+match_results = MatchResultStore()
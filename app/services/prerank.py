@@ -0,0 +1,141 @@
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.candidate import Candidate, CandidateJobMatch, Skill, candidate_skills
+from app.services.match_results import PRESCORE_COLUMNS, match_results
+
+# Relative weight of each signal in the pre-score
+SKILL_WEIGHT = 0.6
+EXPERIENCE_WEIGHT = 0.2
+POSITION_WEIGHT = 0.2
+
+STORE_BATCH_SIZE = 1000  # Pre-scores per upsert statement
+
+YEARS_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:years|yrs)", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"[a-z0-9+#.]+")
+
+
+class PreRanker:
+    """
+    Cheap local first stage of candidate matching
+    Scores every candidate from stored skills, experience and position so only
+    the most promising ones are sent to the LLM
+    """
+    def score_candidates(
+        self,
+        db: Session,
+        job,
+        candidate_ids: Optional[List[int]] = None
+    ) -> Dict[int, float]:
+        """
+        Pre-score every candidate (or only candidate_ids) against the job, in [0.0, 1.0]
+        """
+        job_text = " ".join(filter(None, [job.title, job.description, job.requirements])).lower()
+        required_years = self._required_years(job.requirements or "")
+        title_words = self._words(job.title or "")
+
+        # Resolve which known skills the job mentions once, not per candidate
+        job_skill_ids = {
+            skill_id
+            for skill_id, name in db.query(Skill.id, Skill.name)
+            if name and self._mentions(job_text, name.lower())
+        }
+
+        candidate_skill_ids: Dict[int, Set[int]] = defaultdict(set)
+        if job_skill_ids:
+            rows = db.query(candidate_skills.c.candidate_id, candidate_skills.c.skill_id).filter(
+                candidate_skills.c.skill_id.in_(job_skill_ids)
+            )
+            if candidate_ids is not None:
+                rows = rows.filter(candidate_skills.c.candidate_id.in_(candidate_ids))
+            for candidate_id, skill_id in rows:
+                candidate_skill_ids[candidate_id].add(skill_id)
+
+        scores: Dict[int, float] = {}
+        rows = db.query(Candidate.id, Candidate.experience_years, Candidate.current_position)
+        if candidate_ids is not None:
+            rows = rows.filter(Candidate.id.in_(candidate_ids))
+        for candidate_id, experience_years, current_position in rows:
+            skill_score = (
+                len(candidate_skill_ids[candidate_id]) / len(job_skill_ids) if job_skill_ids else 0.0
+            )
+
+            if not experience_years:
+                experience_score = 0.0
+            elif required_years:
+                experience_score = min(1.0, experience_years / required_years)
+            else:
+                experience_score = 1.0
+
+            position_words = self._words(current_position or "")
+            position_score = (
+                len(position_words & title_words) / len(title_words) if title_words else 0.0
+            )
+
+            scores[candidate_id] = round(
+                SKILL_WEIGHT * skill_score
+                + EXPERIENCE_WEIGHT * experience_score
+                + POSITION_WEIGHT * position_score,
+                4
+            )
+
+        return scores
+
+    def shortlist(self, db: Session, job, candidate_ids: Optional[List[int]] = None) -> List[int]:
+        """
+        Pre-score all candidates (or only candidate_ids), store the scores of
+        the shortlist for auditing and return the IDs that should go on to LLM
+        scoring, best first
+        """
+        top_k = job.prerank_top_k or settings.PRERANK_TOP_K
+        min_score = (
+            job.prerank_min_score if job.prerank_min_score is not None else settings.PRERANK_MIN_SCORE
+        )
+
+        scores = self.score_candidates(db, job, candidate_ids)
+        ranked = sorted(
+            (candidate_id for candidate_id, score in scores.items() if score >= min_score),
+            key=lambda candidate_id: (-scores[candidate_id], candidate_id)
+        )
+        selected = ranked[:top_k]
+
+        self._store(db, job.id, scores, set(selected))
+        return selected
+
+    def _store(self, db: Session, job_id: int, scores: Dict[int, float], selected: Set[int]) -> None:
+        """
+        Upsert the pre-scores of the shortlist, and of pairs already stored for the job
+        Candidates that never made a shortlist get no row, and unchanged rows aren't rewritten
+        """
+        stored = {
+            candidate_id: (prescore, shortlisted)
+            for candidate_id, prescore, shortlisted in db.query(
+                CandidateJobMatch.candidate_id, CandidateJobMatch.prescore, CandidateJobMatch.shortlisted
+            ).filter(CandidateJobMatch.job_id == job_id)
+        }
+        rows = [
+            {"candidate_id": candidate_id, "job_id": job_id, "prescore": score, "shortlisted": candidate_id in selected}
+            for candidate_id, score in scores.items()
+            if (candidate_id in selected and candidate_id not in stored)
+            or (candidate_id in stored and stored[candidate_id] != (score, candidate_id in selected))
+        ]
+        for start in range(0, len(rows), STORE_BATCH_SIZE):
+            match_results.upsert(db, rows[start:start + STORE_BATCH_SIZE], PRESCORE_COLUMNS)
+        db.commit()
+
+    def _required_years(self, requirements: str) -> Optional[float]:
+        years = [float(value) for value in YEARS_PATTERN.findall(requirements)]
+        return max(years) if years else None
+
+    def _mentions(self, text: str, phrase: str) -> bool:
+        return re.search(r"(?<![a-z0-9])" + re.escape(phrase) + r"(?![a-z0-9])", text) is not None
+
+    def _words(self, text: str) -> Set[str]:
+        return {word for word in WORD_PATTERN.findall(text.lower()) if len(word) > 2}
+
+
+pre_ranker = PreRanker()
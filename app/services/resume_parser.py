@@ -1,31 +1,95 @@
+import hashlib
+import json
 import os
-import shutil
+import re
 from fastapi import UploadFile
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import BinaryIO, Dict, List, Optional, Any
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.models.candidate import ResumeDocument
 from app.services.candidate_service import candidate_service
+from app.services.extraction_pool import extraction_pool
+from app.services.text_extraction import extract_text
 from app.services.llm_service import llm_service
+from app.services.resume_search import resume_search
+from app.services.vector_index import vector_index
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+CONTENT_HASH_PATTERN = re.compile(r"[0-9a-f]{64}")
+EXTRACTION_ERROR_PREFIXES = ("Error extracting PDF:", "Error extracting DOCX:")
 
 
 class ResumeParser:
     async def save_resume(self, resume: UploadFile) -> str:
         """
-        Save uploaded resume to disk
+        Save uploaded resume to content-addressed storage
+        The upload is hashed while it streams to disk; identical files share one path
         """
         # Create upload directory if it doesn't exist
         os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
         
-        # Generate unique filename
-        file_extension = os.path.splitext(resume.filename)[1]
-        unique_filename = f"{resume.filename.split('.')[0]}_{os.urandom(8).hex()}{file_extension}"
-        file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
+        # Stream to a temporary file, hashing as we go
+        hasher = hashlib.sha256()
+        tmp_path = os.path.join(settings.UPLOAD_DIR, f".upload_{os.urandom(8).hex()}")
+        with open(tmp_path, "wb") as buffer:
+            while True:
+                chunk = await resume.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                buffer.write(chunk)
         
-        # Save the file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(resume.file, buffer)
+        file_extension = os.path.splitext(resume.filename or "")[1].lower()
+        return self._commit_upload(tmp_path, hasher.hexdigest(), file_extension)
+    
+    def save_resume_file(self, fileobj: BinaryIO, filename: str) -> str:
+        """
+        Save a resume from a binary file object (e.g. an archive member) to
+        content-addressed storage
+        """
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+        
+        hasher = hashlib.sha256()
+        tmp_path = os.path.join(settings.UPLOAD_DIR, f".upload_{os.urandom(8).hex()}")
+        with open(tmp_path, "wb") as buffer:
+            for chunk in iter(lambda: fileobj.read(UPLOAD_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+                buffer.write(chunk)
+        
+        file_extension = os.path.splitext(filename)[1].lower()
+        return self._commit_upload(tmp_path, hasher.hexdigest(), file_extension)
+    
+    def content_hash(self, resume_path: str) -> str:
+        """
+        SHA-256 of a stored resume, taken from its content-addressed name when possible
+        """
+        stem = Path(resume_path).stem
+        if CONTENT_HASH_PATTERN.fullmatch(stem):
+            return stem
+        
+        # Files saved before content-addressed storage
+        hasher = hashlib.sha256()
+        with open(resume_path, "rb") as f:
+            for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    
+    def _commit_upload(self, tmp_path: str, content_hash: str, file_extension: str) -> str:
+        """
+        Move a hashed temporary upload to its content-addressed path
+        """
+        directory = os.path.join(settings.UPLOAD_DIR, content_hash[:2])
+        os.makedirs(directory, exist_ok=True)
+        file_path = os.path.join(directory, f"{content_hash}{file_extension}")
+        
+        if os.path.exists(file_path):
+            # Same content already stored
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, file_path)
         
         return file_path
     
@@ -37,11 +101,21 @@ class ResumeParser:
         if not candidate:
             return {"error": "Candidate not found"}
         
-        # Extract text from resume
-        resume_text = await self._extract_text_from_file(resume_path)
-        
-        # Use LLM to extract information
-        resume_data = llm_service.extract_resume_information(resume_text)
+        # Reuse earlier results for a byte-identical resume
+        content_hash = self.content_hash(resume_path)
+        document = db.query(ResumeDocument).filter(ResumeDocument.content_hash == content_hash).first()
+        if document and document.extracted_data:
+            resume_text = document.text or ""
+            resume_data = json.loads(document.extracted_data)
+        else:
+            # The LLM reads the first RESUME_CHAR_LIMIT characters; search indexes the rest
+            resume_text = await self._extract_text_from_file(resume_path, max_chars=settings.RESUME_TEXT_CHAR_LIMIT)
+            
+            # Use LLM to extract information; a failed call raises, so the task is
+            # retried and no empty result is stored for this document
+            resume_data = await llm_service.aextract_resume_information(resume_text)
+            
+            self.store_document(db, document, content_hash, resume_path, resume_text, resume_data)
         
         # Update candidate with extracted information
         update_data = {
@@ -56,61 +130,86 @@ class ResumeParser:
             if value:
                 setattr(candidate, key, value)
         
+        # Add skills and the searchable resume text in the same commit
+        if "skills" in resume_data and resume_data["skills"]:
+            candidate_service.add_skills(db, candidate_id=candidate.id, names=resume_data["skills"], commit=False)
+        if not resume_text.startswith(EXTRACTION_ERROR_PREFIXES):
+            resume_search.store(db, {candidate.id: resume_text})
+        
         db.add(candidate)
         db.commit()
         db.refresh(candidate)
         
-        # Add skills
-        if "skills" in resume_data and resume_data["skills"]:
-            for skill in resume_data["skills"]:
-                candidate_service.add_skill(db, candidate_id=candidate.id, skill_name=skill)
+        # Keep the similarity index in step with the stored profile
+        vector_index.upsert_candidate(candidate, resume_text)
         
         return resume_data
     
-    async def _extract_text_from_file(self, file_path: str) -> str:
+    def store_document(
+        self,
+        db: Session,
+        document: Optional[ResumeDocument],
+        content_hash: str,
+        resume_path: str,
+        resume_text: str,
+        resume_data: Dict[str, Any],
+        commit: bool = True
+    ) -> None:
+        """
+        Cache extracted text and LLM output by content hash
+        Failed extractions are not cached so a later upload retries them.
+        With commit=False the document is only staged on the session.
+        """
+        if resume_text.startswith(EXTRACTION_ERROR_PREFIXES):
+            return
+        if not isinstance(resume_data, dict) or not any(resume_data.values()):
+            return
+        
+        if document is None:
+            document = ResumeDocument(content_hash=content_hash)
+        document.file_path = resume_path
+        document.text = resume_text
+        document.extracted_data = json.dumps(resume_data)
+        db.add(document)
+        
+        if not commit:
+            return
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker cached the same file first
+            db.rollback()
+    
+    async def _extract_text_from_file(self, file_path: str, max_chars: Optional[int] = None) -> str:
         """
         Extract text from PDF or DOCX file
+        Only the first max_chars characters are extracted when a limit is given
         """
         file_extension = os.path.splitext(file_path)[1].lower()
         
         if file_extension == ".pdf":
-            return await self._extract_text_from_pdf(file_path)
+            return await self._extract_text_from_pdf(file_path, max_chars)
         elif file_extension == ".docx":
-            return await self._extract_text_from_docx(file_path)
+            return await self._extract_text_from_docx(file_path, max_chars)
         else:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read()
+            return extract_text(file_path, max_chars=max_chars)
     
-    async def _extract_text_from_pdf(self, pdf_path: str) -> str:
+    async def _extract_text_from_pdf(self, pdf_path: str, max_chars: Optional[int] = None) -> str:
         """
-        Extract text from PDF file
+        Extract text from PDF file in the extraction process pool
         """
         try:
-            # Using PyPDF2 (you would need to install this library)
-            from PyPDF2 import PdfReader
-            
-            reader = PdfReader(pdf_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text
+            return await extraction_pool.extract(pdf_path, max_chars)
         except Exception as e:
             # Fallback to LLM if PDF extraction fails
             return f"Error extracting PDF: {str(e)}"
     
-    async def _extract_text_from_docx(self, docx_path: str) -> str:
+    async def _extract_text_from_docx(self, docx_path: str, max_chars: Optional[int] = None) -> str:
         """
-        Extract text from DOCX file
+        Extract text from DOCX file in the extraction process pool
         """
         try:
-            # Using python-docx (you would need to install this library)
-            import docx
-            
-            doc = docx.Document(docx_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            
-            return text
+            return await extraction_pool.extract(docx_path, max_chars)
         except Exception as e:
             # Fallback to LLM if DOCX extraction fails
             return f"Error extracting DOCX: {str(e)}"
@@ -0,0 +1,161 @@
+import html
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.candidate import ResumeText
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+QUERY_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+MAX_QUERY_TERMS = 16
+
+# The backends mark matches with private-use characters; snippets are
+# HTML-escaped and the marks turned into <mark> tags afterwards
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_END = "\ue001"
+SNIPPET_WORDS = 24
+
+# bm25 is computed once per match in the innermost query (LIMIT -1 keeps SQLite
+# from flattening it into the keyset filter and ORDER BY, which would each call
+# bm25 again), and snippets only for the rows of the page
+SQLITE_SEARCH = text(f"""
+    SELECT page.candidate_id, page.rank,
+           snippet(resume_texts_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '...', {SNIPPET_WORDS}) AS snippet
+    FROM (
+        SELECT candidate_id, rank
+        FROM (
+            SELECT rowid AS candidate_id, bm25(resume_texts_fts) AS rank
+            FROM resume_texts_fts
+            WHERE resume_texts_fts MATCH :query
+            LIMIT -1
+        )
+        WHERE :after_rank IS NULL
+           OR rank > :after_rank
+           OR (rank = :after_rank AND candidate_id > :after_id)
+        ORDER BY rank, candidate_id
+        LIMIT :limit
+    ) AS page
+    JOIN resume_texts_fts ON resume_texts_fts.rowid = page.candidate_id
+    WHERE resume_texts_fts MATCH :query
+    ORDER BY page.rank, page.candidate_id
+""")
+
+# Headlines are only built for the rows of the page, not for every match
+POSTGRES_SEARCH = text(f"""
+    SELECT candidate_id, rank,
+           ts_headline('english', text, query,
+                       'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_END}", MaxWords={SNIPPET_WORDS}, MinWords=8') AS snippet
+    FROM (
+        SELECT candidate_id, text, query, ts_rank(search_vector, query)::float8 AS rank
+        FROM resume_texts, plainto_tsquery('english', :query) AS query
+        WHERE search_vector @@ query
+          AND (CAST(:after_rank AS float8) IS NULL
+               OR ts_rank(search_vector, query)::float8 < :after_rank
+               OR (ts_rank(search_vector, query)::float8 = :after_rank AND candidate_id > :after_id))
+        ORDER BY rank DESC, candidate_id
+        LIMIT :limit
+    ) AS page
+    ORDER BY rank DESC, candidate_id
+""")
+
+
+@dataclass
+class SearchHit:
+    candidate_id: int
+    score: float  # Higher is more relevant; only comparable within one query
+    snippet: str
+    rank: float  # Backend sort key, kept for the cursor
+
+
+class ResumeSearch:
+    """
+    Full-text search over candidates' extracted resume text
+    Backed by FTS5 on SQLite and a tsvector column with a GIN index on
+    PostgreSQL; both are maintained by the database on every write (see
+    RESUME_TEXT_SEARCH_DDL). Results are ranked best first and paged by cursor.
+    """
+    def store(self, db: Session, texts: Dict[int, str]) -> None:
+        """
+        Save the resume text of each candidate ID, replacing earlier text
+        Doesn't commit
+        """
+        rows = [
+            {"candidate_id": candidate_id, "text": _strip_marks(resume_text[:settings.RESUME_TEXT_CHAR_LIMIT])}
+            for candidate_id, resume_text in texts.items()
+            if resume_text and resume_text.strip()
+        ]
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            statement = (postgresql if dialect == "postgresql" else sqlite).insert(ResumeText)
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["candidate_id"],
+                    set_={"text": statement.excluded.text, "updated_at": func.now()}
+                ),
+                rows
+            )
+        else:
+            for row in rows:
+                db.merge(ResumeText(**row))
+
+    def search(self, db: Session, query: str, *, limit: int = 20, cursor: Optional[str] = None) -> List[SearchHit]:
+        """
+        Candidates whose resume matches every term of the query, most relevant first
+        Raises InvalidCursor for a malformed cursor.
+        """
+        terms = QUERY_TERM_PATTERN.findall(query)[:MAX_QUERY_TERMS]
+        if not terms:
+            return []
+        after_rank, after_id = decode_cursor(cursor, 2) if cursor else (None, None)
+        if cursor and not (isinstance(after_rank, (int, float)) and isinstance(after_id, int)):
+            raise InvalidCursor("Invalid cursor")
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            # Quoted terms so user input can't use FTS5 query syntax
+            statement, match = SQLITE_SEARCH, " ".join(f'"{term}"' for term in terms)
+        elif dialect == "postgresql":
+            statement, match = POSTGRES_SEARCH, " ".join(terms)
+        else:
+            raise HTTPException(status_code=501, detail=f"Resume search is not supported on {dialect}")
+
+        rows = db.execute(statement, {
+            "query": match, "after_rank": after_rank, "after_id": after_id, "limit": limit
+        })
+        return [
+            SearchHit(
+                candidate_id=row.candidate_id,
+                score=-row.rank if dialect == "sqlite" else row.rank,
+                snippet=self._render_snippet(row.snippet),
+                rank=row.rank
+            )
+            for row in rows
+        ]
+
+    def next_cursor(self, hits: List[SearchHit], *, limit: int) -> Optional[str]:
+        """
+        Cursor for the page after hits, or None if it was the last
+        """
+        if len(hits) < limit:
+            return None
+        last = hits[-1]
+        return encode_cursor([last.rank, last.candidate_id])
+
+    def _render_snippet(self, snippet: Optional[str]) -> str:
+        escaped = html.escape(" ".join((snippet or "").split()))
+        return escaped.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+
+def _strip_marks(resume_text: str) -> str:
+    return resume_text.replace(HIGHLIGHT_START, "").replace(HIGHLIGHT_END, "")
+
+
+resume_search = ResumeSearch()
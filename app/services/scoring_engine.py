@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.llm_service import llm_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScoringReport:
+    """
+    Outcome of a scoring run
+    """
+    job_id: int
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    elapsed_seconds: float = 0.0
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def candidates_per_second(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.total / self.elapsed_seconds
+
+    def summary(self) -> str:
+        return (
+            f"job {self.job_id}: scored {self.succeeded}/{self.total} candidates "
+            f"({self.failed} failed, {self.timed_out} timed out) "
+            f"in {self.elapsed_seconds:.1f}s, {self.candidates_per_second:.2f} candidates/sec"
+        )
+
+
+class ScoringEngine:
+    """
+    Runs batched candidate/job LLM evaluations concurrently with a bounded
+    number of in-flight calls and commits results in batches
+    """
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        commit_batch_size: Optional[int] = None
+    ):
+        self.concurrency = concurrency or settings.MATCH_CONCURRENCY
+        self.timeout = timeout or settings.MATCH_TIMEOUT_SECONDS
+        self.commit_batch_size = commit_batch_size or settings.MATCH_COMMIT_BATCH_SIZE
+
+    async def score_candidates(
+        self,
+        db: Session,
+        job,
+        candidates: Iterable,
+        on_result: Callable[[Any, Dict[str, Any]], None],
+        before_commit: Optional[Callable[[], None]] = None
+    ) -> ScoringReport:
+        """
+        Evaluate every candidate against the job
+
+        on_result is called with (candidate, match_result) for each successful
+        evaluation and should stage its changes on the session; the engine
+        commits every commit_batch_size results, calling before_commit first
+        so staged results can be written in one batch. Failed or timed out
+        evaluations are recorded in the report and leave the candidate untouched.
+        """
+        report = ScoringReport(job_id=job.id)
+        candidates = list(candidates)
+        report.total = len(candidates)
+
+        # Several candidates share one prompt so the job text is sent once per batch
+        queue: asyncio.Queue = asyncio.Queue()
+        for batch in llm_service.plan_match_batches(candidates, job):
+            queue.put_nowait(batch)
+
+        pending = 0
+        started = time.perf_counter()
+
+        async def worker():
+            nonlocal pending
+            while True:
+                try:
+                    batch = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                try:
+                    results, errors = await llm_service.aevaluate_candidates_job_match_batch(
+                        batch, job, timeout=self.timeout
+                    )
+                except asyncio.TimeoutError:
+                    report.timed_out += len(batch)
+                    for candidate in batch:
+                        report.errors[candidate.id] = f"Timed out after {self.timeout}s"
+                    continue
+                except Exception as e:
+                    report.failed += len(batch)
+                    for candidate in batch:
+                        report.errors[candidate.id] = str(e)
+                    continue
+
+                report.failed += len(errors)
+                report.errors.update(errors)
+                for candidate in batch:
+                    if candidate.id not in results:
+                        continue
+                    on_result(candidate, results[candidate.id])
+                    report.succeeded += 1
+                    pending += 1
+
+                if pending >= self.commit_batch_size:
+                    if before_commit:
+                        before_commit()
+                    db.commit()
+                    pending = 0
+
+        workers = min(self.concurrency, queue.qsize())
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        if pending:
+            if before_commit:
+                before_commit()
+            db.commit()
+
+        report.elapsed_seconds = time.perf_counter() - started
+        logger.info("Scoring run finished: %s", report.summary())
+        return report
+
+
+scoring_engine = ScoringEngine()
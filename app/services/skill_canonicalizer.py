@@ -0,0 +1,168 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+SKILL_NAME_MAX_LENGTH = 100  # Length of the skills.name column
+
+# Canonical skill name -> other spellings seen in extracted resumes. Matching
+# is case-insensitive, and version suffixes ("Python 3.11", "html5"),
+# qualifiers in parentheses ("Python (programming)") and compounds of known
+# skills ("HTML/CSS") are handled by the rules in SkillCanonicalizer, so they
+# don't need entries here
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "Python": ["py", "python programming", "cpython"],
+    "Java": ["java se", "java ee", "core java"],
+    "JavaScript": ["js", "java script", "ecmascript", "es6", "vanilla js", "vanilla javascript"],
+    "TypeScript": ["ts", "type script"],
+    "Go": ["golang", "go lang"],
+    "Rust": ["rust lang", "rustlang"],
+    "C": ["c language", "ansi c"],
+    "C++": ["cpp", "c plus plus", "cplusplus"],
+    "C#": ["c sharp", "csharp", "c-sharp"],
+    ".NET": ["dotnet", "dot net", ".net core", "asp.net core", ".net framework"],
+    "Kotlin": [],
+    "Scala": [],
+    "Ruby": [],
+    "Ruby on Rails": ["rails", "ror", "ruby-on-rails"],
+    "PHP": [],
+    "Swift": [],
+    "Objective-C": ["objective c", "objc", "obj-c"],
+    "R": ["r language", "r programming"],
+    "SQL": ["structured query language"],
+    "PostgreSQL": ["postgres", "postgre", "postgresql database", "psql", "pgsql"],
+    "MySQL": ["my sql"],
+    "SQL Server": ["mssql", "ms sql", "microsoft sql server", "ms sql server"],
+    "MongoDB": ["mongo", "mongo db"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search"],
+    "Kafka": ["apache kafka"],
+    "RabbitMQ": ["rabbit mq"],
+    "Spark": ["apache spark"],
+    "Airflow": ["apache airflow"],
+    "Hadoop": ["apache hadoop"],
+    "Docker": ["docker containers", "dockerfile"],
+    "Kubernetes": ["k8s", "kube"],
+    "Terraform": ["hashicorp terraform"],
+    "AWS": ["amazon web services", "amazon aws"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Azure": ["microsoft azure", "ms azure"],
+    "Linux": ["gnu/linux"],
+    "CI/CD": ["ci cd", "ci-cd", "cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Git": ["git version control"],
+    "GraphQL": ["graph ql"],
+    "REST APIs": ["rest", "rest api", "restful", "restful api", "restful apis", "restful services", "rest services"],
+    "HTML": [],
+    "CSS": [],
+    "React": ["react.js", "reactjs", "react js"],
+    "React Native": ["react-native"],
+    "Vue": ["vue.js", "vuejs", "vue js"],
+    "Angular": ["angularjs", "angular.js", "angular js"],
+    "Node.js": ["node", "nodejs", "node js"],
+    "Express": ["express.js", "expressjs"],
+    "Next.js": ["nextjs", "next js"],
+    "Django": [],
+    "FastAPI": ["fast api"],
+    "Flask": [],
+    "Spring": ["spring framework"],
+    "pandas": [],
+    "NumPy": [],
+    "PyTorch": ["torch", "py torch"],
+    "TensorFlow": ["tensor flow"],
+    "scikit-learn": ["sklearn", "scikit learn", "scikit"],
+    "Machine Learning": ["ml", "machine-learning"],
+    "Deep Learning": ["deep-learning"],
+    "Natural Language Processing": ["nlp"],
+    "Computer Vision": [],
+    "Data Modeling": ["data modelling"],
+    "ETL": ["etl pipelines", "extract transform load"],
+    "Microservices": ["microservice", "micro services", "microservice architecture"],
+    "System Design": ["systems design"],
+    "Agile": ["agile methodologies", "agile methodology"],
+    "Scrum": [],
+    "Communication": ["communication skills", "verbal communication", "written communication"],
+    "Leadership": ["team leadership", "leadership skills"],
+    "Mentoring": ["mentorship"],
+    "Excel": ["microsoft excel", "ms excel"],
+}
+
+PARENTHETICAL_SUFFIX = re.compile(r"\s*\([^()]*\)$")
+VERSION_SUFFIX = re.compile(r"^(?P<base>.+?)(?P<separator>[\s\-]*)v?(?P<version>\d+(?:\.(?:\d+|x))*)\+?$")
+COMPOUND_SEPARATOR = re.compile(r"\s*[/&,]\s*|\s+and\s+")
+LEADING_MARKERS = "-*•·▪– "
+TRAILING_PUNCTUATION = ",;:. "
+
+
+class SkillCanonicalizer:
+    """
+    Maps the spellings of a skill to one canonical name
+    Known skills resolve through a precomputed alias hash map; any other name
+    is cleaned up and kept as written. Two names are the same skill when their
+    keys (casefolded canonical names) match.
+    """
+    def __init__(self, aliases: Dict[str, List[str]]):
+        self._index: Dict[str, str] = {}
+        for canonical, spellings in aliases.items():
+            for spelling in [canonical, *spellings]:
+                self._index[spelling.casefold()] = canonical
+
+    def canonical(self, name: str) -> str:
+        """
+        The canonical spelling of a skill name, or "" if nothing is left of it
+        """
+        cleaned = self._clean(name)
+        if not cleaned:
+            return ""
+        return self._known(cleaned) or cleaned[:SKILL_NAME_MAX_LENGTH]
+
+    def canonical_names(self, name: str) -> List[str]:
+        """
+        Canonical names of the skills a name stands for
+        A compound of known skills ("HTML/CSS", "Docker & Kubernetes") is split
+        into its parts; anything else gives one name, or none if blank.
+        """
+        cleaned = self._clean(name)
+        if not cleaned:
+            return []
+        known = self._known(cleaned)
+        if known:
+            return [known]
+        parts = [self._clean(part) for part in COMPOUND_SEPARATOR.split(cleaned)]
+        if len(parts) > 1 and all(parts):
+            known_parts = [self._known(part) for part in parts]
+            if all(known_parts):
+                return list(dict.fromkeys(known_parts))
+        return [cleaned[:SKILL_NAME_MAX_LENGTH]]
+
+    def key(self, name: str) -> str:
+        """
+        Identity of a skill: names with the same key are duplicates
+        """
+        return self.canonical(name).casefold()
+
+    def _clean(self, name: str) -> str:
+        name = " ".join(unicodedata.normalize("NFKC", str(name)).split())
+        # Until nothing changes, so canonical names canonicalise to themselves:
+        # "Foo. (bar)" -> "Foo." -> "Foo", "Foo (a) (b)" -> "Foo (a)" -> "Foo"
+        while True:
+            cleaned = name.lstrip(LEADING_MARKERS).rstrip(TRAILING_PUNCTUATION)
+            # "Python (programming)" -> "Python", unless that leaves nothing
+            cleaned = PARENTHETICAL_SUFFIX.sub("", cleaned) or cleaned
+            if cleaned == name:
+                return cleaned
+            name = cleaned
+
+    def _known(self, name: str) -> Optional[str]:
+        key = name.casefold()
+        canonical = self._index.get(key)
+        if canonical is None:
+            # Only known skills lose a version suffix; "S3" and "EC2" are names, not versions.
+            # A one-letter base needs a separated, dotted version ("R 4.3"), so "R2" and "C4" stay
+            match = VERSION_SUFFIX.match(key)
+            if match and (
+                len(match.group("base")) > 1 or (match.group("separator") and "." in match.group("version"))
+            ):
+                canonical = self._index.get(match.group("base"))
+        return canonical
+
+
+skill_canonicalizer = SkillCanonicalizer(SKILL_ALIASES)
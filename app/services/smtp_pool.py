@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import threading
+from email.message import Message
+from typing import Any, Awaitable, Callable, Dict, List
+
+import aiosmtplib
+
+from app.core.config import settings
+from app.core.metrics import SMTP_SEND_SECONDS, timed
+
+logger = logging.getLogger(__name__)
+
+# The connection is gone or unusable; worth one retry on a fresh connection
+RECONNECT_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+)
+
+
+class _PooledConnection:
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.messages_sent = 0
+
+
+class _LoopConnections:
+    # Connections belong to the loop that opened them
+    def __init__(self, size: int):
+        self.slots = asyncio.Semaphore(size)
+        self.idle: List[_PooledConnection] = []
+
+
+class SMTPConnectionPool:
+    """
+    Pool of long-lived, authenticated SMTP connections
+    A connection is replaced after max_messages messages, or as soon as it fails.
+    Each event loop (the API's, or one per worker consumer) has its own size connections.
+    """
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str,
+        password: str,
+        use_tls: bool,
+        size: int,
+        max_messages: int,
+        timeout: float
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self._loops: Dict[asyncio.AbstractEventLoop, _LoopConnections] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.connections_opened = 0
+        self.messages_sent = 0
+
+    async def send(self, message: Message) -> None:
+        """
+        Send a message on a pooled connection, reconnecting once if the connection dropped
+        Raises the SMTP error if the message could not be sent
+        """
+        await self._deliver(lambda client: client.send_message(message))
+
+    async def sendmail(self, sender: str, recipients: List[str], data: bytes) -> None:
+        """
+        Like send, for a message that is already encoded
+        """
+        await self._deliver(lambda client: client.sendmail(sender, recipients, data))
+
+    async def _deliver(self, transmit: Callable[[aiosmtplib.SMTP], Awaitable[Any]]) -> None:
+        pool = self._get_pool()
+        async with pool.slots:
+            for attempt in range(2):
+                connection = await self._acquire(pool)
+                try:
+                    with timed(SMTP_SEND_SECONDS):
+                        await transmit(connection.client)
+                except RECONNECT_ERRORS:
+                    await self._discard(connection)
+                    if attempt:
+                        raise
+                    logger.info("SMTP connection lost; reconnecting")
+                    continue
+                except Exception:
+                    # e.g. a refused recipient; the connection itself is still fine
+                    pool.idle.append(connection)
+                    raise
+
+                connection.messages_sent += 1
+                self.messages_sent += 1
+                if connection.messages_sent >= self.max_messages:
+                    await self._discard(connection)
+                else:
+                    pool.idle.append(connection)
+                return
+
+    async def close(self) -> None:
+        """
+        Close the running event loop's idle connections
+        """
+        with self._lock:
+            pool = self._loops.pop(asyncio.get_running_loop(), None)
+        for connection in pool.idle if pool else []:
+            await self._discard(connection)
+
+    async def _acquire(self, pool: _LoopConnections) -> _PooledConnection:
+        while pool.idle:
+            connection = pool.idle.pop()
+            if connection.client.is_connected:
+                return connection
+
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=self.use_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        if self.username:
+            await client.login(self.username, self.password)
+        self.connections_opened += 1
+        return _PooledConnection(client)
+
+    async def _discard(self, connection: _PooledConnection) -> None:
+        try:
+            if connection.client.is_connected:
+                await connection.client.quit()
+        except Exception:
+            connection.client.close()
+
+    def _get_pool(self) -> _LoopConnections:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._loops:
+                self._loops[loop] = _LoopConnections(self.size)
+            return self._loops[loop]
+
+smtp_pool = SMTPConnectionPool(
+    hostname=settings.SMTP_HOST,
+    port=settings.SMTP_PORT,
+    username=settings.SMTP_USER,
+    password=settings.SMTP_PASSWORD,
+    use_tls=settings.SMTP_USE_TLS,
+    size=settings.SMTP_POOL_SIZE,
+    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    timeout=settings.SMTP_TIMEOUT_SECONDS
+)
@@ -0,0 +1,221 @@
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+TaskHandler = Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class TaskDefinition:
+    name: str
+    handler: TaskHandler
+    priority: int = 0
+    max_attempts: Optional[int] = None
+
+
+class TaskQueue:
+    """
+    Durable task queue stored in the application database
+    Tasks are claimed with a visibility timeout, so a task whose worker dies
+    becomes claimable again, and failed tasks are retried with exponential backoff.
+    """
+    def __init__(self):
+        self._definitions: Dict[str, TaskDefinition] = {}
+
+    def task(self, name: str, *, priority: int = 0, max_attempts: Optional[int] = None):
+        """
+        Register an async handler; it is called as handler(db, **payload)
+        """
+        def decorator(handler: TaskHandler) -> TaskHandler:
+            self._definitions[name] = TaskDefinition(name, handler, priority, max_attempts)
+            return handler
+        return decorator
+
+    def get_definition(self, name: str) -> Optional[TaskDefinition]:
+        return self._definitions.get(name)
+
+    def enqueue(
+        self,
+        db: Session,
+        name: str,
+        payload: Optional[Dict[str, Any]] = None,
+        *,
+        priority: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        delay_seconds: float = 0
+    ) -> Task:
+        """
+        Add a task to the queue
+        Priority and max attempts default to the values the task was registered with
+        """
+        task = self._build_task(name, payload, priority, max_attempts, delay_seconds)
+        db.add(task)
+        db.commit()
+        db.refresh(task)
+        return task
+
+    async def aenqueue(
+        self,
+        db: AsyncSession,
+        name: str,
+        payload: Optional[Dict[str, Any]] = None,
+        *,
+        priority: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        delay_seconds: float = 0
+    ) -> Task:
+        """
+        enqueue() for an async session
+        """
+        task = self._build_task(name, payload, priority, max_attempts, delay_seconds)
+        db.add(task)
+        await db.commit()
+        return task
+
+    def claim(self, db: Session, worker_id: str) -> Optional[Task]:
+        """
+        Atomically claim the next due task, or a running task whose visibility timeout expired
+        """
+        now = _utcnow()
+        claimable = or_(
+            and_(Task.status == "queued", Task.run_at <= now),
+            and_(Task.status == "running", Task.locked_until < now)
+        )
+        candidate_ids = [
+            task_id for (task_id,) in db.query(Task.id)
+            .filter(claimable)
+            .order_by(Task.priority.desc(), Task.run_at, Task.id)
+            .limit(10)
+        ]
+
+        for task_id in candidate_ids:
+            # Only one worker can win the conditional update
+            result = db.execute(
+                update(Task)
+                .where(Task.id == task_id, claimable)
+                .values(
+                    status="running",
+                    attempts=Task.attempts + 1,
+                    worker_id=worker_id,
+                    locked_until=now + timedelta(seconds=settings.TASK_VISIBILITY_TIMEOUT_SECONDS)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if result.rowcount != 1:
+                continue
+
+            task = db.get(Task, task_id, populate_existing=True)
+            if task.attempts > task.max_attempts:
+                # Its worker kept dying or stalling; stop handing it out
+                self._finish(db, task, "failed", "Visibility timeout expired on the final attempt")
+                continue
+            return task
+
+        db.commit()
+        return None
+
+    def heartbeat(self, db: Session, task: Task) -> None:
+        """
+        Extend the visibility timeout of a running task
+        """
+        db.execute(
+            update(Task)
+            .where(Task.id == task.id, Task.status == "running", Task.worker_id == task.worker_id)
+            .values(locked_until=_utcnow() + timedelta(seconds=settings.TASK_VISIBILITY_TIMEOUT_SECONDS))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def complete(self, db: Session, task: Task) -> None:
+        self._finish(db, task, "done")
+
+    def fail(self, db: Session, task: Task, error: str) -> None:
+        """
+        Schedule a retry with exponential backoff, or mark the task failed
+        """
+        if task.attempts >= task.max_attempts:
+            self._finish(db, task, "failed", error)
+            return
+
+        backoff = min(
+            settings.TASK_RETRY_BACKOFF_SECONDS * 2 ** (task.attempts - 1),
+            settings.TASK_RETRY_BACKOFF_MAX_SECONDS
+        )
+        task.status = "queued"
+        task.run_at = _utcnow() + timedelta(seconds=backoff)
+        task.locked_until = None
+        task.last_error = error
+        db.add(task)
+        db.commit()
+
+    async def run(self, db: Session, task: Task) -> Any:
+        """
+        Call the registered handler for a claimed task
+        """
+        definition = self._definitions.get(task.name)
+        if definition is None:
+            raise LookupError(f"No handler registered for task '{task.name}'")
+        return await definition.handler(db, **json.loads(task.payload))
+
+    def stats(self, db: Session) -> Dict[str, int]:
+        """
+        Task counts by status, plus the number of tasks due now (queue depth)
+        """
+        counts = {status: 0 for status in ("queued", "running", "done", "failed")}
+        for status, count in db.query(Task.status, func.count(Task.id)).group_by(Task.status):
+            counts[status] = count
+        counts["depth"] = db.query(func.count(Task.id)).filter(
+            Task.status == "queued", Task.run_at <= _utcnow()
+        ).scalar()
+        return counts
+
+    def _build_task(
+        self,
+        name: str,
+        payload: Optional[Dict[str, Any]],
+        priority: Optional[int],
+        max_attempts: Optional[int],
+        delay_seconds: float
+    ) -> Task:
+        definition = self._definitions.get(name)
+        if priority is None:
+            priority = definition.priority if definition else 0
+        if max_attempts is None:
+            max_attempts = (definition and definition.max_attempts) or settings.TASK_MAX_ATTEMPTS
+
+        return Task(
+            name=name,
+            payload=json.dumps(payload or {}),
+            priority=priority,
+            max_attempts=max_attempts,
+            status="queued",
+            attempts=0,
+            run_at=_utcnow() + timedelta(seconds=delay_seconds)
+        )
+
+    def _finish(self, db: Session, task: Task, status: str, error: Optional[str] = None) -> None:
+        task.status = status
+        task.locked_until = None
+        if error is not None:
+            task.last_error = error
+        db.add(task)
+        db.commit()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+task_queue = TaskQueue()
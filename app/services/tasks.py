@@ -0,0 +1,59 @@
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.api.schemas import EmailTemplateParams
+from app.services.bulk_ingest import bulk_ingest_service
+from app.services.campaign_service import campaign_service
+from app.services.candidate_service import candidate_service
+from app.services.external_source import external_source
+from app.services.resume_parser import resume_parser
+from app.services.task_queue import task_queue
+
+# Background jobs run by the worker (python -m app.worker)
+# Each handler gets a session the worker opens for that task alone
+
+
+@task_queue.task("process_resume", priority=10)
+async def process_resume(db: Session, *, candidate_id: int, resume_path: str):
+    await resume_parser.process_resume(db, candidate_id=candidate_id, resume_path=resume_path)
+
+
+@task_queue.task("match_candidates_to_job", priority=5)
+async def match_candidates_to_job(db: Session, *, job_id: int, incremental: bool = False):
+    await candidate_service.match_candidates_to_job(db, job_id=job_id, incremental=incremental)
+
+
+@task_queue.task("search_external_candidates")
+async def search_external_candidates(db: Session, *, job_id: int, sources: List[str]):
+    await external_source.search_candidates(db, job_id=job_id, sources=sources)
+
+
+@task_queue.task("ingest_batch")
+async def ingest_batch(db: Session, *, batch_id: str):
+    # A retried batch picks up from the files that are not done yet
+    await bulk_ingest_service.run_batch(db, batch_id)
+
+
+@task_queue.task("send_invitation_campaign", max_attempts=1)
+async def send_invitation_campaign(
+    db: Session,
+    *,
+    job_id: int,
+    shortlisted_only: bool = False,
+    min_score: Optional[float] = None,
+    resend: bool = False,
+    template_name: str = "interview_invitation",
+    subject: Optional[str] = None,
+    custom_message: Optional[str] = None
+):
+    # Not retried: outcomes are committed in batches, but a rerun would still
+    # re-invite the last uncommitted batch (and everyone, with resend)
+    await campaign_service.send_invitations(
+        db,
+        job_id,
+        shortlisted_only=shortlisted_only,
+        min_score=min_score,
+        resend=resend,
+        template=EmailTemplateParams(template_name=template_name, subject=subject, custom_message=custom_message)
+    )
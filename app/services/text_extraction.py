@@ -0,0 +1,88 @@
+import os
+from typing import Iterator, Optional
+
+# These functions run inside extraction pool worker processes, so the module
+# stays free of application imports to keep worker start-up cheap
+
+
+def extract_text(file_path: str, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    """
+    Extract text from a PDF, DOCX or plain text file
+    Stops reading the document once max_chars characters have been collected
+    """
+    parts = []
+    collected = 0
+    for chunk in iter_text(file_path, max_pages):
+        parts.append(chunk)
+        collected += len(chunk)
+        if max_chars and collected >= max_chars:
+            break
+    
+    text = "".join(parts)
+    return text[:max_chars] if max_chars else text
+
+
+def iter_text(file_path: str, max_pages: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of a PDF, DOCX or plain text file chunk by chunk
+    """
+    file_extension = os.path.splitext(file_path)[1].lower()
+    
+    if file_extension == ".pdf":
+        return iter_pdf_text(file_path, max_pages)
+    elif file_extension == ".docx":
+        return iter_docx_text(file_path)
+    else:
+        return iter_plain_text(file_path)
+
+
+def iter_pdf_text(pdf_path: str, max_pages: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of a PDF file page by page, up to max_pages pages
+    Pages are only decoded when the consumer asks for them
+    """
+    from PyPDF2 import PdfReader
+    
+    reader = PdfReader(pdf_path)
+    page_count = len(reader.pages)
+    if max_pages:
+        page_count = min(page_count, max_pages)
+    
+    for index in range(page_count):
+        yield (reader.pages[index].extract_text() or "") + "\n"
+
+
+def iter_docx_text(docx_path: str) -> Iterator[str]:
+    """
+    Yield the text of a DOCX file paragraph by paragraph
+    """
+    import docx
+    
+    doc = docx.Document(docx_path)
+    for paragraph in doc.paragraphs:
+        yield paragraph.text + "\n"
+
+
+def iter_plain_text(file_path: str, chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """
+    Yield the text of a plain text file in chunks
+    """
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def limit_worker_memory(max_memory_mb: int) -> None:
+    """
+    Pool initializer capping a worker's address space
+    """
+    if not max_memory_mb:
+        return
+    
+    import resource
+    
+    limit = max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
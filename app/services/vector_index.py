@@ -0,0 +1,260 @@
+import fcntl
+import json
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.models.candidate import Candidate
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+STOP_WORDS = {
+    "and", "or", "the", "a", "an", "in", "of", "to", "for", "with", "on", "at", "as", "is",
+    "are", "be", "by", "from", "our", "you", "your", "we", "will", "this", "that", "years", "year"
+}
+MIN_CAPACITY = 1024
+
+
+class CandidateVectorIndex:
+    """
+    Local similarity index over candidate profiles
+    Profiles are embedded with a signed hashing vectorizer (no vocabulary, no
+    network) and stored in memory-mapped files so restarts don't rebuild them.
+    Rows are updated in place when a candidate is written again.
+    """
+    def __init__(self, directory: Path, dim: int):
+        self.directory = Path(directory)
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self._ids: Optional[np.memmap] = None
+        self._rows = {}
+        self._count = 0
+        self._capacity = 0
+        self._meta_mtime = None
+
+    def vectorize(self, text: str) -> np.ndarray:
+        """
+        Embed text as an L2-normalised hashed term-frequency vector
+        """
+        vector = np.zeros(self.dim, dtype=np.float32)
+        counts = {}
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            token = token.rstrip(".")
+            if len(token) > 1 and token not in STOP_WORDS:
+                counts[token] = counts.get(token, 0) + 1
+
+        for token, count in counts.items():
+            digest = zlib.crc32(token.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dim] += sign * (1.0 + np.log(count))
+
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector
+
+    def candidate_text(self, candidate, resume_text: Optional[str] = None) -> str:
+        """
+        Text representation of a candidate profile
+        Position and skills are repeated so they outweigh long resume bodies
+        """
+        skills = " ".join(skill.name for skill in candidate.skills)
+        position = candidate.current_position or ""
+        return " ".join(filter(None, [position, position, skills, skills, candidate.education, resume_text]))
+
+    def job_text(self, job) -> str:
+        return " ".join(filter(None, [job.title, job.title, job.requirements, job.description]))
+
+    def upsert_candidate(self, candidate, resume_text: Optional[str] = None) -> None:
+        self.upsert(candidate.id, self.candidate_text(candidate, resume_text))
+
+    def upsert(self, candidate_id: int, text: str) -> None:
+        """
+        Add or replace one candidate's vector
+        """
+        self.upsert_many([(candidate_id, text)])
+
+    def upsert_many(self, items: Iterable[Tuple[int, str]]) -> None:
+        vectors = [(candidate_id, self.vectorize(text)) for candidate_id, text in items]
+        if not vectors:
+            return
+
+        with self._lock, self._file_lock():
+            self._load()
+            for candidate_id, vector in vectors:
+                row = self._rows.get(candidate_id)
+                if row is None:
+                    if self._count == self._capacity:
+                        self._grow(max(MIN_CAPACITY, self._capacity * 2))
+                    row = self._count
+                    self._count += 1
+                    self._ids[row] = candidate_id
+                    self._rows[candidate_id] = row
+                self._vectors[row] = vector
+            self._flush()
+
+    def remove(self, candidate_id: int) -> None:
+        with self._lock, self._file_lock():
+            self._load()
+            row = self._rows.pop(candidate_id, None)
+            if row is None:
+                return
+            self._ids[row] = -1
+            self._vectors[row] = 0.0
+            self._flush()
+
+    def search(self, text: str, k: int = 20) -> List[Tuple[int, float]]:
+        """
+        Return up to k (candidate_id, cosine similarity) pairs, most similar first
+        """
+        with self._lock:
+            self._load()
+            if not self._count or k <= 0:
+                return []
+
+            query = self.vectorize(text)
+            scores = self._vectors[:self._count] @ query
+            scores[self._ids[:self._count] < 0] = -np.inf
+
+            k = min(k, self._count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                (int(self._ids[row]), float(scores[row]))
+                for row in top
+                if np.isfinite(scores[row])
+            ]
+
+    def search_job(self, job, k: int = 20) -> List[Tuple[int, float]]:
+        return self.search(self.job_text(job), k)
+
+    def rebuild(self, db: Session, batch_size: int = 1000) -> int:
+        """
+        Rebuild the index from every candidate in the database
+        """
+        with self._lock, self._file_lock():
+            self._close()
+            for name in ("vectors.f32", "ids.i64", "meta.json"):
+                path = self.directory / name
+                if path.exists():
+                    path.unlink()
+
+        total = 0
+        query = db.query(Candidate).options(selectinload(Candidate.skills)).order_by(Candidate.id)
+        batch = []
+        for candidate in query.yield_per(batch_size):
+            batch.append((candidate.id, self.candidate_text(candidate)))
+            if len(batch) >= batch_size:
+                self.upsert_many(batch)
+                total += len(batch)
+                batch = []
+        self.upsert_many(batch)
+        return total + len(batch)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._rows)
+
+    def _load(self) -> None:
+        """
+        (Re)open the memory-mapped files if another process changed them
+        """
+        meta_path = self.directory / "meta.json"
+        mtime = meta_path.stat().st_mtime_ns if meta_path.exists() else None
+        if self._vectors is not None and mtime == self._meta_mtime:
+            return
+
+        self._close()
+        if mtime is None:
+            return
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim:
+            raise ValueError(f"Vector index at {self.directory} was built with dim={meta['dim']}")
+
+        self._count = meta["count"]
+        self._capacity = meta["capacity"]
+        self._vectors = np.memmap(self.directory / "vectors.f32", dtype=np.float32, mode="r+",
+                                  shape=(self._capacity, self.dim))
+        self._ids = np.memmap(self.directory / "ids.i64", dtype=np.int64, mode="r+",
+                              shape=(self._capacity,))
+        ids = np.asarray(self._ids[:self._count])
+        self._rows = {int(candidate_id): row for row, candidate_id in enumerate(ids) if candidate_id >= 0}
+        self._meta_mtime = mtime
+
+    def _grow(self, capacity: int) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._close(keep_state=True)
+        for name, itemsize in (("vectors.f32", 4 * self.dim), ("ids.i64", 8)):
+            with open(self.directory / name, "ab") as f:
+                f.truncate(capacity * itemsize)
+
+        self._capacity = capacity
+        self._vectors = np.memmap(self.directory / "vectors.f32", dtype=np.float32, mode="r+",
+                                  shape=(capacity, self.dim))
+        self._ids = np.memmap(self.directory / "ids.i64", dtype=np.int64, mode="r+",
+                              shape=(capacity,))
+
+    def _flush(self) -> None:
+        self._vectors.flush()
+        self._ids.flush()
+
+        meta_path = self.directory / "meta.json"
+        tmp_path = self.directory / "meta.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": self.dim, "count": self._count, "capacity": self._capacity}, f)
+        os.replace(tmp_path, meta_path)
+        self._meta_mtime = meta_path.stat().st_mtime_ns
+
+    def _close(self, keep_state: bool = False) -> None:
+        self._vectors = None
+        self._ids = None
+        if not keep_state:
+            self._rows = {}
+            self._count = 0
+            self._capacity = 0
+            self._meta_mtime = None
+
+    def _file_lock(self):
+        """
+        Exclusive lock so worker processes don't write the files concurrently
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        return _FileLock(self.directory / "index.lock")
+
+
+class _FileLock:
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "w")
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+vector_index = CandidateVectorIndex(settings.VECTOR_INDEX_DIR, settings.VECTOR_INDEX_DIM)
+
+
+if __name__ == "__main__":
+    from app.core.deps import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Indexed {vector_index.rebuild(db)} candidates into {settings.VECTOR_INDEX_DIR}")
+    finally:
+        db.close()
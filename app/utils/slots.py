@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Tuple
+
+
+class SharedSemaphore:
+    """
+    Async counting semaphore shared by every event loop in the process
+    asyncio.Semaphore belongs to one loop; this one can be awaited from loops
+    running in different threads (e.g. the worker's consumers). Waiters are
+    served first come, first served.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self._free = size
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, waiter))
+                    handed_over = False
+                except ValueError:
+                    handed_over = True
+            if handed_over:
+                # The slot was passed to us as we were cancelled; pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while True:
+            with self._lock:
+                if not self._waiters:
+                    self._free += 1
+                    return
+                loop, waiter = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+                return
+            except RuntimeError:
+                continue  # Its loop is closed; try the next waiter
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    # A waiter cancelled after being picked passes the slot on itself
+    if not waiter.done():
+        waiter.set_result(None)
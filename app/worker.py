@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+from prometheus_client import start_http_server
+
+from app.core.config import settings
+from app.core.deps import SessionLocal
+from app.models.task import Task
+from app.services.extraction_pool import extraction_pool
+from app.services.http_client import http_client
+from app.services.smtp_pool import smtp_pool
+from app.services.tasks import task_queue
+
+logging.basicConfig(level=settings.LOG_LEVEL.upper())
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Runs queued background tasks with N concurrent consumers
+    Each consumer is a thread with its own event loop and takes one task at a
+    time, each with its own database session, so a handler that blocks (sync
+    database I/O, CPU work) only holds up its own consumer. Heartbeats for the
+    running tasks are sent from the main loop, so a task's visibility timeout
+    only expires if this process dies or a consumer thread is gone.
+    """
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = threading.Event()
+        self._running: Dict[int, Task] = {}  # Consumer number -> its running task
+        self._lock = threading.Lock()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+
+        logger.info("Worker %s started with %d consumers", self.worker_id, self.concurrency)
+        consumers = [
+            threading.Thread(target=self._consume, args=(n,), name=f"consumer-{n}", daemon=True)
+            for n in range(self.concurrency)
+        ]
+        for consumer in consumers:
+            consumer.start()
+        try:
+            await self._heartbeat(consumers)
+        finally:
+            self._stopping.set()
+            for consumer in consumers:
+                await asyncio.to_thread(consumer.join)
+            extraction_pool.shutdown()
+            logger.info("Worker %s stopped", self.worker_id)
+
+    def stop(self) -> None:
+        """
+        Stop claiming new tasks; tasks already running are allowed to finish
+        """
+        logger.info("Worker %s shutting down", self.worker_id)
+        self._stopping.set()
+
+    def _consume(self, n: int) -> None:
+        worker_id = f"{self.worker_id}/{n}"
+        loop = asyncio.new_event_loop()
+        try:
+            while not self._stopping.is_set():
+                task = self._claim(worker_id)
+                if task is None:
+                    self._stopping.wait(self.poll_interval)
+                    continue
+                with self._lock:
+                    self._running[n] = task
+                try:
+                    loop.run_until_complete(self._run_task(task))
+                finally:
+                    with self._lock:
+                        del self._running[n]
+        finally:
+            # HTTP and SMTP connections belong to this consumer's loop
+            loop.run_until_complete(self._close_connections())
+            loop.close()
+
+    def _claim(self, worker_id: str) -> Optional[Task]:
+        db = SessionLocal()
+        try:
+            task = task_queue.claim(db, worker_id)
+            if task is not None:
+                db.expunge(task)
+            return task
+        except Exception:
+            logger.exception("Failed to claim a task")
+            return None
+        finally:
+            db.close()
+
+    async def _run_task(self, task: Task) -> None:
+        db = SessionLocal()
+        try:
+            await task_queue.run(db, task)
+        except Exception as e:
+            logger.exception("Task %s (%s) failed on attempt %d", task.id, task.name, task.attempts)
+            db.rollback()
+            self._record(task, error=f"{type(e).__name__}: {e}")
+        else:
+            self._record(task)
+        finally:
+            db.close()
+
+    async def _close_connections(self) -> None:
+        await http_client.close()
+        await smtp_pool.close()
+
+    async def _heartbeat(self, consumers: List[threading.Thread]) -> None:
+        """
+        Extend the visibility timeout of every running task until all consumers have stopped
+        """
+        interval = max(1.0, settings.TASK_VISIBILITY_TIMEOUT_SECONDS / 3)
+        next_beat = time.monotonic() + interval
+        while any(consumer.is_alive() for consumer in consumers):
+            await asyncio.sleep(min(self.poll_interval, interval))
+            if time.monotonic() < next_beat:
+                continue
+            next_beat = time.monotonic() + interval
+            with self._lock:
+                running = list(self._running.values())
+            if running:
+                await asyncio.to_thread(self._send_heartbeats, running)
+
+    def _send_heartbeats(self, tasks: List[Task]) -> None:
+        db = SessionLocal()
+        try:
+            for task in tasks:
+                try:
+                    task_queue.heartbeat(db, task)
+                except Exception:
+                    db.rollback()
+                    logger.exception("Heartbeat for task %s failed", task.id)
+        finally:
+            db.close()
+
+    def _record(self, task: Task, error: Optional[str] = None) -> None:
+        # Outcome is written with a fresh session so a broken task session can't lose it
+        db = SessionLocal()
+        try:
+            task = db.merge(task)
+            if error is None:
+                task_queue.complete(db, task)
+            else:
+                task_queue.fail(db, task, error)
+        finally:
+            db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background task consumers")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=settings.WORKER_POLL_INTERVAL_SECONDS)
+    args = parser.parse_args()
+
+    if settings.METRICS_ENABLED and settings.METRICS_WORKER_PORT:
+        start_http_server(settings.METRICS_WORKER_PORT)
+
+    asyncio.run(Worker(args.concurrency, args.poll_interval).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare two benchmark result files and flag regressions
+
+    python -m benchmarks.compare benchmarks/results/main-10000.json benchmarks/results/head-10000.json
+
+Exits with status 1 if any scenario got slower than --threshold allows.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Metrics where a higher value in the new run is worse
+COMPARED_METRICS = ("seconds", "p95_ms")
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> Tuple[List[List[str]], bool]:
+    """
+    Rows of (scenario, metric, base, head, change, flag) and whether anything regressed
+    """
+    rows = []
+    regressed = False
+    for name, head_result in head["scenarios"].items():
+        base_result = base["scenarios"].get(name)
+        if base_result is None:
+            rows.append([name, "", "", "", "", "new"])
+            continue
+        for metric in COMPARED_METRICS:
+            before: Optional[float] = base_result.get(metric)
+            after: Optional[float] = head_result.get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "REGRESSION"
+                regressed = True
+            elif change < -threshold:
+                flag = "faster"
+            if base_result.get("items") != head_result.get("items"):
+                flag = (flag + " (item counts differ)").strip()
+            rows.append([name, metric, f"{before:g}", f"{after:g}", f"{change:+.1%}", flag])
+    return rows, regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown counted as a regression")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text())
+    head = json.loads(args.head.read_text())
+    if base["meta"]["parameters"] != head["meta"]["parameters"]:
+        print("Warning: the runs used different parameters; numbers may not be comparable")
+
+    rows, regressed = compare(base, head, args.threshold)
+    header = ["scenario", "metric", base["meta"]["label"], head["meta"]["label"], "change", ""]
+    widths = [max(len(str(row[i])) for row in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip())
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from docx import Document
+from sqlalchemy.orm import Session
+
+from app.models.candidate import Candidate, CandidateJobMatch, Job
+from app.services.candidate_service import candidate_service
+
+# Synthetic but plausible recruiting data; everything derives from the seed
+
+FIRST_NAMES = [
+    "Ada", "Alan", "Grace", "Linus", "Margaret", "Dennis", "Barbara", "Ken", "Frances", "Guido",
+    "Radia", "Bjarne", "Katherine", "James", "Hedy", "Tim", "Anita", "Edsger", "Shafi", "Donald",
+]
+LAST_NAMES = [
+    "Lovelace", "Turing", "Hopper", "Torvalds", "Hamilton", "Ritchie", "Liskov", "Thompson", "Allen",
+    "Rossum", "Perlman", "Stroustrup", "Johnson", "Gosling", "Lamarr", "Berners-Lee", "Borg", "Dijkstra",
+    "Goldwasser", "Knuth",
+]
+SKILLS = [
+    "Python", "Java", "Go", "Rust", "TypeScript", "JavaScript", "C++", "C#", "Kotlin", "Scala",
+    "SQL", "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka", "RabbitMQ", "Elasticsearch", "Spark", "Airflow",
+    "Docker", "Kubernetes", "Terraform", "AWS", "GCP", "Azure", "Linux", "CI/CD", "Git", "GraphQL",
+    "React", "Vue", "Angular", "Node.js", "Django", "FastAPI", "Flask", "Spring", "pandas", "NumPy",
+    "PyTorch", "TensorFlow", "scikit-learn", "Machine Learning", "Data Modeling", "ETL", "REST APIs",
+    "Microservices", "Communication", "Leadership", "Mentoring", "Agile", "Scrum", "System Design",
+]
+POSITIONS = [
+    "Backend Developer", "Frontend Developer", "Full Stack Developer", "Data Engineer", "Data Scientist",
+    "DevOps Engineer", "Site Reliability Engineer", "Machine Learning Engineer", "Software Engineer",
+    "Engineering Manager",
+]
+COMPANIES = [
+    "Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech",
+    "Cyberdyne", "Soylent", "Vandelay Industries", "Tyrell Systems", "Massive Dynamic",
+]
+EDUCATION = [
+    "BSc Computer Science, University of Manchester", "MSc Software Engineering, TU Delft",
+    "BEng Electrical Engineering, IIT Bombay", "MSc Data Science, University of Edinburgh",
+    "BSc Mathematics, University of Toronto", "PhD Computer Science, ETH Zurich",
+]
+SOURCES = ["applied", "applied", "applied", "linkedin", "cvlibrary", "naukri"]
+JOB_TYPES = ["full-time", "full-time", "contract", "part-time"]
+LOCATIONS = ["London", "Berlin", "Bangalore", "Remote", "Toronto", "Amsterdam"]
+
+BATCH_SIZE = 1000
+
+
+def person(rng: random.Random, n: int) -> Dict:
+    """
+    One synthetic person; n keeps the email unique
+    """
+    first_name = rng.choice(FIRST_NAMES)
+    last_name = rng.choice(LAST_NAMES)
+    return {
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": f"{first_name}.{last_name}.{n}@example.com".lower(),
+        "phone": f"+44 20 7946 {n % 10000:04d}",
+        "current_position": rng.choice(POSITIONS),
+        "current_company": rng.choice(COMPANIES),
+        "experience_years": float(rng.randint(0, 20)),
+        "education": rng.choice(EDUCATION),
+        "skills": rng.sample(SKILLS, rng.randint(3, 12)),
+    }
+
+
+def generate_candidates(db: Session, count: int, seed: int = 0) -> List[int]:
+    """
+    Insert count candidates with skills, created over the past year, in batches
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    ids: List[int] = []
+    for start in range(0, count, BATCH_SIZE):
+        candidates: List[Tuple[Candidate, List[str]]] = []
+        for n in range(start, min(start + BATCH_SIZE, count)):
+            data = person(rng, n)
+            skills = data.pop("skills")
+            candidate = Candidate(
+                **data,
+                source=rng.choice(SOURCES),
+                created_at=now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+            )
+            candidates.append((candidate, skills))
+        db.add_all(candidate for candidate, _ in candidates)
+        db.flush()
+        candidate_service.link_skills(
+            db, {candidate.id: skills for candidate, skills in candidates}, commit=False
+        )
+        db.commit()
+        ids.extend(candidate.id for candidate, _ in candidates)
+        db.expunge_all()
+    return ids
+
+
+def generate_jobs(db: Session, count: int, seed: int = 0) -> List[int]:
+    """
+    Insert count jobs, each requiring a handful of the corpus skills
+    """
+    rng = random.Random(seed + 1)
+    jobs = []
+    for n in range(count):
+        position = rng.choice(POSITIONS)
+        requirements = rng.sample(SKILLS, rng.randint(4, 8))
+        jobs.append(Job(
+            title=f"{position} #{n}",
+            description=f"We are hiring a {position.lower()} to build and run our platform.",
+            requirements=", ".join(requirements),
+            location=rng.choice(LOCATIONS),
+            job_type=rng.choice(JOB_TYPES)
+        ))
+    db.add_all(jobs)
+    db.commit()
+    return [job.id for job in jobs]
+
+
+def generate_matches(db: Session, job_id: int, candidate_ids: List[int], seed: int = 0) -> None:
+    """
+    Pre-scored matches for a job, for benchmarks that start after matching
+    """
+    rng = random.Random(seed + 2)
+    for start in range(0, len(candidate_ids), BATCH_SIZE):
+        db.add_all(
+            CandidateJobMatch(candidate_id=candidate_id, job_id=job_id, score=round(rng.uniform(0.7, 1.0), 2))
+            for candidate_id in candidate_ids[start:start + BATCH_SIZE]
+        )
+        db.commit()
+
+
+def resume_text(data: Dict) -> List[str]:
+    """
+    Lines of a resume for a synthetic person
+    """
+    return [
+        f"Name: {data['first_name']} {data['last_name']}",
+        f"Email: {data['email']}",
+        f"Phone: {data['phone']}",
+        f"Current position: {data['current_position']}",
+        f"Current company: {data['current_company']}",
+        f"Experience: {data['experience_years']:g} years",
+        f"Education: {data['education']}",
+        f"Skills: {', '.join(data['skills'])}",
+        "",
+        "Summary",
+        f"{data['current_position']} with a track record of shipping reliable software at "
+        f"{data['current_company']}.",
+    ]
+
+
+def write_resumes(directory: Path, count: int, seed: int = 0) -> List[Path]:
+    """
+    Write count resumes, alternating PDF and DOCX, for people not in the candidate corpus
+    """
+    rng = random.Random(seed + 3)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for n in range(count):
+        data = person(rng, n)
+        data["email"] = f"resume.{n}@example.com"
+        lines = resume_text(data)
+        if n % 2:
+            path = directory / f"resume_{n}.docx"
+            write_docx(path, lines)
+        else:
+            path = directory / f"resume_{n}.pdf"
+            write_pdf(path, lines)
+        paths.append(path)
+    return paths
+
+
+def write_docx(path: Path, lines: List[str]) -> None:
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(str(path))
+
+
+def write_pdf(path: Path, lines: List[str]) -> None:
+    """
+    A minimal single-page PDF with one text line per resume line
+    """
+    def escape(text: str) -> str:
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    stream = "BT /F1 11 Tf 14 TL 72 740 Td " + " ".join(f"({escape(line)}) Tj T*" for line in lines) + " ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream.encode("latin-1")),
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
@@ -0,0 +1,183 @@
+"""
+Local OpenAI-compatible server for load tests
+
+Answers POST /v1/chat/completions in the ChatCompletion format LLMService
+uses, with plausible JSON for the resume extraction and match prompts (see
+benchmarks/stubs.py). Latency, 429s, errors and token usage are configurable:
+
+    python -m benchmarks.mock_openai --port 8090 --latency 0.8 --latency-sigma 0.5 \\
+        --per-token-latency 0.01 --max-concurrency 32 --rate-limit-rate 0.02 --error-rate 0.01
+
+Then run the API and workers against it:
+
+    export LLM_API_BASE=http://localhost:8090/v1 LLM_API_KEY=mock
+
+GET /stats returns request, error and token counters.
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from benchmarks.stubs import respond
+
+
+def estimate_tokens(text: str) -> int:
+    # Same rule of thumb as LLMService._estimate_tokens
+    return len(text) // 4 + 1
+
+
+class MockOpenAI:
+    """
+    ChatCompletion endpoint with seeded latency and failure injection
+
+    Latency is lognormal around `latency` seconds (sigma 0 makes it fixed), plus
+    per_token_latency for each completion token. Requests beyond max_concurrency
+    in flight, and a rate_limit_rate fraction of the rest, get a 429 with
+    Retry-After; an error_rate fraction gets a 500.
+    """
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_sigma: float = 0.0,
+        per_token_latency: float = 0.0,
+        max_concurrency: int = 0,
+        rate_limit_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.per_token_latency = per_token_latency
+        self.max_concurrency = max_concurrency
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+
+        # Counters served by /stats
+        self.requests = 0
+        self.completed = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        app.router.add_post("/chat/completions", self.chat_completions)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            return self._rate_limited("Too many concurrent requests")
+        if self.random.random() < self.rate_limit_rate:
+            return self._rate_limited("Rate limit reached for requests")
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            body = await request.json()
+            prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+            content = respond(prompt)
+            prompt_tokens = estimate_tokens(prompt)
+            completion_tokens = estimate_tokens(content)
+
+            await asyncio.sleep(self._delay(completion_tokens))
+            if self.random.random() < self.error_rate:
+                self.errors += 1
+                return self._error(500, "server_error", "The server had an error while processing your request")
+
+            self.completed += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            return web.json_response({
+                "id": f"chatcmpl-mock-{self.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+        finally:
+            self.in_flight -= 1
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "requests": self.requests,
+            "completed": self.completed,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        })
+
+    def _delay(self, completion_tokens: int) -> float:
+        delay = self.latency
+        if self.latency and self.latency_sigma:
+            delay = self.random.lognormvariate(0.0, self.latency_sigma) * self.latency
+        return delay + self.per_token_latency * completion_tokens
+
+    def _rate_limited(self, message: str) -> web.Response:
+        self.rate_limited += 1
+        return self._error(429, "rate_limit_exceeded", message, headers={"Retry-After": str(self.retry_after)})
+
+    def _error(
+        self,
+        status: int,
+        error_type: str,
+        message: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> web.Response:
+        body: Dict[str, Any] = {"error": {"message": message, "type": error_type, "param": None, "code": None}}
+        return web.json_response(body, status=status, headers=headers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.5, help="Median seconds per completion")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="Lognormal spread of the latency (0 = fixed)")
+    parser.add_argument("--per-token-latency", type=float, default=0.0, help="Seconds added per completion token")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="In-flight requests before 429s (0 = unlimited)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 500 responses")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockOpenAI(
+        latency=args.latency,
+        latency_sigma=args.latency_sigma,
+        per_token_latency=args.per_token_latency,
+        max_concurrency=args.max_concurrency,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    web.run_app(server.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Time the main paths of the app against a synthetic corpus
+
+    python -m benchmarks.run --scale 10000 --llm-latency 0.2 --output results/head.json
+    python -m benchmarks.compare results/main.json results/head.json
+
+Runs in-process against a scratch database. The language model is replaced
+by a deterministic stub, SMTP by a local sink, and the external sources by
+tests/fake_provider.py. Without --database-url the app's default SQLite
+database is created inside the scratch directory; a PostgreSQL URL must point
+at an empty database.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCENARIO_NAMES = ["match", "external", "ingest", "list", "email"]
+
+logger = logging.getLogger("benchmarks")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _configure_environment(args: argparse.Namespace, workdir: Path, smtp_port: int, provider_port: int) -> None:
+    """
+    Point the app's settings at the scratch directory and the local stand-ins
+    Must run before anything under app/ is imported
+    """
+    environment = {
+        "LOG_LEVEL": "warning",
+        "LLM_CACHE_ENABLED": "false",
+        "UPLOAD_DIR": str(workdir / "uploads"),
+        "VECTOR_INDEX_DIR": str(workdir / "index"),
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_USER": "bench@example.com",
+        "SMTP_PASSWORD": "bench",
+        "SMTP_USE_TLS": "false",
+        "EXTERNAL_RATE_LIMIT_PER_SECOND": str(args.external_rate),
+        "EXTERNAL_RATE_LIMIT_BURST": str(max(1, int(args.external_rate))),
+        "EXTERNAL_MAX_PAGES": str(math.ceil(args.external / 50) + 1),
+        "EXTERNAL_PAGE_SIZE": "50",
+    }
+    for source in ("LINKEDIN", "CVLIBRARY", "NAUKRI"):
+        environment[f"{source}_API_KEY"] = "bench"
+        environment[f"{source}_API_URL"] = f"http://127.0.0.1:{provider_port}/{source.lower()}/candidates"
+    if args.database_url:
+        environment["DATABASE_URL"] = args.database_url
+    os.environ.update(environment)
+
+
+async def _run(args: argparse.Namespace, workdir: Path, smtp_port: int, provider_port: int) -> Dict[str, Any]:
+    from app.models import Base
+    from app.core.deps import engine
+    from app.services.extraction_pool import extraction_pool
+    from app.services.http_client import http_client
+    from app.services.llm_service import llm_service
+    from app.services.smtp_pool import smtp_pool
+    from benchmarks.scenarios import SCENARIOS, BenchContext, setup_corpus
+    from benchmarks.stubs import SMTPSink, StubLLM
+
+    Base.metadata.create_all(engine)
+
+    llm = StubLLM(latency=args.llm_latency, jitter=args.llm_jitter)
+    llm.install(llm_service)
+    smtp = SMTPSink(latency=args.smtp_latency)
+    await smtp.start("127.0.0.1", smtp_port)
+
+    ctx = BenchContext(
+        workdir=workdir,
+        scale=args.scale,
+        jobs=args.jobs,
+        resumes=args.resumes,
+        external=args.external,
+        emails=args.emails,
+        list_pages=args.list_pages,
+        seed=args.seed,
+        llm=llm,
+        smtp=smtp,
+        provider_port=provider_port
+    )
+    results: Dict[str, Any] = {}
+    try:
+        results.update(await setup_corpus(ctx))
+        logger.info("Corpus: %d candidates in %.1fs", args.scale, results["corpus"]["seconds"])
+        for name in args.scenarios:
+            scenario_results = await SCENARIOS[name](ctx)
+            for key, value in scenario_results.items():
+                logger.info("%s: %d items in %.2fs", key, value["items"], value["seconds"])
+            results.update(scenario_results)
+    finally:
+        await smtp_pool.close()
+        await http_client.close()
+        extraction_pool.shutdown()
+        await smtp.close()
+    return results
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the main paths against a synthetic corpus")
+    parser.add_argument("--scale", type=int, default=1000, help="Candidates in the corpus")
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--resumes", type=int, help="Resumes bulk-ingested (default: min(scale, 200))")
+    parser.add_argument("--external", type=int, help="Candidates per external source (default: min(scale, 1000))")
+    parser.add_argument("--emails", type=int, help="Invitations sent (default: min(scale, 5000))")
+    parser.add_argument("--list-pages", type=int, default=50, help="Pages read from the candidate list per variant")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per stubbed LLM call")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="+/- seconds around --llm-latency")
+    parser.add_argument("--smtp-latency", type=float, default=0.005, help="Seconds per message at the SMTP sink")
+    parser.add_argument("--external-rate", type=float, default=100.0, help="Requests per second per external source")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenarios", default=",".join(SCENARIO_NAMES), help="Comma-separated subset to run")
+    parser.add_argument("--database-url", help="PostgreSQL URL of an empty database (default: scratch SQLite)")
+    parser.add_argument("--workdir", type=Path, help="Scratch directory (default: a new temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory")
+    parser.add_argument("--label", help="Name for this run (default: the current git commit)")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<label>-<scale>.json)")
+    args = parser.parse_args(argv)
+
+    args.resumes = min(args.scale, 200) if args.resumes is None else args.resumes
+    args.external = min(args.scale, 1000) if args.external is None else args.external
+    args.emails = min(args.scale, 5000) if args.emails is None else args.emails
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIO_NAMES)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    label = args.label or commit
+    output = (args.output or REPO_ROOT / "benchmarks" / "results" / f"{label}-{args.scale}.json").resolve()
+
+    workdir = (args.workdir or Path(tempfile.mkdtemp(prefix="recruitment-bench-"))).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    smtp_port = _free_port()
+    provider_port = _free_port()
+    _configure_environment(args, workdir, smtp_port, provider_port)
+
+    # The app's relative paths (the default SQLite database among them) resolve inside the scratch directory
+    sys.path.insert(0, str(REPO_ROOT))
+    os.chdir(workdir)
+    logging.basicConfig(level=logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(_run(args, workdir, smtp_port, provider_port))
+    finally:
+        os.chdir(REPO_ROOT)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "label": label,
+            "commit": commit,
+            "branch": _git("rev-parse", "--abbrev-ref", "HEAD"),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": "postgresql" if args.database_url else "sqlite",
+            "total_seconds": round(time.perf_counter() - started, 2),
+            "parameters": {
+                key: value for key, value in vars(args).items()
+                if key not in ("database_url", "workdir", "output", "keep", "label")
+            },
+        },
+        "scenarios": results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import statistics
+import time
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from aiohttp import web
+from starlette.datastructures import UploadFile
+
+from app.core.deps import AsyncSessionLocal, SessionLocal
+from app.main import app
+from app.models.candidate import CandidateJobMatch, Job
+from app.services.bulk_ingest import bulk_ingest_service
+from app.services.campaign_service import campaign_service
+from app.services.candidate_service import candidate_service
+from app.services.external_source import external_source
+from app.services.smtp_pool import smtp_pool
+from benchmarks import corpus
+from benchmarks.stubs import SMTPSink, StubLLM
+from tests.fake_provider import FakeProvider
+
+# Each scenario times one main path against the corpus and returns
+# {scenario name: result}; results are plain JSON-serialisable dicts
+
+EXTERNAL_SOURCES = ["linkedin", "cvlibrary", "naukri"]
+LIST_PAGE_SIZE = 50
+
+
+@dataclass
+class BenchContext:
+    workdir: Path
+    scale: int
+    jobs: int
+    resumes: int
+    external: int
+    emails: int
+    list_pages: int
+    seed: int
+    llm: StubLLM
+    smtp: SMTPSink
+    provider_port: int
+    candidate_ids: List[int] = field(default_factory=list)
+    job_ids: List[int] = field(default_factory=list)
+
+
+def result(items: int, seconds: float, **extra: Any) -> Dict[str, Any]:
+    return {
+        "items": items,
+        "seconds": round(seconds, 4),
+        "items_per_second": round(items / seconds, 2) if seconds else None,
+        **extra,
+    }
+
+
+def latency_percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """
+    p50/p95/p99 of request latencies, in milliseconds
+    """
+    if len(samples) < 2:
+        value = round(samples[0] * 1000, 2) if samples else None
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+    }
+
+
+async def setup_corpus(ctx: BenchContext) -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        ctx.candidate_ids = corpus.generate_candidates(db, ctx.scale, ctx.seed)
+        ctx.job_ids = corpus.generate_jobs(db, ctx.jobs, ctx.seed)
+        return {"corpus": result(ctx.scale, time.perf_counter() - started, jobs=ctx.jobs)}
+    finally:
+        db.close()
+
+
+async def bench_match(ctx: BenchContext) -> Dict[str, Any]:
+    """
+    A full matching run for one job, then an incremental rerun that should find nothing to do
+    """
+    job_id = ctx.job_ids[0]
+    db = SessionLocal()
+    try:
+        results = {}
+        for name, incremental in (("match", False), ("match_incremental", True)):
+            calls = ctx.llm.calls
+            run_started_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            matched = await candidate_service.match_candidates_to_job(db, job_id=job_id, incremental=incremental)
+            elapsed = time.perf_counter() - started
+            scored = db.query(CandidateJobMatch).filter(
+                CandidateJobMatch.job_id == job_id, CandidateJobMatch.scored_at >= run_started_at
+            ).count()
+            results[name] = result(scored, elapsed, matched=len(matched), llm_calls=ctx.llm.calls - calls)
+        return results
+    finally:
+        db.close()
+
+
+async def bench_external(ctx: BenchContext) -> Dict[str, Any]:
+    """
+    Import ctx.external candidates from each external source, served by the fake provider
+    """
+    provider = FakeProvider(total=ctx.external, seed=ctx.seed)
+    runner = web.AppRunner(provider.app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", ctx.provider_port).start()
+    db = SessionLocal()
+    try:
+        calls = ctx.llm.calls
+        started = time.perf_counter()
+        found = await external_source.search_candidates(db, ctx.job_ids[-1], EXTERNAL_SOURCES)
+        elapsed = time.perf_counter() - started
+        return {"external_import": result(
+            found["total_candidates_found"], elapsed, requests=provider.requests, llm_calls=ctx.llm.calls - calls
+        )}
+    finally:
+        db.close()
+        await runner.cleanup()
+
+
+async def bench_ingest(ctx: BenchContext) -> Dict[str, Any]:
+    """
+    Bulk-ingest a zip of PDF and DOCX resumes through the full pipeline
+    """
+    paths = corpus.write_resumes(ctx.workdir / "resumes", ctx.resumes, ctx.seed)
+    archive_path = ctx.workdir / "resumes.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for path in paths:
+            archive.write(path, path.name)
+
+    calls = ctx.llm.calls
+    started = time.perf_counter()
+    with open(archive_path, "rb") as archive_file:
+        async with AsyncSessionLocal() as adb:
+            batch = await bulk_ingest_service.create_batch(
+                adb, [UploadFile(file=archive_file, filename=archive_path.name)]
+            )
+    db = SessionLocal()
+    try:
+        await bulk_ingest_service.run_batch(db, batch.id)
+        elapsed = time.perf_counter() - started
+        status = bulk_ingest_service.get_status(db, batch.id)
+    finally:
+        db.close()
+    return {"ingest": result(
+        status["counts"].get("done", 0), elapsed,
+        failed=status["counts"].get("failed", 0),
+        llm_calls=ctx.llm.calls - calls
+    )}
+
+
+async def bench_list(ctx: BenchContext) -> Dict[str, Any]:
+    """
+    Page through the candidate list endpoint with its cursor, per sort order and with a filter
+    """
+    results = {}
+    variants = {
+        "candidate_list": {},
+        "candidate_list_by_score": {"sort": "match_score"},
+        "candidate_list_by_source": {"source": "linkedin"},
+    }
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        for name, params in variants.items():
+            latencies = []
+            rows = 0
+            cursor = None
+            for _ in range(ctx.list_pages):
+                page_params = {"limit": LIST_PAGE_SIZE, **params}
+                if cursor:
+                    page_params["cursor"] = cursor
+                started = time.perf_counter()
+                response = await client.get("/api/candidates/", params=page_params)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+                rows += len(response.json())
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+            results[name] = result(len(latencies), sum(latencies), rows=rows, **latency_percentiles(latencies))
+    return results
+
+
+async def bench_email(ctx: BenchContext) -> Dict[str, Any]:
+    """
+    An invitation campaign to ctx.emails pre-scored candidates through the SMTP pool
+    """
+    db = SessionLocal()
+    try:
+        job = Job(title="Campaign benchmark", description="Benchmark job", requirements="Python", job_type="full-time")
+        db.add(job)
+        db.commit()
+        corpus.generate_matches(db, job.id, ctx.candidate_ids[:ctx.emails], ctx.seed)
+
+        connections = ctx.smtp.connections
+        started = time.perf_counter()
+        report = await campaign_service.send_invitations(db, job.id)
+        elapsed = time.perf_counter() - started
+        return {"bulk_email": result(
+            report.sent, elapsed,
+            failed=report.failed,
+            smtp_connections=ctx.smtp.connections - connections,
+            smtp_pool_size=smtp_pool.size
+        )}
+    finally:
+        db.close()
+
+
+SCENARIOS = {
+    "match": bench_match,
+    "external": bench_external,
+    "ingest": bench_ingest,
+    "list": bench_list,
+    "email": bench_email,
+}
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+# Deterministic stand-ins for the language model and the SMTP server
+
+EXTRACTION_MARKER = "Extract the following information from this resume"
+MATCH_MARKER = "matches the job requirements."
+CANDIDATE_ID_PATTERN = re.compile(r"Candidate ID: (\d+)")
+
+
+def _line(pattern: str, text: str) -> Optional[str]:
+    match = re.search(rf"^\s*{pattern}:\s*(.+?)\s*$", text, re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def _prompt_random(prompt: str) -> random.Random:
+    # Seeded by the prompt, so answers don't depend on call order
+    return random.Random(hashlib.sha1(prompt.encode("utf-8")).digest())
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def extraction_response(prompt: str) -> Dict[str, Any]:
+    """
+    The fields of a resume extraction, read from a corpus-style resume in the prompt
+    """
+    resume = prompt.split("Resume:", 1)[-1]
+    rng = _prompt_random(prompt)
+    name = (_line("Name", resume) or "Sam Taylor").split(" ", 1)
+    experience = re.search(r"([\d.]+)", _line("Experience", resume) or "")
+    return {
+        "first_name": name[0],
+        "last_name": name[1] if len(name) > 1 else "",
+        "email": _line("Email", resume),
+        "phone": _line("Phone", resume),
+        "current_position": _line("Current position", resume),
+        "current_company": _line("Current company", resume),
+        "experience_years": float(experience.group(1)) if experience else float(rng.randint(0, 15)),
+        "education": _line("Education", resume),
+        "skills": _split(_line("Skills", resume)),
+    }
+
+
+def match_score(prompt: str, candidate_block: str) -> Dict[str, Any]:
+    """
+    Score from the overlap of the candidate's skills with the job requirements, plus seeded noise
+    """
+    requirements = {skill.lower() for skill in _split(_line("Requirements", prompt))}
+    skills = {skill.lower() for skill in _split(_line("Skills", candidate_block))}
+    overlap = len(requirements & skills) / len(requirements) if requirements else 0.0
+    rng = _prompt_random(candidate_block)
+    score = round(min(1.0, 0.35 + 0.55 * overlap + 0.1 * rng.random()), 2)
+    matched = ", ".join(sorted(requirements & skills)) or "none of the listed requirements"
+    return {"score": score, "feedback": f"Covers {matched}."}
+
+
+def respond(prompt: str) -> str:
+    """
+    A plausible JSON answer to any prompt LLMService sends
+    """
+    if EXTRACTION_MARKER in prompt:
+        return json.dumps(extraction_response(prompt))
+
+    blocks = CANDIDATE_ID_PATTERN.split(prompt)
+    if len(blocks) > 1:
+        # Batched match prompt: [preamble, id, block, id, block, ...]
+        return json.dumps([
+            {"candidate_id": int(candidate_id), **match_score(blocks[0], block)}
+            for candidate_id, block in zip(blocks[1::2], blocks[2::2])
+        ])
+    if MATCH_MARKER in prompt:
+        return json.dumps(match_score(prompt, prompt.split("Job Title:", 1)[0]))
+    return "{}"
+
+
+class StubLLM:
+    """
+    Replaces LLMService._call_llm and _acall_llm with respond(), after a
+    latency of mean +/- jitter seconds (seeded by the prompt)
+    """
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+
+    def install(self, service) -> None:
+        service._call_llm = self.call
+        service._acall_llm = self.acall
+
+    def call(self, prompt: str, use_cache: bool = True) -> str:
+        self.calls += 1
+        time.sleep(self._delay(prompt))
+        return respond(prompt)
+
+    async def acall(self, prompt: str, use_cache: bool = True) -> str:
+        self.calls += 1
+        await asyncio.sleep(self._delay(prompt))
+        return respond(prompt)
+
+    def _delay(self, prompt: str) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.latency + _prompt_random(prompt).uniform(-self.jitter, self.jitter))
+
+
+class SMTPSink:
+    """
+    Minimal SMTP server that accepts any login and discards every message
+    after latency seconds
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.connections = 0
+        self.messages = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str, port: int) -> None:
+        self._server = await asyncio.start_server(self._handle, host, port)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        writer.write(b"220 sink ESMTP\r\n")
+        in_data = False
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if in_data:
+                    if line == b".\r\n":
+                        in_data = False
+                        if self.latency:
+                            await asyncio.sleep(self.latency)
+                        self.messages += 1
+                        writer.write(b"250 OK\r\n")
+                        await writer.drain()
+                    continue
+
+                command = line[:4].upper()
+                if command == b"EHLO":
+                    writer.write(b"250-sink\r\n250 AUTH PLAIN LOGIN\r\n")
+                elif command == b"AUTH":
+                    writer.write(b"235 Authentication successful\r\n")
+                elif command == b"DATA":
+                    in_data = True
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                elif command == b"QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    await writer.drain()
+                    break
+                else:
+                    writer.write(b"250 OK\r\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
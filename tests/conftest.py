@@ -0,0 +1,77 @@
+import os
+import tempfile
+from typing import Callable, List
+
+# The app reads its settings and opens its default SQLite database relative to
+# the working directory at import time, so move to a scratch directory first
+WORKDIR = tempfile.mkdtemp(prefix="recruitment-agent-tests-")
+os.chdir(WORKDIR)
+os.environ.setdefault("LOG_LEVEL", "warning")
+
+import openai  # noqa: E402
+import pytest  # noqa: E402
+from openai.openai_object import OpenAIObject  # noqa: E402
+
+from app.core.deps import SessionLocal, database_url, engine  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.services.candidate_service import skill_id_cache  # noqa: E402
+from app.services.llm_cache import llm_cache  # noqa: E402
+from benchmarks.stubs import respond  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """
+    A session on a fresh, empty database
+    """
+    engine.dispose()
+    if os.path.exists(database_url.database):
+        os.remove(database_url.database)
+    Base.metadata.create_all(engine)
+    skill_id_cache.clear()
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+class FakeLLM:
+    """
+    Stands in for the OpenAI ChatCompletion API, so LLMService's caching and
+    parsing still run. Answers with reply(prompt) (benchmarks.stubs.respond
+    by default) and records every prompt that reaches it.
+    """
+    def __init__(self):
+        self.reply: Callable[[str], str] = respond
+        self.prompts: List[str] = []
+
+    @property
+    def calls(self) -> int:
+        return len(self.prompts)
+
+    def create(self, *, messages, **kwargs) -> OpenAIObject:
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        content = self.reply(prompt)
+        return OpenAIObject.construct_from({
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt) // 4 + 1, "completion_tokens": len(content) // 4 + 1}
+        })
+
+    async def acreate(self, **kwargs) -> OpenAIObject:
+        return self.create(**kwargs)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    A FakeLLM behind openai.ChatCompletion, with an empty LLM response cache
+    """
+    fake = FakeLLM()
+    monkeypatch.setattr(openai.ChatCompletion, "create", fake.create)
+    monkeypatch.setattr(openai.ChatCompletion, "acreate", fake.acreate)
+    llm_cache.clear()
+    return fake
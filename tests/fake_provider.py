@@ -0,0 +1,106 @@
+"""
+Local fake external candidate provider for tests and load runs
+
+Serves GET /{source}/candidates in the paged format the external source
+client expects, with configurable latency and failure injection:
+
+    python -m tests.fake_provider --port 8081 --total 500 --latency 0.05 --error-rate 0.1
+
+Then point a source at it, e.g. LINKEDIN_API_URL=http://localhost:8081/linkedin/candidates
+"""
+import argparse
+import asyncio
+import random
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+
+class FakeProvider:
+    """
+    Deterministic candidate generator behind an aiohttp app
+    error_rate answers with 503 and rate_limit_rate with 429 (and Retry-After)
+    """
+    def __init__(
+        self,
+        total: int = 100,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.1,
+        seed: Optional[int] = None
+    ):
+        self.total = total
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{source}/candidates", self.candidates)
+        return app
+
+    async def candidates(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        if self.random.random() < self.rate_limit_rate:
+            self.failures += 1
+            return web.json_response(
+                {"error": "rate limited"}, status=429, headers={"Retry-After": str(self.retry_after)}
+            )
+        if self.random.random() < self.error_rate:
+            self.failures += 1
+            return web.json_response({"error": "unavailable"}, status=503)
+
+        source = request.match_info["source"]
+        page = int(request.query.get("page", 1))
+        page_size = int(request.query.get("page_size", 50))
+        start = (page - 1) * page_size
+        end = min(start + page_size, self.total)
+        return web.json_response({
+            "candidates": [self.candidate(source, n) for n in range(start, end)],
+            "next_page": page + 1 if end < self.total else None
+        })
+
+    def candidate(self, source: str, n: int) -> Dict[str, Any]:
+        return {
+            "first_name": f"First{n}",
+            "last_name": f"Last{n}",
+            "email": f"{source}.candidate{n}@example.com",
+            "current_position": ("Backend Developer", "Data Engineer", "Frontend Developer")[n % 3],
+            "current_company": f"Company {n % 17}",
+            "experience_years": float(n % 12),
+            "education": "BS Computer Science"
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a fake external candidate provider")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--total", type=int, default=100, help="Candidates per source")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    provider = FakeProvider(
+        total=args.total,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+    web.run_app(provider.app(), port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.models import Candidate, Skill
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def candidates(db):
+    """
+    23 candidates sharing created_at in groups of four and match_score in groups of five
+    """
+    skill = Skill(name="Python")
+    rows = [
+        Candidate(
+            first_name=f"First{n}",
+            last_name=f"Last{n}",
+            email=f"candidate{n}@example.com",
+            source="linkedin" if n % 3 else "applied",
+            match_score=(n % 5) / 5,
+            skills=[skill]
+        )
+        for n in range(23)
+    ]
+    db.add_all(rows)
+    db.flush()
+    # Spread out in the whole-second format the server default (CURRENT_TIMESTAMP) stores
+    db.execute(text(
+        "UPDATE candidates SET created_at = datetime('2024-01-01 09:00:00', '+' || ((id - 1) / 4) || ' seconds')"
+    ))
+    db.commit()
+    return rows
+
+
+def walk(params, limit: int = 5):
+    """
+    Candidate IDs of every page, following X-Next-Cursor
+    """
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(
+            "/api/candidates/", params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        )
+        assert response.status_code == 200
+        pages.append([candidate["id"] for candidate in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_created_at_pages_have_no_gaps_or_duplicates(candidates):
+    pages = walk({})
+
+    ids = [candidate_id for page in pages for candidate_id in page]
+    expected = sorted(candidates, key=lambda candidate: (candidate.created_at, candidate.id))
+    assert ids == [candidate.id for candidate in expected]
+    assert all(len(page) == 5 for page in pages[:-1])
+
+
+def test_match_score_pages_have_no_gaps_or_duplicates(candidates):
+    pages = walk({"sort": "match_score"})
+
+    ids = [candidate_id for page in pages for candidate_id in page]
+    expected = sorted(candidates, key=lambda candidate: (candidate.match_score, candidate.id), reverse=True)
+    assert ids == [candidate.id for candidate in expected]
+
+
+def test_filtered_pages_have_no_gaps_or_duplicates(candidates):
+    pages = walk({"source": "linkedin"}, limit=4)
+
+    ids = [candidate_id for page in pages for candidate_id in page]
+    assert ids == [candidate.id for candidate in candidates if candidate.source == "linkedin"]
+
+
+def test_candidates_come_with_their_skills(candidates):
+    response = client.get("/api/candidates/", params={"limit": 3})
+
+    assert [[skill["name"] for skill in candidate["skills"]] for candidate in response.json()] == [["Python"]] * 3
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "W10", "WzEsIDIsIDNd", "eyJhIjogMX0"])
+def test_bad_cursor_is_rejected(candidates, cursor):
+    for sort in ("created_at", "match_score"):
+        response = client.get("/api/candidates/", params={"cursor": cursor, "sort": sort})
+
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Invalid cursor"}
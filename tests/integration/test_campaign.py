@@ -0,0 +1,58 @@
+import asyncio
+
+from app.core.deps import SessionLocal
+from app.models import Candidate, CandidateJobMatch, Job, JobApplication
+from app.services.campaign_service import CampaignService
+from app.services.email_service import email_service
+
+
+def invited(job_id: int):
+    """
+    Candidates whose invitation is committed, as another session sees them
+    """
+    db = SessionLocal()
+    try:
+        return sorted(
+            candidate_id for (candidate_id,) in
+            db.query(JobApplication.candidate_id).filter(JobApplication.job_id == job_id, JobApplication.email_sent)
+        )
+    finally:
+        db.close()
+
+
+def test_invitations_are_committed_in_batches(db, monkeypatch):
+    job = Job(title="Backend Developer", description="APIs", requirements="Python", job_type="full-time")
+    candidates = [
+        Candidate(first_name=f"First{n}", last_name=f"Last{n}", email=f"candidate{n}@example.com", source="applied")
+        for n in range(7)
+    ]
+    db.add_all([job, *candidates])
+    db.flush()
+    db.add_all(CandidateJobMatch(candidate_id=candidate.id, job_id=job.id, score=0.9) for candidate in candidates)
+    # One already has an application from matching
+    db.add(JobApplication(candidate_id=candidates[0].id, job_id=job.id, status="matched"))
+    db.commit()
+    job_id, candidate_ids = job.id, [candidate.id for candidate in candidates]
+
+    committed_before_send = []
+
+    async def send_prepared(template, candidate):
+        committed_before_send.append(invited(job_id))
+        return candidate.email != "candidate5@example.com"
+
+    monkeypatch.setattr(email_service, "send_prepared", send_prepared)
+    report = asyncio.run(CampaignService(concurrency=1, commit_batch_size=3).send_invitations(db, job_id))
+
+    # Each batch of three outcomes is committed before the next send
+    assert [len(ids) for ids in committed_before_send] == [0, 0, 0, 3, 3, 3, 5]
+    assert (report.sent, report.failed, report.failed_candidate_ids) == (6, 1, [candidate_ids[5]])
+    assert invited(job_id) == [candidate_id for candidate_id in candidate_ids if candidate_id != candidate_ids[5]]
+    assert db.query(JobApplication).filter(JobApplication.job_id == job_id).count() == 6
+    assert {candidate.status for candidate in db.query(Candidate).filter(Candidate.id != candidate_ids[5])} == {
+        "contacted"
+    }
+
+    # A second campaign only retries the failed invitation
+    committed_before_send.clear()
+    report = asyncio.run(CampaignService(concurrency=1, commit_batch_size=3).send_invitations(db, job_id))
+    assert (report.total, report.skipped) == (1, 6)
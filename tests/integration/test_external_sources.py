@@ -0,0 +1,209 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from app.core.config import settings
+from app.models import Candidate
+from app.services.external_source import external_source
+from app.services.http_client import CircuitOpenError, ExternalAPIError, ExternalHTTPClient, http_client
+from tests.fake_provider import FakeProvider
+
+HEADERS = {"Authorization": "Bearer test"}
+
+
+@pytest.fixture(autouse=True)
+def fast_settings(monkeypatch):
+    monkeypatch.setattr(settings, "EXTERNAL_RATE_LIMIT_PER_SECOND", 1000.0)
+    monkeypatch.setattr(settings, "EXTERNAL_RATE_LIMIT_BURST", 1000)
+    monkeypatch.setattr(settings, "EXTERNAL_RETRY_BACKOFF_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "EXTERNAL_MAX_RETRIES", 4)
+    monkeypatch.setattr(settings, "EXTERNAL_CIRCUIT_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "EXTERNAL_CIRCUIT_RESET_SECONDS", 0.5)
+
+
+class RateLimitedOnce(FakeProvider):
+    """
+    Answers the first request with 429 and Retry-After, then serves normally
+    """
+    async def candidates(self, request: web.Request) -> web.Response:
+        response = await super().candidates(request)
+        self.rate_limit_rate = 0.0
+        return response
+
+
+def with_provider(provider: FakeProvider, test):
+    """
+    Run test(base_url) against provider served on a free local port
+    """
+    async def run():
+        runner = web.AppRunner(provider.app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await test(f"http://127.0.0.1:{port}")
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+def test_pages_are_fetched_through_transient_errors(monkeypatch):
+    monkeypatch.setattr(settings, "EXTERNAL_PAGE_SIZE", 10)
+    monkeypatch.setattr(settings, "EXTERNAL_CIRCUIT_FAILURE_THRESHOLD", 10)
+    provider = FakeProvider(total=95, error_rate=0.3, seed=7)
+
+    async def test(base_url):
+        pages = external_source._iter_pages("linkedin", f"{base_url}/linkedin/candidates", "test", ["python"])
+        try:
+            return [page async for page in pages]
+        finally:
+            await http_client.close()
+
+    pages = with_provider(provider, test)
+
+    emails = [candidate["email"] for page in pages for candidate in page]
+    assert emails == [f"linkedin.candidate{n}@example.com" for n in range(95)]
+    assert provider.failures > 0
+    assert provider.requests == len(pages) + provider.failures
+
+
+def test_retry_after_is_honoured(monkeypatch):
+    # Far longer than Retry-After, so the elapsed time shows which one was used
+    monkeypatch.setattr(settings, "EXTERNAL_RETRY_BACKOFF_SECONDS", 5.0)
+    provider = RateLimitedOnce(total=3, rate_limit_rate=1.0, retry_after=0.3)
+    client = ExternalHTTPClient()
+
+    async def test(base_url):
+        started = time.monotonic()
+        try:
+            data = await client.get_json("cvlibrary", f"{base_url}/cvlibrary/candidates", headers=HEADERS)
+        finally:
+            await client.close()
+        return data, time.monotonic() - started
+
+    data, elapsed = with_provider(provider, test)
+
+    assert len(data["candidates"]) == 3
+    assert provider.requests == 2
+    assert 0.3 <= elapsed < 2.0
+
+
+def test_client_errors_are_not_retried():
+    provider = FakeProvider()
+    client = ExternalHTTPClient()
+
+    async def test(base_url):
+        try:
+            # No Authorization header: 401
+            with pytest.raises(ExternalAPIError):
+                await client.get_json("naukri", f"{base_url}/naukri/candidates")
+        finally:
+            await client.close()
+
+    with_provider(provider, test)
+    assert provider.requests == 1
+    assert client.circuit_state("naukri") == "closed"
+
+
+def test_circuit_opens_and_lets_one_trial_through():
+    provider = FakeProvider(error_rate=1.0)
+    client = ExternalHTTPClient()
+
+    async def test(base_url):
+        url = f"{base_url}/linkedin/candidates"
+        try:
+            # Three failed attempts open the circuit before the retries run out
+            with pytest.raises(CircuitOpenError):
+                await client.get_json("linkedin", url, headers=HEADERS)
+            assert provider.requests == 3
+            with pytest.raises(CircuitOpenError):
+                await client.get_json("linkedin", url, headers=HEADERS)
+            assert provider.requests == 3
+
+            await asyncio.sleep(0.5)
+            assert client.circuit_state("linkedin") == "half_open"
+            provider.error_rate = 0.0
+            provider.latency = 0.2
+            results = await asyncio.gather(
+                *(client.get_json("linkedin", url, headers=HEADERS) for _ in range(5)), return_exceptions=True
+            )
+            assert provider.requests == 4
+            assert sum(isinstance(result, dict) for result in results) == 1
+            assert sum(isinstance(result, CircuitOpenError) for result in results) == 4
+
+            assert client.circuit_state("linkedin") == "closed"
+            await client.get_json("linkedin", url, headers=HEADERS)
+            assert provider.requests == 5
+        finally:
+            await client.close()
+
+    with_provider(provider, test)
+
+
+def test_failed_trial_reopens_the_circuit():
+    provider = FakeProvider(error_rate=1.0)
+    client = ExternalHTTPClient()
+
+    async def test(base_url):
+        url = f"{base_url}/linkedin/candidates"
+        try:
+            with pytest.raises(CircuitOpenError):
+                await client.get_json("linkedin", url, headers=HEADERS)
+            await asyncio.sleep(0.5)
+
+            with pytest.raises(CircuitOpenError):
+                await client.get_json("linkedin", url, headers=HEADERS)
+            assert provider.requests == 4
+            assert client.circuit_state("linkedin") == "open"
+        finally:
+            await client.close()
+
+    with_provider(provider, test)
+
+
+def test_session_of_a_finished_event_loop_is_closed():
+    client = ExternalHTTPClient()
+
+    async def test(base_url):
+        await client.get_json("naukri", f"{base_url}/naukri/candidates", headers=HEADERS)
+        return next(iter(client._sessions.values()))
+
+    first = with_provider(FakeProvider(), test)
+    assert not first.closed
+
+    second = with_provider(FakeProvider(), test)
+    assert first.closed
+    assert list(client._sessions.values()) == [second]
+    asyncio.run(second.close())
+
+
+def test_pages_are_merged_into_existing_candidates(db):
+    db.add(Candidate(first_name="Sam", last_name="Old", email="sam@example.com", source="applied", phone="123"))
+    db.commit()
+    page = [
+        {"first_name": "Sam", "last_name": "Taylor", "email": "sam@example.com", "phone": ""},
+        {"first_name": "Ana", "email": "ana@example.com"},
+        {"email": "ana@example.com", "current_company": "Acme", "unknown": "ignored"},
+        {"first_name": "No email"},
+    ]
+
+    imported = external_source._write_page(db, "linkedin", page)
+    external_source._write_page(db, "naukri", page[:1])
+
+    assert [candidate["email"] for candidate in imported] == ["sam@example.com", "ana@example.com"]
+    sam, ana = db.query(Candidate).order_by(Candidate.id).all()
+    assert (sam.last_name, sam.phone, sam.source) == ("Taylor", "123", "applied,linkedin,naukri")
+    assert (ana.first_name, ana.current_company, ana.source) == ("Ana", "Acme", "linkedin")
+
+
+def test_only_the_failing_rows_of_a_page_are_skipped(db):
+    page = [{"email": "bad@example.com", "experience_years": "lots"}, {"email": "good@example.com"}]
+
+    imported = external_source._write_page(db, "cvlibrary", page)
+
+    assert [candidate["email"] for candidate in imported] == ["good@example.com"]
+    assert [candidate.email for candidate in db.query(Candidate)] == ["good@example.com"]
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import re
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, text
+from sqlalchemy.exc import OperationalError
+
+from app.dedupe_applications import application_deduplicator
+from app.models import Candidate, Job, JobApplication
+from app.services.candidate_service import candidate_service
+
+# job_applications as created before the (candidate_id, job_id) unique constraint
+OLD_JOB_APPLICATIONS = """
+CREATE TABLE job_applications (
+    id INTEGER PRIMARY KEY,
+    candidate_id INTEGER REFERENCES candidates (id),
+    job_id INTEGER REFERENCES jobs (id),
+    status VARCHAR(50),
+    applied_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+    last_updated DATETIME,
+    email_sent BOOLEAN,
+    response_received BOOLEAN
+)
+"""
+
+
+def score_everyone(prompt: str) -> str:
+    return json.dumps([
+        {"candidate_id": int(candidate_id), "score": 0.9, "feedback": "Strong match"}
+        for candidate_id in re.findall(r"Candidate ID: (\d+)", prompt)
+    ])
+
+
+def add_job_and_candidates(db, count: int):
+    job = Job(title="Backend Developer", description="APIs", requirements="Python, SQL", job_type="full-time")
+    candidates = [
+        Candidate(first_name=f"First{n}", last_name=f"Last{n}", email=f"candidate{n}@example.com", source="applied")
+        for n in range(count)
+    ]
+    db.add_all([job, *candidates])
+    db.commit()
+    return job, candidates
+
+
+def applications_per_pair(db):
+    return dict(
+        db.query(JobApplication.candidate_id, func.count())
+        .group_by(JobApplication.candidate_id, JobApplication.job_id)
+        .all()
+    )
+
+
+def test_rematch_keeps_one_application_per_pair(db, fake_llm):
+    fake_llm.reply = score_everyone
+    job, candidates = add_job_and_candidates(db, 5)
+
+    for _ in range(2):
+        matched = asyncio.run(candidate_service.match_candidates_to_job(
+            db, job_id=job.id, prerank=False, use_vector_index=False
+        ))
+        assert len(matched) == 5
+
+    assert applications_per_pair(db) == {candidate.id: 1 for candidate in candidates}
+
+
+def test_dedupe_merges_duplicates_and_adds_unique_index(db):
+    job, candidates = add_job_and_candidates(db, 2)
+    db.execute(text("DROP TABLE job_applications"))
+    db.execute(text(OLD_JOB_APPLICATIONS))
+    job_id, first_id, second_id = job.id, candidates[0].id, candidates[1].id
+    early = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    late = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    db.add_all([
+        JobApplication(candidate_id=first_id, job_id=job_id, status="matched", applied_date=early, email_sent=True),
+        JobApplication(candidate_id=first_id, job_id=job_id, status="interview", applied_date=late, email_sent=False),
+        JobApplication(candidate_id=first_id, job_id=job_id, status="matched", applied_date=late, email_sent=False),
+        JobApplication(candidate_id=second_id, job_id=job_id, status="matched", applied_date=late, email_sent=False),
+    ])
+    db.commit()
+
+    # What matching and campaigns hit on such a database
+    with pytest.raises(OperationalError):
+        candidate_service.add_applications(db, [{"candidate_id": second_id, "job_id": job_id}])
+    db.rollback()
+
+    pairs = application_deduplicator.plan(db)
+    assert pairs == [(first_id, job_id)]
+    application_deduplicator.merge(db, pairs, batch_size=1)
+    application_deduplicator.create_unique_index(db)
+
+    assert application_deduplicator.has_unique_index(db)
+    assert applications_per_pair(db) == {first_id: 1, second_id: 1}
+    merged = db.query(JobApplication).filter(JobApplication.candidate_id == first_id).one()
+    assert merged.email_sent is True
+    assert merged.status == "matched"  # The newest of the latest rows
+    assert merged.applied_date.replace(tzinfo=timezone.utc) == early
+
+    candidate_service.add_applications(
+        db, [{"candidate_id": first_id, "job_id": job_id, "email_sent": True}], update_columns=["email_sent"]
+    )
+    db.commit()
+    assert applications_per_pair(db) == {first_id: 1, second_id: 1}
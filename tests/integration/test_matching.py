@@ -0,0 +1,39 @@
+import asyncio
+
+from app.core.config import settings
+from app.models import Candidate, CandidateJobMatch, Job
+from app.services.candidate_service import candidate_service
+
+
+def match(db, job_id: int):
+    return asyncio.run(candidate_service.match_candidates_to_job(
+        db, job_id=job_id, prerank=False, use_vector_index=False, incremental=True
+    ))
+
+
+def test_incremental_rerun_makes_no_llm_calls(db, fake_llm, monkeypatch):
+    # Count every evaluation, not just the ones the response cache misses
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_CANDIDATES", 2)
+    job = Job(title="Data Engineer", description="Pipelines", requirements="Python, SQL", job_type="full-time")
+    candidates = [
+        Candidate(first_name=f"First{n}", last_name=f"Last{n}", email=f"candidate{n}@example.com", source="applied")
+        for n in range(5)
+    ]
+    db.add_all([job, *candidates])
+    db.commit()
+
+    match(db, job.id)
+    assert fake_llm.calls == 3
+    assert db.query(CandidateJobMatch).count() == 5
+
+    match(db, job.id)
+    assert fake_llm.calls == 3
+
+    # Only the changed candidate is scored again
+    candidates[0].current_position = "Staff Engineer"
+    db.commit()
+    match(db, job.id)
+    assert fake_llm.calls == 4
+    assert "Candidate ID: %d" % candidates[0].id in fake_llm.prompts[-1]
+    assert "Candidate ID: %d" % candidates[1].id not in fake_llm.prompts[-1]
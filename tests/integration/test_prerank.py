@@ -0,0 +1,46 @@
+from app.models import Candidate, CandidateJobMatch, Job, Skill
+from app.services.match_results import match_results
+from app.services.prerank import pre_ranker
+
+
+def test_only_shortlisted_and_changed_prescores_are_stored(db, monkeypatch):
+    python = Skill(name="Python")
+    job = Job(
+        title="Backend Developer", description="APIs", requirements="Python, 3 years", job_type="full-time",
+        prerank_top_k=3, prerank_min_score=0.0
+    )
+    candidates = [
+        Candidate(
+            first_name=f"First{n}", last_name=f"Last{n}", email=f"candidate{n}@example.com", source="applied",
+            experience_years=float(n), skills=[python] if n % 2 else []
+        )
+        for n in range(10)
+    ]
+    db.add_all([job, *candidates])
+    db.commit()
+
+    written = []
+    upsert = match_results.upsert
+
+    def record_upsert(db, rows, columns):
+        written.extend(rows)
+        upsert(db, rows, columns)
+
+    monkeypatch.setattr(match_results, "upsert", record_upsert)
+
+    selected = pre_ranker.shortlist(db, job)
+    assert len(selected) == 3
+    assert sorted(row["candidate_id"] for row in written) == sorted(selected)
+    assert sorted(candidate_id for (candidate_id,) in db.query(CandidateJobMatch.candidate_id)) == sorted(selected)
+
+    # Nothing changed, nothing written
+    written.clear()
+    assert pre_ranker.shortlist(db, job) == selected
+    assert written == []
+
+    # The candidate dropped from the shortlist keeps its row, marked as such
+    job.prerank_top_k = 2
+    db.commit()
+    written.clear()
+    assert pre_ranker.shortlist(db, job) == selected[:2]
+    assert [(row["candidate_id"], row["shortlisted"]) for row in written] == [(selected[2], False)]
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+from app.core.config import settings
+from app.core.deps import SessionLocal
+from app.models import Task
+from app.services.task_queue import task_queue
+from app.worker import Worker
+
+
+@task_queue.task("test_blocking_sleep")
+async def blocking_sleep(db, *, seconds: float):
+    # Blocks its event loop outright, like sync database I/O or a sync LLM call
+    time.sleep(seconds)
+
+
+def task_status(task_id: int) -> Task:
+    db = SessionLocal()
+    try:
+        return db.get(Task, task_id)
+    finally:
+        db.close()
+
+
+async def run_worker(worker: Worker, task_ids, *, timeout: float) -> None:
+    """
+    Run the worker until every task is done (or failed)
+    """
+    runner = asyncio.create_task(worker.run())
+    deadline = time.monotonic() + timeout
+    try:
+        while time.monotonic() < deadline:
+            statuses = [task_status(task_id).status for task_id in task_ids]
+            if all(status in ("done", "failed") for status in statuses):
+                return
+            await asyncio.sleep(0.2)
+        raise AssertionError(f"Tasks still running after {timeout}s: {statuses}")
+    finally:
+        worker.stop()
+        await runner
+
+
+def test_blocking_handler_is_not_reclaimed_while_it_heartbeats(db, monkeypatch):
+    # Heartbeats every second; without them the task would be claimable again after 3s
+    monkeypatch.setattr(settings, "TASK_VISIBILITY_TIMEOUT_SECONDS", 3)
+    task = task_queue.enqueue(db, "test_blocking_sleep", {"seconds": 6})
+    reclaimed = []
+    stopping = threading.Event()
+
+    def claim_as_another_worker():
+        # Its own thread, so it keeps polling even if the worker's event loop is blocked
+        while not stopping.wait(0.2):
+            if task_status(task.id).status != "running":
+                continue  # Not picked up by the worker yet, or finished
+            other = SessionLocal()
+            try:
+                stolen = task_queue.claim(other, "other-host:1/0")
+                if stolen is not None:
+                    reclaimed.append(stolen.id)
+            finally:
+                other.close()
+
+    other_worker = threading.Thread(target=claim_as_another_worker)
+    other_worker.start()
+    try:
+        asyncio.run(run_worker(Worker(1, poll_interval=0.05), [task.id], timeout=20))
+    finally:
+        stopping.set()
+        other_worker.join()
+
+    finished = task_status(task.id)
+    assert reclaimed == []
+    assert finished.status == "done"
+    assert finished.attempts == 1
+
+
+def test_blocking_handlers_run_concurrently(db):
+    task_ids = [task_queue.enqueue(db, "test_blocking_sleep", {"seconds": 1.5}).id for _ in range(3)]
+
+    started = time.monotonic()
+    asyncio.run(run_worker(Worker(3, poll_interval=0.05), task_ids, timeout=20))
+    elapsed = time.monotonic() - started
+
+    assert all(task_status(task_id).status == "done" for task_id in task_ids)
+    # One at a time would take 4.5s
+    assert elapsed < 3.5
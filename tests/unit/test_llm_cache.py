@@ -0,0 +1,91 @@
+import asyncio
+import itertools
+
+import pytest
+
+from app.core.metrics import LLM_CACHE_LOOKUPS
+from app.services import llm_cache as llm_cache_module
+from app.services.llm_cache import LLMCache, llm_cache
+from app.services.llm_service import llm_service
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Time advancing one second per reading, so writes and reads are ordered
+    """
+    ticks = itertools.count(1_000_000)
+    monkeypatch.setattr(llm_cache_module.time, "time", lambda: float(next(ticks)))
+
+
+@pytest.mark.parametrize("reply", ["{}", "[]", "", "Sorry, I can't help with that", '{"score": 0.8'])
+def test_empty_or_unparseable_replies_are_not_cached(fake_llm, reply):
+    fake_llm.reply = lambda prompt: reply
+
+    for _ in range(2):
+        assert asyncio.run(llm_service._acall_llm("Rate this candidate")) == reply
+
+    assert fake_llm.calls == 2
+    assert llm_cache.stats()["entries"] == 0
+
+
+def test_failed_call_is_not_cached(fake_llm):
+    def fail(prompt):
+        raise RuntimeError("API unavailable")
+    fake_llm.reply = fail
+
+    assert llm_service._call_llm("Rate this candidate") == "{}"
+    fake_llm.reply = lambda prompt: '{"score": 0.8, "feedback": "ok"}'
+    assert llm_service._call_llm("Rate this candidate") == '{"score": 0.8, "feedback": "ok"}'
+    assert fake_llm.calls == 2
+
+
+def test_valid_reply_is_served_from_the_cache(fake_llm):
+    fake_llm.reply = lambda prompt: '{"score": 0.8, "feedback": "ok"}'
+
+    first = asyncio.run(llm_service._acall_llm("Rate this candidate"))
+    second = asyncio.run(llm_service._acall_llm("Rate this candidate"))
+    uncached = asyncio.run(llm_service._acall_llm("Rate this candidate", use_cache=False))
+
+    assert first == second == uncached
+    assert fake_llm.calls == 2
+
+
+def test_lookups_are_counted_once(fake_llm):
+    fake_llm.reply = lambda prompt: '{"score": 0.8, "feedback": "ok"}'
+
+    def lookups():
+        return {result: LLM_CACHE_LOOKUPS.labels(result)._value.get() for result in ("hit", "miss")}
+
+    before = lookups()
+    for _ in range(3):
+        asyncio.run(llm_service._acall_llm("Rate this candidate"))
+    after = lookups()
+
+    assert fake_llm.calls == 1
+    assert {result: after[result] - before[result] for result in after} == {"hit": 2, "miss": 1}
+
+
+def test_eviction_drops_least_recently_used(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(llm_cache_module, "EVICTION_INTERVAL", 1)
+    cache = LLMCache(tmp_path / "cache.sqlite3", max_entries=3, max_age_seconds=3600)
+
+    for key in "abc":
+        cache.set(key, '{"key": "%s"}' % key)
+    cache.get("a")
+    cache.set("d", '{"key": "d"}')
+
+    assert cache.get("b") is None
+    assert [cache.get(key) is not None for key in "acd"] == [True, True, True]
+    assert cache.stats()["entries"] == 3
+
+
+def test_expired_entries_are_misses(tmp_path, clock):
+    cache = LLMCache(tmp_path / "cache.sqlite3", max_entries=10, max_age_seconds=5)
+    cache.set("a", '{"key": "a"}')
+
+    assert cache.get("a") is not None
+    for _ in range(5):
+        cache.get("other")
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,72 @@
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.llm_service import llm_service
+from benchmarks.stubs import respond
+
+JOB = SimpleNamespace(
+    title="Backend Developer", description="APIs", requirements="Python, SQL", location="Remote", job_type="full-time"
+)
+
+
+def make_candidates(count: int):
+    return [
+        SimpleNamespace(
+            id=n + 1, first_name=f"First{n}", last_name=f"Last{n}", experience_years=3.0, education="BS",
+            current_position="Developer", current_company="Acme", skills=[SimpleNamespace(name="Python")]
+        )
+        for n in range(count)
+    ]
+
+
+def candidates_in(prompt: str):
+    return [int(candidate_id) for candidate_id in re.findall(r"Candidate ID: (\d+)", prompt)]
+
+
+@pytest.fixture
+def uncached(fake_llm, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    return fake_llm
+
+
+def test_oversized_batch_is_halved_and_retried(uncached):
+    # The reply to more than two candidates gets cut off mid-array
+    uncached.reply = lambda prompt: respond(prompt)[:40] if len(candidates_in(prompt)) > 2 else respond(prompt)
+    candidates = make_candidates(4)
+
+    results, errors = asyncio.run(llm_service.aevaluate_candidates_job_match_batch(candidates, JOB))
+
+    assert sorted(results) == [1, 2, 3, 4]
+    assert errors == {}
+    assert [candidates_in(prompt) for prompt in uncached.prompts] == [[1, 2, 3, 4], [1, 2], [3, 4]]
+
+
+def test_only_candidates_missing_from_the_reply_are_retried(uncached):
+    # Candidate 3 is left out of every batched reply
+    def reply(prompt):
+        return respond(prompt.replace("Candidate ID: 3", "Candidate ID: 99")) if len(candidates_in(prompt)) > 1 else "{}"
+    uncached.reply = reply
+
+    results, errors = asyncio.run(llm_service.aevaluate_candidates_job_match_batch(make_candidates(4), JOB))
+
+    assert sorted(results) == [1, 2, 4]
+    assert list(errors) == [3]
+    assert [candidates_in(prompt) for prompt in uncached.prompts] == [[1, 2, 3, 4], [3]]
+
+
+def test_batches_fit_the_token_budget(monkeypatch):
+    candidates = make_candidates(30)
+    base = llm_service._estimate_tokens(llm_service._build_batch_match_prompt([], JOB))
+    monkeypatch.setattr(settings, "LLM_BATCH_TOKEN_BUDGET", base + 600)
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_CANDIDATES", 20)
+
+    batches = llm_service.plan_match_batches(candidates, JOB)
+
+    assert [candidate for batch in batches for candidate in batch] == candidates
+    assert len(batches) > 1
+    for batch in batches:
+        assert llm_service._estimate_tokens(llm_service._build_batch_match_prompt(batch, JOB)) <= base + 600